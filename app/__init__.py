@@ -1,11 +1,20 @@
 from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
+import logging
 import os
 
 load_dotenv()  # This loads .env into environment variables
 
 def create_app():
+    # Leaves logging alone if the root logger was already configured
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    # httpx (used by the Groq SDK) logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
     app = Flask(__name__)
 
     # Enable CORS for all routes
@@ -13,6 +22,11 @@ def create_app():
 
     # Import and register routes
     from .routes import main
+    from . import admission, db, metrics
     app.register_blueprint(main)
+    metrics.init_app(app)
+    # After metrics, so rejected and queued requests are timed too
+    admission.init_app(app)
+    db.init_app(app)
 
     return app
@@ -0,0 +1,408 @@
+# app/admission.py
+"""
+Rate limiting and load shedding for the routes that wait on an upstream
+(Groq, the study time predictor, YouTube/GitHub).
+
+Every request to one of ADMISSION_ROUTES spends a token from its client
+IP's bucket and, when it names a user_id, from that user's bucket; an
+empty bucket answers 429 with Retry-After. An admitted request then takes
+one of its upstream's ADMISSION_CONCURRENCY slots. When they are all taken
+it queues for one, unless the queue ahead of it would take longer than
+ADMISSION_LATENCY_BUDGET seconds to drain at the upstream's recent time
+per request; then (or when its wait runs out) it answers 503 with
+Retry-After instead of tying up a worker. Routes that call an upstream
+only on some paths admit themselves there, with acquire().
+
+Buckets and slots live in a small SQLite database shared by every worker
+on the host, so the limits hold across gunicorn and uvicorn workers. If it
+cannot be reached within ADMISSION_BUSY_MS, requests are let through.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from app import metrics
+from app.db import get_conn, transaction
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1") != "0"
+ADMISSION_DB = os.getenv("ADMISSION_DB_PATH", "data/admission.db")
+# Requests per minute and bucket size, per user_id and per client IP (0 disables a limit)
+RATE_LIMIT_USER_PER_MINUTE = float(os.getenv("RATE_LIMIT_USER_PER_MINUTE", "20"))
+RATE_LIMIT_USER_BURST = float(os.getenv("RATE_LIMIT_USER_BURST", "10"))
+RATE_LIMIT_IP_PER_MINUTE = float(os.getenv("RATE_LIMIT_IP_PER_MINUTE", "60"))
+RATE_LIMIT_IP_BURST = float(os.getenv("RATE_LIMIT_IP_BURST", "30"))
+# Behind one reverse proxy, the client IP is the last X-Forwarded-For entry
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "0") == "1"
+# Requests in flight per upstream, across all workers
+ADMISSION_CONCURRENCY = os.getenv("ADMISSION_CONCURRENCY", "groq=16,predictor=32,resources=32")
+# Seconds a request may queue for a slot before it is shed (0 sheds as soon as all are taken)
+ADMISSION_LATENCY_BUDGET = float(os.getenv("ADMISSION_LATENCY_BUDGET", "2"))
+# Slots held longer than this (e.g. by a killed worker) are reclaimed
+ADMISSION_LEASE_SECONDS = float(os.getenv("ADMISSION_LEASE_SECONDS", "300"))
+# Wait at most this long for the admission database's write lock
+ADMISSION_BUSY_MS = int(os.getenv("ADMISSION_BUSY_MS", "200"))
+_POLL_SECONDS = 0.02
+# Weight of the newest request in an upstream's moving average time per request
+_SERVICE_WEIGHT = 0.2
+_DEFAULT_SERVICE_SECONDS = 1.0
+_PRUNE_SECONDS = 60
+
+# Route -> upstream whose slots it takes (None: rate limited only)
+ADMISSION_ROUTES = {
+    "/api/roadmap": "groq",
+    "/api/roadmap/stream": "groq",
+    "/api/interview": "groq",
+    "/api/interview/stream": "groq",
+    "/api/generate-questions": "groq",
+    "/api/interview_questions": "groq",
+    # The job pool bounds its own LLM calls
+    "/api/interview_questions/jobs": None,
+    "/api/predict": "predictor",
+    "/api/predict/batch": None,
+    "/api/resources": "resources",
+}
+
+RATE_LIMITED = "rate_limited"
+OVERLOADED = "overloaded"
+
+ADMISSION_REJECTED = metrics.Counter(
+    "admission_rejected_total",
+    "Requests answered 429 (rate_limited) or 503 (overloaded) before reaching their route.",
+    ("route", "reason"),
+)
+
+_local = threading.local()
+_pruned_at = 0.0
+
+
+def parse_limits(spec):
+    """{"groq": 16, ...} from "groq=16,predictor=32"."""
+    limits = {}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if name.strip():
+            limits[name.strip()] = int(value)
+    return limits
+
+
+_LIMITS = parse_limits(ADMISSION_CONCURRENCY)
+# Time for an empty bucket to fill up again
+_REFILL_SECONDS = max(
+    burst * 60 / per_minute if per_minute > 0 else 0
+    for per_minute, burst in (
+        (RATE_LIMIT_USER_PER_MINUTE, RATE_LIMIT_USER_BURST),
+        (RATE_LIMIT_IP_PER_MINUTE, RATE_LIMIT_IP_BURST),
+    )
+)
+
+
+def _conn():
+    """Pooled per-thread connection to the admission database; its state is shared by all workers."""
+    conn = get_conn(ADMISSION_DB)
+    if getattr(_local, "pid", None) != os.getpid():
+        conn.execute(f"PRAGMA busy_timeout={ADMISSION_BUSY_MS}")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            " key TEXT PRIMARY KEY,"
+            " tokens REAL NOT NULL,"
+            " updated_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS admission_slots ("
+            " id INTEGER PRIMARY KEY,"
+            " upstream TEXT NOT NULL,"
+            " running INTEGER NOT NULL,"
+            " started_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_admission_slots ON admission_slots(upstream, running)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS upstream_service ("
+            " upstream TEXT PRIMARY KEY,"
+            " seconds REAL NOT NULL) WITHOUT ROWID"
+        )
+        _local.pid = os.getpid()
+    return conn
+
+
+class Rejection:
+    """A 429 or 503 answer, with the seconds after which a retry may succeed."""
+
+    def __init__(self, status, reason, retry_after):
+        self.status = status
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+    @property
+    def payload(self):
+        if self.reason == RATE_LIMITED:
+            error = "Too many requests"
+        else:
+            error = "Server is busy"
+        return {"error": f"{error}; retry in {self.retry_after}s", "retry_after": self.retry_after}
+
+    @property
+    def headers(self):
+        return {"Retry-After": str(self.retry_after)}
+
+
+class Rejected(Exception):
+    """Raised by acquire(); init_app answers it with the rejection."""
+
+    def __init__(self, rejection):
+        super().__init__(rejection.reason)
+        self.rejection = rejection
+
+
+class Ticket:
+    """A request's slot for an upstream, or its place in the queue for one."""
+
+    def __init__(self, slot_id, upstream, running, started_at, deadline, expected_wait):
+        self.slot_id = slot_id
+        self.upstream = upstream
+        self.running = running
+        self.started_at = started_at
+        self.deadline = deadline
+        self.expected_wait = expected_wait
+        self._released = False
+
+    def poll(self):
+        """Take a slot if one is free for this place in the queue; returns whether it holds one."""
+        if self.running:
+            return True
+        now = time.time()
+        conn = _conn()
+        with transaction(conn):
+            _expire(conn, self.upstream, now)
+            running, ahead = conn.execute(
+                "SELECT COALESCE(SUM(running), 0), COALESCE(SUM(running = 0 AND id < ?), 0) "
+                "FROM admission_slots WHERE upstream = ?",
+                (self.slot_id, self.upstream),
+            ).fetchone()
+            if running + ahead < _LIMITS[self.upstream]:
+                conn.execute(
+                    "UPDATE admission_slots SET running = 1, started_at = ?, expires_at = ? WHERE id = ?",
+                    (now, now + ADMISSION_LEASE_SECONDS, self.slot_id),
+                )
+                self.running = True
+                self.started_at = now
+        return self.running
+
+    def release(self):
+        """Give the slot (or queue place) back; a held slot's duration feeds the upstream's average."""
+        if self._released:
+            return
+        self._released = True
+        try:
+            conn = _conn()
+            with transaction(conn):
+                conn.execute("DELETE FROM admission_slots WHERE id = ?", (self.slot_id,))
+                if self.running:
+                    conn.execute(
+                        "INSERT INTO upstream_service (upstream, seconds) VALUES (?, ?) "
+                        "ON CONFLICT (upstream) DO UPDATE SET seconds = seconds * ? + excluded.seconds * ?",
+                        (self.upstream, time.time() - self.started_at, 1 - _SERVICE_WEIGHT, _SERVICE_WEIGHT),
+                    )
+        except sqlite3.Error as e:
+            # The lease frees the slot eventually
+            logger.warning("Releasing a %s slot failed: %s", self.upstream, e)
+
+
+def _expire(conn, upstream, now):
+    conn.execute("DELETE FROM admission_slots WHERE upstream = ? AND expires_at < ?", (upstream, now))
+
+
+def _prune_buckets(conn, now):
+    """Drop buckets that have refilled completely; a missing bucket is a full one."""
+    global _pruned_at
+    if now - _pruned_at < _PRUNE_SECONDS:
+        return
+    _pruned_at = now
+    conn.execute("DELETE FROM rate_buckets WHERE updated_at < ?", (now - _REFILL_SECONDS,))
+
+
+def _limits(ip, user_id):
+    """(bucket key, tokens per second, burst) for each bucket a request spends from."""
+    limits = []
+    if ip and RATE_LIMIT_IP_PER_MINUTE > 0:
+        limits.append((f"ip:{ip}", RATE_LIMIT_IP_PER_MINUTE / 60, RATE_LIMIT_IP_BURST))
+    if user_id and RATE_LIMIT_USER_PER_MINUTE > 0:
+        limits.append((f"user:{user_id}", RATE_LIMIT_USER_PER_MINUTE / 60, RATE_LIMIT_USER_BURST))
+    return limits
+
+
+def client_ip(remote_addr, forwarded_for=None):
+    if RATE_LIMIT_TRUST_PROXY and forwarded_for:
+        return forwarded_for.split(",")[-1].strip()
+    return remote_addr
+
+
+def _take_slot(conn, upstream, now):
+    limit = _LIMITS.get(upstream)
+    if not limit:
+        return None, None
+    _expire(conn, upstream, now)
+    running, waiting = conn.execute(
+        "SELECT COALESCE(SUM(running), 0), COALESCE(SUM(running = 0), 0) FROM admission_slots WHERE upstream = ?",
+        (upstream,),
+    ).fetchone()
+    if running < limit and not waiting:
+        slot_id = conn.execute(
+            "INSERT INTO admission_slots (upstream, running, started_at, expires_at) VALUES (?, 1, ?, ?)",
+            (upstream, now, now + ADMISSION_LEASE_SECONDS),
+        ).lastrowid
+        return Ticket(slot_id, upstream, True, now, now, 0.0), None
+
+    row = conn.execute("SELECT seconds FROM upstream_service WHERE upstream = ?", (upstream,)).fetchone()
+    service = row[0] if row else _DEFAULT_SERVICE_SECONDS
+    # Slots free up `limit` at a time, one average request apart
+    expected_wait = (waiting // limit + 1) * service
+    if expected_wait > ADMISSION_LATENCY_BUDGET:
+        return None, Rejection(503, OVERLOADED, expected_wait)
+    deadline = now + ADMISSION_LATENCY_BUDGET
+    slot_id = conn.execute(
+        "INSERT INTO admission_slots (upstream, running, started_at, expires_at) VALUES (?, 0, ?, ?)",
+        (upstream, now, deadline + 1),
+    ).lastrowid
+    return Ticket(slot_id, upstream, False, now, deadline, expected_wait), None
+
+
+def _try_admit(route, ip, user_id, upstream):
+    """(ticket, None), (None, None) when no slot is needed, or (None, rejection)."""
+    now = time.time()
+    conn = _conn()
+    with transaction(conn):
+        _prune_buckets(conn, now)
+        spent, retry_after = [], 0.0
+        for key, rate, burst in _limits(ip, user_id):
+            row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            if tokens < 1:
+                retry_after = max(retry_after, (1 - tokens) / rate)
+            spent.append((key, tokens - 1, now))
+        if retry_after:
+            return None, Rejection(429, RATE_LIMITED, retry_after)
+        # A shed request spends no tokens: overload is not the client's fault
+        ticket, rejection = _take_slot(conn, upstream, now)
+        if rejection is None:
+            conn.executemany("INSERT OR REPLACE INTO rate_buckets (key, tokens, updated_at) VALUES (?, ?, ?)", spent)
+        return ticket, rejection
+
+
+def _reject(route, rejection):
+    if metrics.METRICS_ENABLED:
+        ADMISSION_REJECTED.inc(route=route, reason=rejection.reason)
+    return None, rejection
+
+
+def admit(route, ip, user_id=None, upstream=None):
+    """
+    (ticket, None) once the request may run, or (None, rejection). The
+    ticket (None for routes without an upstream slot) must be released
+    when the response is done. Waits in the queue for a slot if needed.
+    upstream defaults to the route's in ADMISSION_ROUTES.
+    """
+    upstream = upstream or ADMISSION_ROUTES[route]
+    try:
+        ticket, rejection = _try_admit(route, ip, user_id, upstream)
+        if ticket is not None:
+            while not ticket.poll():
+                if time.time() >= ticket.deadline:
+                    ticket.release()
+                    return _reject(route, Rejection(503, OVERLOADED, ticket.expected_wait))
+                time.sleep(_POLL_SECONDS)
+    except sqlite3.Error as e:
+        logger.warning("Admission check for %s failed, letting the request through: %s", route, e)
+        return None, None
+    if rejection is not None:
+        return _reject(route, rejection)
+    return ticket, None
+
+
+async def admit_async(route, ip, user_id=None):
+    """admit() for the event loop: database calls run in threads and the queue wait does not block."""
+    try:
+        ticket, rejection = await asyncio.to_thread(_try_admit, route, ip, user_id, ADMISSION_ROUTES[route])
+        if ticket is not None:
+            while not await asyncio.to_thread(ticket.poll):
+                if time.time() >= ticket.deadline:
+                    await asyncio.to_thread(ticket.release)
+                    return _reject(route, Rejection(503, OVERLOADED, ticket.expected_wait))
+                await asyncio.sleep(_POLL_SECONDS)
+    except sqlite3.Error as e:
+        logger.warning("Admission check for %s failed, letting the request through: %s", route, e)
+        return None, None
+    if rejection is not None:
+        return _reject(route, rejection)
+    return ticket, None
+
+
+def _flask_user_id():
+    from flask import request
+
+    user_id = request.args.get("user_id") or request.form.get("user_id")
+    if not user_id and request.is_json:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            user_id = data.get("user_id")
+    return str(user_id) if user_id not in (None, "") else None
+
+
+@contextmanager
+def acquire(upstream):
+    """
+    Admit the current Flask request to upstream for the length of the
+    block, for routes that call it only on some paths; raises Rejected.
+    """
+    if not ADMISSION_ENABLED:
+        yield
+        return
+    from flask import request
+
+    ip = client_ip(request.remote_addr, request.headers.get("X-Forwarded-For"))
+    ticket, rejection = admit(request.url_rule.rule, ip, _flask_user_id(), upstream)
+    if rejection is not None:
+        raise Rejected(rejection)
+    try:
+        yield
+    finally:
+        if ticket is not None:
+            ticket.release()
+
+
+def init_app(app):
+    """Admit or reject requests to ADMISSION_ROUTES before they reach their route."""
+    from flask import g, jsonify, request
+
+    @app.before_request
+    def _admit():
+        if not ADMISSION_ENABLED or request.method == "OPTIONS" or request.url_rule is None:
+            return None
+        route = request.url_rule.rule
+        if route not in ADMISSION_ROUTES:
+            return None
+        ip = client_ip(request.remote_addr, request.headers.get("X-Forwarded-For"))
+        ticket, rejection = admit(route, ip, _flask_user_id())
+        if rejection is not None:
+            return jsonify(rejection.payload), rejection.status, rejection.headers
+        g.admission_ticket = ticket
+        return None
+
+    @app.errorhandler(Rejected)
+    def _rejected(e):
+        return jsonify(e.rejection.payload), e.rejection.status, e.rejection.headers
+
+    @app.teardown_request
+    def _release(exc):
+        # For streamed responses (stream_with_context) this runs once the stream ends
+        ticket = g.pop("admission_ticket", None)
+        if ticket is not None:
+            ticket.release()
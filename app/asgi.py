@@ -0,0 +1,614 @@
+# app/asgi.py
+"""
+Async (ASGI) serving mode.
+
+The I/O-bound routes are served by native async handlers that use
+httpx.AsyncClient and AsyncGroq, so one process keeps up to
+ASGI_MAX_CONNECTIONS calls per upstream host in flight instead of one per
+worker thread. Every other route (uploads, streaming, batch
+prediction, jobs) is delegated to the Flask app, each request on a thread
+of the default executor, so the API surface matches create_app exactly.
+
+    uvicorn asgi:app --workers 2
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from urllib.parse import parse_qs
+
+import httpx
+from groq import AsyncGroq
+
+from app import admission, create_app, http_client, metrics
+from app.cache import get_cache, record_lookup, topic_key
+from app.catalog_store import get_precomputed_resources
+from app.coursera_fetcher import fetch_coursera_courses
+from app.github_fetcher import (
+    GITHUB_CACHE_TTL,
+    GITHUB_READ_TIMEOUT,
+    GITHUB_SEARCH_URL,
+    github_search_request,
+    parse_github_results,
+)
+from app.local_predictor import FeatureError, prediction_payload
+from app.ml_engine import (
+    EXTERNAL_API_URL,
+    PREDICTOR_MODE,
+    PREDICTOR_READ_TIMEOUT,
+    PREDICTOR_RETRIES,
+    shadow_predict,
+)
+from app.resource_aggregator import OVERALL_DEADLINE, SOURCES
+from app.resume_interview_engine import (
+    INTERVIEW_REPLY_TOKENS,
+    fallback_questions,
+    interview_messages,
+    parse_interview_reply,
+    router as interview_router,
+)
+from app.resume_store import get_saved_resume
+from app.roadmap_generator import (
+    ROADMAP_REPLY_TOKENS,
+    clean_roadmap_text,
+    roadmap_messages,
+    router as roadmap_router,
+)
+from app.roadmap_index import RESOURCE_REINDEX_SECONDS, index_resources, parse_roadmap
+from app.roadmap_store import (
+    ROADMAP_FRESH_SECONDS,
+    is_error_roadmap,
+    load_precomputed,
+    roadmap_cache_key,
+    store_roadmap,
+)
+from app.skill_extractor import top_skills
+from app.topic_canonicalizer import canonical_topic
+from app.youtube_fetcher import (
+    API_KEY as YOUTUBE_API_KEY,
+    YOUTUBE_CACHE_TTL,
+    YOUTUBE_READ_TIMEOUT,
+    YOUTUBE_SEARCH_URL,
+    parse_youtube_results,
+    youtube_search_params,
+)
+
+logger = logging.getLogger(__name__)
+
+# Per upstream host. httpcore scans its whole pool on every request, so
+# small per-host pools are cheaper than one large shared pool.
+ASGI_MAX_CONNECTIONS = int(os.getenv("ASGI_MAX_CONNECTIONS", "100"))
+ASGI_MAX_KEEPALIVE = int(os.getenv("ASGI_MAX_KEEPALIVE", "20"))
+
+
+class AsyncUpstreams:
+    """Async clients for the current event loop: one httpx pool per host, created on first use."""
+
+    def __init__(self):
+        self._clients = {}
+        self._groq = None
+
+    def http(self, url):
+        host = http_client.host_of(url)
+        client = self._clients.get(host)
+        if client is None:
+            client = self._clients[host] = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=ASGI_MAX_CONNECTIONS,
+                    max_keepalive_connections=ASGI_MAX_KEEPALIVE,
+                ),
+                timeout=httpx.Timeout(http_client.READ_TIMEOUT, connect=http_client.CONNECT_TIMEOUT),
+            )
+        return client
+
+    @property
+    def groq(self):
+        if self._groq is None:
+            self._groq = AsyncGroq(
+                api_key=os.getenv("GROQ_API_KEY"),
+                max_retries=1,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=ASGI_MAX_CONNECTIONS,
+                        max_keepalive_connections=ASGI_MAX_KEEPALIVE,
+                    ),
+                    timeout=httpx.Timeout(60.0, connect=http_client.CONNECT_TIMEOUT),
+                ),
+            )
+        return self._groq
+
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+        if self._groq is not None:
+            await self._groq.close()
+            self._groq = None
+
+    async def request(self, method, url, read_timeout, upstream=None, retries=0, **kwargs):
+        """
+        Send a request, sharing the sync client's per-host circuit breaker
+        and retry policy (http_client.request): transport errors and
+        RETRYABLE_STATUSES are retried up to `retries` times with backoff.
+        """
+        breaker = http_client.get_breaker(url)
+        upstream = upstream or http_client.host_of(url)
+        timeout = httpx.Timeout(read_timeout, connect=http_client.CONNECT_TIMEOUT)
+        for attempt in range(retries + 1):
+            if not breaker.allow():
+                metrics.observe_upstream(upstream, "circuit_open", 0.0)
+                raise http_client.CircuitOpenError(f"Circuit open for {url}")
+            started = time.perf_counter()
+            try:
+                response = await self.http(url).request(method, url, timeout=timeout, **kwargs)
+            except httpx.HTTPError as e:
+                metrics.observe_upstream(upstream, metrics.upstream_error_status(e), time.perf_counter() - started)
+                breaker.record_failure()
+                if attempt >= retries or not isinstance(e, httpx.TransportError):
+                    raise
+                await asyncio.sleep(http_client.backoff(attempt))
+                continue
+            except BaseException:
+                # Cancelled (e.g. by a deadline): still end a half-open trial
+                breaker.record_failure()
+                raise
+            metrics.observe_upstream(upstream, response.status_code, time.perf_counter() - started)
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if response.status_code in http_client.RETRYABLE_STATUSES and attempt < retries:
+                await asyncio.sleep(http_client.backoff(attempt, response))
+                continue
+            return response
+
+
+upstreams = AsyncUpstreams()
+
+
+def _llm_clients():
+    """Async clients for the router: the shared AsyncGroq when a key is set."""
+    return {"groq": upstreams.groq} if os.getenv("GROQ_API_KEY") else {}
+
+
+class Request:
+    def __init__(self, scope, body):
+        self.scope = scope
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.args = {k: v[0] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+        self.headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", ())}
+        self.body = body
+
+    def json(self):
+        try:
+            return json.loads(self.body or b"null")
+        except ValueError:
+            return None
+
+
+async def _send_json(send, payload, status=200, headers=None):
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"access-control-allow-origin", b"*"),
+            *((name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in (headers or {}).items()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+# === Resources ===
+
+async def _cached_source(source, ttl, topic, fetch):
+    # The cache may be SQLite (RESOURCE_CACHE_BACKEND), so lookups stay off the event loop
+    key = topic_key(source, topic)
+    found, value = await asyncio.to_thread(get_cache().get, key)
+    record_lookup(source, found)
+    if found:
+        return value
+    value = await fetch(topic)
+    if value:
+        await asyncio.to_thread(get_cache().set, key, value, ttl)
+    return value
+
+
+async def _youtube(topic):
+    if not YOUTUBE_API_KEY:
+        return []
+    response = await upstreams.request(
+        "GET", YOUTUBE_SEARCH_URL, YOUTUBE_READ_TIMEOUT, upstream="youtube",
+        params=youtube_search_params(topic),
+    )
+    return parse_youtube_results(response.json())
+
+
+async def _github(topic):
+    params, headers = github_search_request(topic)
+    response = await upstreams.request(
+        "GET", GITHUB_SEARCH_URL, GITHUB_READ_TIMEOUT, upstream="github", params=params, headers=headers
+    )
+    return parse_github_results(response.json())
+
+
+async def _coursera(topic):
+    return fetch_coursera_courses(topic)
+
+
+_ASYNC_SOURCES = {
+    "youtube": lambda topic: _cached_source("youtube", YOUTUBE_CACHE_TTL, topic, _youtube),
+    "coursera": _coursera,
+    "github": lambda topic: _cached_source("github", GITHUB_CACHE_TTL, topic, _github),
+}
+
+
+async def resources(request):
+    topic = request.args.get("topic", "").strip()
+    user_id = request.args.get("user_id", "")
+    if not topic and user_id:
+        skills = top_skills(await asyncio.to_thread(get_saved_resume, user_id), 1)
+        if not skills:
+            return {"error": "No skills found in saved resume"}, 404
+        topic = skills[0]
+    if not topic:
+        return {"error": "Missing topic parameter"}, 400
+    topic = await asyncio.to_thread(canonical_topic, topic)
+
+    precomputed = await asyncio.to_thread(get_precomputed_resources, topic)
+    if precomputed is not None:
+        return {**precomputed, "topic": topic}, 200
+
+    started = time.monotonic()
+
+    async def run(name):
+        key, _, source_deadline = SOURCES[name]
+        try:
+            value = await asyncio.wait_for(
+                _ASYNC_SOURCES[name](topic), timeout=min(source_deadline, OVERALL_DEADLINE)
+            )
+            return name, key, value or [], "ok", None
+        except asyncio.TimeoutError:
+            return name, key, [], "timeout", None
+        except Exception as e:
+            return name, key, [], "error", str(e)
+
+    result = {}
+    status = {}
+    for coro in asyncio.as_completed([run(name) for name in SOURCES]):
+        name, key, value, state, error = await coro
+        result[key] = value
+        status[name] = {"state": state, "elapsed_ms": round((time.monotonic() - started) * 1000, 1)}
+        if error:
+            status[name]["error"] = error
+    result["status"] = status
+    result["topic"] = topic
+    if all(entry["state"] == "ok" for entry in status.values()):
+        try:
+            await asyncio.to_thread(index_resources, topic, result, max_age=RESOURCE_REINDEX_SECONDS)
+        except sqlite3.Error as e:
+            logger.warning("Indexing resources for %r failed: %s", topic, e)
+    return result, 200
+
+
+# === Roadmap ===
+
+_roadmap_inflight = {}
+
+
+async def _generate_roadmap(key, topic):
+    """One AsyncGroq call per key at a time; concurrent callers await the same task."""
+    task = _roadmap_inflight.get(key)
+    if task is None:
+        async def generate():
+            try:
+                result, _, _ = await roadmap_router.acomplete(
+                    roadmap_messages(topic), ROADMAP_REPLY_TOKENS, clients=_llm_clients(), temperature=0.5
+                )
+                roadmap = clean_roadmap_text(result)
+            except Exception as e:
+                return f"Error generating roadmap: {str(e)}"
+            if not is_error_roadmap(roadmap):
+                await asyncio.to_thread(store_roadmap, key, roadmap, topic=topic)
+            return roadmap
+
+        task = asyncio.ensure_future(generate())
+        _roadmap_inflight[key] = task
+        task.add_done_callback(lambda _: _roadmap_inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def roadmap(request):
+    topic = request.args.get("topic", "").strip()
+    if not topic:
+        return {"error": "No topic provided"}, 400
+    topic = await asyncio.to_thread(canonical_topic, topic)
+
+    key = roadmap_cache_key(topic, roadmap_router.primary_model)
+    found, entry = await asyncio.to_thread(get_cache().get, key)
+    record_lookup("roadmap", found)
+    if not found:
+        roadmap = await asyncio.to_thread(load_precomputed, key, topic)
+        return _roadmap_response(topic, roadmap or await _generate_roadmap(key, topic)), 200
+
+    stale = time.time() - entry["generated_at"] > ROADMAP_FRESH_SECONDS and not entry.get("precomputed")
+    if stale and key not in _roadmap_inflight:
+        asyncio.ensure_future(_generate_roadmap(key, topic))
+    return _roadmap_response(topic, entry["roadmap"]), 200
+
+
+def _roadmap_response(topic, roadmap):
+    if is_error_roadmap(roadmap):
+        return {"roadmap": roadmap, "topic": topic}
+    return {"roadmap": roadmap, "topic": topic, "phases": parse_roadmap(roadmap)["phases"]}
+
+
+# === Prediction ===
+
+def _feature_error(e):
+    return {"error": str(e), **({"field": e.field} if e.field else {})}, 400
+
+
+def _local_prediction(data, note):
+    try:
+        return prediction_payload(data, note), 200
+    except FeatureError as e:
+        return _feature_error(e)
+
+
+async def predict(request):
+    """Same modes as routes.api_predict: remote with local fallback, local, or shadow."""
+    incoming_json = request.json() or {}
+    if PREDICTOR_MODE in ("local", "shadow"):
+        if PREDICTOR_MODE == "shadow":
+            try:
+                await asyncio.to_thread(shadow_predict, incoming_json)
+            except FeatureError as e:
+                return _feature_error(e)
+        return _local_prediction(incoming_json, "Predicted by the in-process model")
+
+    try:
+        response = await upstreams.request(
+            "POST", EXTERNAL_API_URL, PREDICTOR_READ_TIMEOUT, upstream="predictor", retries=PREDICTOR_RETRIES,
+            json=incoming_json,
+        )
+        if response.status_code == 200 and response.text.strip():
+            return response.json(), 200
+    except (httpx.HTTPError, http_client.CircuitOpenError, ValueError):
+        pass
+
+    return _local_prediction(incoming_json, "Returned by fallback heuristic due to external API timeout")
+
+
+# === Interview Q&A ===
+
+async def _interview_questions(resume_text):
+    if not resume_text.strip():
+        return ["No resume text found. Please upload a valid file."]
+    if not interview_router.available():
+        return fallback_questions(resume_text)
+    try:
+        result, _, _ = await interview_router.acomplete(
+            interview_messages(resume_text), INTERVIEW_REPLY_TOKENS, clients=_llm_clients(), temperature=0.7
+        )
+    except Exception as api_error:
+        logger.warning("LLM call failed: %s", api_error)
+        return fallback_questions(resume_text)
+    qa, _ = parse_interview_reply(result.strip())
+    return qa
+
+
+async def interview(request):
+    data = request.json()
+    if not data or "resumeText" not in data:
+        return {"error": "Missing resumeText in request"}, 400
+    return {"qaPairs": await _interview_questions(data["resumeText"])}, 200
+
+
+async def generate_questions(request):
+    data = request.json()
+    if not data or "resume_text" not in data:
+        return {"error": "Missing resume_text in request"}, 400
+    return {"qaPairs": await _interview_questions(data["resume_text"])}, 200
+
+
+# === Saved resume ===
+
+async def saved_resume(request):
+    user_id = request.args.get("user_id", "")
+    if not user_id:
+        return {"error": "Missing user_id"}, 400
+    resume_text = await asyncio.to_thread(get_saved_resume, user_id)
+    if not resume_text:
+        return {"error": "No saved resume found"}, 404
+    return {"resume": resume_text}, 200
+
+
+async def index(request):
+    return {"message": "✅ AI Study Planner API is running"}, 200
+
+
+ASYNC_ROUTES = {
+    ("GET", "/"): index,
+    ("GET", "/api/resources"): resources,
+    ("GET", "/api/roadmap"): roadmap,
+    ("POST", "/api/predict"): predict,
+    ("POST", "/api/interview"): interview,
+    ("POST", "/api/generate-questions"): generate_questions,
+    ("GET", "/api/saved_resume"): saved_resume,
+}
+
+
+def _client_ip(request):
+    client = request.scope.get("client")
+    return admission.client_ip(client[0] if client else None, request.headers.get("x-forwarded-for"))
+
+
+def _user_id(request):
+    user_id = request.args.get("user_id")
+    if user_id is None:
+        data = request.json()
+        user_id = data.get("user_id") if isinstance(data, dict) else None
+    return str(user_id) if user_id not in (None, "") else None
+
+
+def _wsgi_environ(scope, body):
+    """PEP 3333 environ for an ASGI HTTP scope and its spooled request body."""
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    if path.startswith(root_path):
+        path = path[len(root_path):]
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client")
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": root_path.encode("utf8").decode("latin1"),
+        "PATH_INFO": path.encode("utf8").decode("latin1"),
+        "QUERY_STRING": scope["query_string"].decode("latin1"),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if client:
+        environ["REMOTE_ADDR"] = client[0]
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin1").upper().replace("-", "_")
+        name = name if name in ("CONTENT_LENGTH", "CONTENT_TYPE") else f"HTTP_{name}"
+        value = value.decode("latin1")
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+class _WsgiBridge:
+    """
+    Serves a WSGI app over ASGI. Each request runs on a thread of the
+    default executor (Flask is thread-safe), so delegated routes run
+    concurrently; the response iterable is closed as PEP 3333 requires,
+    which runs Flask's teardown and call_on_close hooks (metrics).
+    """
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    async def __call__(self, scope, receive, send):
+        with tempfile.SpooledTemporaryFile(max_size=65536) as body:
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                body.write(message.get("body", b""))
+                if not message.get("more_body"):
+                    break
+            body.seek(0)
+            await asyncio.to_thread(self._run, _wsgi_environ(scope, body), send, asyncio.get_running_loop())
+
+    def _run(self, environ, send, loop):
+        def send_sync(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response = {"started": False}
+
+        def write(chunk):
+            if not response["started"]:
+                response["started"] = True
+                send_sync(response["start"])
+            if chunk:
+                send_sync({"type": "http.response.body", "body": chunk, "more_body": True})
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response["started"]:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response["start"] = {
+                "type": "http.response.start",
+                "status": int(status.split(" ", 1)[0]),
+                "headers": [(name.lower().encode("latin1"), value.encode("latin1")) for name, value in headers],
+            }
+            return write
+
+        iterable = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in iterable:
+                # Headers go out with the first non-empty chunk, so start_response can still change them
+                if chunk:
+                    write(chunk)
+            write(b"")
+            send_sync({"type": "http.response.body"})
+        finally:
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                close()
+
+
+class AsyncStudyPlannerApp:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = _WsgiBridge(flask_app)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        handler = None
+        if scope["type"] == "http":
+            handler = ASYNC_ROUTES.get((scope["method"], scope["path"]))
+        if handler is None:
+            # Everything else, including CORS preflight, is served by Flask
+            await self.wsgi(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        request = Request(scope, body)
+        ticket = None
+        if admission.ADMISSION_ENABLED and request.path in admission.ADMISSION_ROUTES:
+            ticket, rejection = await admission.admit_async(request.path, _client_ip(request), _user_id(request))
+            if rejection is not None:
+                await _send_json(send, rejection.payload, rejection.status, rejection.headers)
+                metrics.observe_request(request.method, request.path, rejection.status, time.perf_counter() - started)
+                return
+
+        try:
+            payload, status = await handler(request)
+        except Exception as e:
+            payload, status = {"error": str(e)}, 500
+        finally:
+            if ticket is not None:
+                await asyncio.to_thread(ticket.release)
+        await _send_json(send, payload, status)
+        metrics.observe_request(scope["method"], scope["path"], status, time.perf_counter() - started)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await upstreams.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_asgi_app():
+    return AsyncStudyPlannerApp(create_app())
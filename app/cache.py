@@ -0,0 +1,207 @@
+# app/cache.py
+
+import functools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.db import get_conn
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKEND = os.getenv("RESOURCE_CACHE_BACKEND", "memory")  # "memory" or "sqlite"
+CACHE_PATH = os.getenv("RESOURCE_CACHE_PATH", "data/resource_cache.db")
+CACHE_MAX_ENTRIES = int(os.getenv("RESOURCE_CACHE_MAX_ENTRIES", "2048"))
+
+
+def normalize_topic(topic):
+    """
+    Case-fold and collapse whitespace so "Machine  Learning" and
+    "machine learning" share one cache entry.
+    """
+    return " ".join(str(topic or "").casefold().split())
+
+
+class MemoryCache:
+    """
+    In-process LRU cache with per-entry expiry. Memory is bounded by
+    max_entries; the least recently used entry is evicted first.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (found, value)."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    On-disk cache so entries survive worker restarts and are shared by all
+    workers on the host. Values are stored as JSON. Rows are pruned by expiry
+    and, past max_entries, by least recent access.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._writes = 0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed_at)")
+
+    def _conn(self):
+        return get_conn(self.path)
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None:
+            return False, None
+        if row[1] < now:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            return False, None
+        conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return True, json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + ttl, now),
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._prune(now)
+
+    def _prune(self, now):
+        conn = self._conn()
+        conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+        conn.execute(
+            "DELETE FROM cache WHERE key IN ("
+            " SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache")
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+_backend = None
+_backend_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide cache backend, creating it on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if CACHE_BACKEND == "sqlite":
+                    _backend = SQLiteCache()
+                else:
+                    _backend = MemoryCache()
+    return _backend
+
+
+def set_cache(backend):
+    """Swap the cache backend (e.g. to a SQLiteCache at a custom path)."""
+    global _backend
+    _backend = backend
+
+
+def record_lookup(source, hit):
+    """Count a cache hit or miss for source."""
+    with _stats_lock:
+        counters = _stats.setdefault(source, {"hits": 0, "misses": 0})
+        counters["hits" if hit else "misses"] += 1
+
+
+def cache_stats():
+    """Return a snapshot of hit/miss counters per source."""
+    with _stats_lock:
+        return {source: dict(counters) for source, counters in _stats.items()}
+
+
+def topic_key(source, topic):
+    return f"{source}:{normalize_topic(topic)}"
+
+
+def cached_by_topic(source, ttl):
+    """
+    Decorator for fetch_*(query) functions. Results are keyed on the source
+    name and the normalized topic. Empty results are not cached so a
+    transient upstream failure is retried on the next request.
+    """
+
+    def decorator(fetch):
+        @functools.wraps(fetch)
+        def wrapper(query, *args, **kwargs):
+            key = topic_key(source, query)
+            cache = get_cache()
+            try:
+                found, value = cache.get(key)
+            except sqlite3.Error as e:
+                logger.warning("Cache read failed for %s: %s", key, e)
+                found, value = False, None
+            if found:
+                record_lookup(source, True)
+                return value
+
+            record_lookup(source, False)
+            value = fetch(query, *args, **kwargs)
+            if value:
+                try:
+                    cache.set(key, value, ttl)
+                except sqlite3.Error as e:
+                    logger.warning("Cache write failed for %s: %s", key, e)
+            return value
+
+        return wrapper
+
+    return decorator
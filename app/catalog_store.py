@@ -0,0 +1,106 @@
+# app/catalog_store.py
+"""
+Precomputed roadmaps and resource bundles for the topic catalog, kept in the
+study planner SQLite database. database/precompute.py writes them; the API
+reads them on a cache miss before generating anything on demand.
+"""
+
+import json
+import os
+import time
+
+from app.cache import normalize_topic
+from app.db import get_conn
+from app.roadmap_index import index_resources, index_roadmap
+
+# Precomputed entries older than this are ignored by the API (the job refreshes them)
+PRECOMPUTED_MAX_AGE_SECONDS = int(os.getenv("PRECOMPUTED_MAX_AGE_SECONDS", str(30 * 86400)))
+
+ROADMAPS = "roadmaps"
+RESOURCES = "resources"
+_TABLES = {ROADMAPS: "topic_roadmaps", RESOURCES: "topic_resources"}
+
+
+def save_roadmap(topic, model, roadmap):
+    get_conn().execute(
+        "INSERT OR REPLACE INTO topic_roadmaps (topic_key, topic, model, roadmap, generated_at) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (normalize_topic(topic), topic, model, roadmap, time.time()),
+    )
+    index_roadmap(topic, roadmap)
+    _clear_failure(topic, ROADMAPS)
+
+
+def save_resources(topic, payload):
+    get_conn().execute(
+        "INSERT OR REPLACE INTO topic_resources (topic_key, topic, payload, generated_at) VALUES (?, ?, ?, ?)",
+        (normalize_topic(topic), topic, json.dumps(payload), time.time()),
+    )
+    index_resources(topic, payload)
+    _clear_failure(topic, RESOURCES)
+
+
+def record_failure(topic, kind, error):
+    get_conn().execute(
+        "INSERT INTO precompute_failures (topic_key, kind, attempts, last_error, updated_at) "
+        "VALUES (?, ?, 1, ?, ?) "
+        "ON CONFLICT(topic_key, kind) DO UPDATE SET attempts = attempts + 1, "
+        "last_error = excluded.last_error, updated_at = excluded.updated_at",
+        (normalize_topic(topic), kind, str(error)[:500], time.time()),
+    )
+
+
+def _clear_failure(topic, kind):
+    get_conn().execute(
+        "DELETE FROM precompute_failures WHERE topic_key = ? AND kind = ?", (normalize_topic(topic), kind)
+    )
+
+
+def rename_topic(conn, old_topic, new_topic):
+    """
+    Move old_topic's stored results to new_topic within the caller's
+    transaction; results already stored under new_topic are kept.
+    """
+    old_key, new_key = normalize_topic(old_topic), normalize_topic(new_topic)
+    for table in _TABLES.values():
+        conn.execute(
+            f"UPDATE OR IGNORE {table} SET topic_key = ?, topic = ? WHERE topic_key = ?", (new_key, new_topic, old_key)
+        )
+    conn.execute("UPDATE OR IGNORE precompute_failures SET topic_key = ? WHERE topic_key = ?", (new_key, old_key))
+    if new_key != old_key:
+        for table in (*_TABLES.values(), "precompute_failures"):
+            conn.execute(f"DELETE FROM {table} WHERE topic_key = ?", (old_key,))
+
+
+def completed_keys(kind, since=0.0):
+    """Topic keys with a stored `kind` result generated at or after `since`."""
+    rows = get_conn().execute(f"SELECT topic_key FROM {_TABLES[kind]} WHERE generated_at >= ?", (since,))
+    return {row[0] for row in rows}
+
+
+def failure_attempts(kind):
+    """{topic_key: attempts} for topics whose last `kind` run failed."""
+    rows = get_conn().execute("SELECT topic_key, attempts FROM precompute_failures WHERE kind = ?", (kind,))
+    return dict(rows.fetchall())
+
+
+def _fresh_row(query, topic):
+    row = get_conn().execute(query, (normalize_topic(topic),)).fetchone()
+    if row is None or time.time() - row[-1] > PRECOMPUTED_MAX_AGE_SECONDS:
+        return None
+    return row
+
+
+def get_precomputed_roadmap(topic):
+    """(roadmap, generated_at) for a catalog topic, or None."""
+    return _fresh_row("SELECT roadmap, generated_at FROM topic_roadmaps WHERE topic_key = ?", topic)
+
+
+def get_precomputed_resources(topic):
+    """The stored /api/resources payload for a catalog topic, or None."""
+    row = _fresh_row("SELECT payload, generated_at FROM topic_resources WHERE topic_key = ?", topic)
+    if row is None:
+        return None
+    payload = json.loads(row[0])
+    payload["precomputed_at"] = row[1]
+    return payload
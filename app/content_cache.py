@@ -0,0 +1,105 @@
+# app/content_cache.py
+
+import hashlib
+import json
+import os
+import threading
+
+from app.cache import record_lookup
+
+CONTENT_CACHE_DIR = os.getenv("CONTENT_CACHE_DIR", "data/content_cache")
+CONTENT_CACHE_MAX_BYTES = int(os.getenv("CONTENT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Re-check the total size after this many writes
+_EVICT_EVERY = 50
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def derive_key(*parts):
+    """Combine a content digest with e.g. model and prompt version into one key."""
+    return hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+class ContentCache:
+    """
+    Content-addressed JSON values on disk, one file per key under
+    <root>/<namespace>/<key[:2]>/<key>.json. Reads refresh the file's mtime
+    and the least recently used files are evicted once the cache grows past
+    max_bytes. Writes go through a temp file and os.replace, so concurrent
+    workers never see a partial entry.
+    """
+
+    def __init__(self, root=CONTENT_CACHE_DIR, max_bytes=CONTENT_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, namespace, key):
+        return os.path.join(self.root, namespace, key[:2], f"{key}.json")
+
+    def get(self, namespace, key):
+        path = self._path(namespace, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            record_lookup(f"content_{namespace}", False)
+            return None
+        record_lookup(f"content_{namespace}", True)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, namespace, key, value):
+        path = self._path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._writes += 1
+            check = self._writes % _EVICT_EVERY == 1
+        if check:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes."""
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+_cache = ContentCache()
+
+
+def get_content_cache():
+    return _cache
@@ -0,0 +1,183 @@
+# app/db.py
+"""
+SQLite connection pool and schema migrations.
+
+Every SQLite file the app uses (study planner data, resumes, jobs, the
+resource cache) gets its connections from get_conn(path): one connection
+per thread and database, reopened after a fork, with the same tuned pragmas.
+Connections are in autocommit mode; use transaction() for multi-statement
+writes. sqlite3 keeps a per-connection cache of prepared statements keyed
+by SQL text, so queries are written as constant strings with parameters.
+
+The study planner database is versioned by the SQL files in
+database/migrations (NNNN_name.sql), applied in order by migrate().
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+logger = logging.getLogger(__name__)
+
+STUDY_PLANNER_DB = os.getenv("STUDY_PLANNER_DB", "database/study_planner.db")
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "migrations")
+# Memory-mapped reads; pages are shared with the OS page cache across workers
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+# Per-connection page cache, in KiB
+DB_CACHE_KB = int(os.getenv("DB_CACHE_KB", "16384"))
+DB_BUSY_TIMEOUT = float(os.getenv("DB_BUSY_TIMEOUT", "10"))
+# Prepared statements kept per connection (sqlite3's default is 128)
+DB_STATEMENT_CACHE = int(os.getenv("DB_STATEMENT_CACHE", "256"))
+# Rows per transaction in bulk_insert
+DB_BULK_CHUNK = int(os.getenv("DB_BULK_CHUNK", "5000"))
+
+_MIGRATION_RE = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+_local = threading.local()
+_migrate_lock = threading.Lock()
+_migrated = set()
+
+
+def connect(path):
+    """A new connection to path with the app's pragmas (autocommit mode)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(
+        path, timeout=DB_BUSY_TIMEOUT, isolation_level=None, cached_statements=DB_STATEMENT_CACHE
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size=-{DB_CACHE_KB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def _pooled(path):
+    # SQLite connections must not cross a fork (e.g. gunicorn --preload)
+    if getattr(_local, "pid", None) != os.getpid():
+        _local.pid = os.getpid()
+        _local.conns = {}
+    conn = _local.conns.get(path)
+    if conn is None:
+        conn = _local.conns[path] = connect(path)
+    return conn
+
+
+def get_conn(path=STUDY_PLANNER_DB):
+    """
+    This thread's pooled connection to path. The study planner database is
+    migrated on its first use in each process.
+    """
+    conn = _pooled(path)
+    if path == STUDY_PLANNER_DB and (os.getpid(), path) not in _migrated:
+        migrate(path=path)
+    return conn
+
+
+def close_thread_connections():
+    """Close this thread's pooled connections (e.g. when a worker thread exits)."""
+    if getattr(_local, "pid", None) == os.getpid():
+        for conn in _local.conns.values():
+            conn.close()
+        _local.conns = {}
+
+
+@contextmanager
+def transaction(conn):
+    """BEGIN IMMEDIATE ... COMMIT, rolled back if the block raises."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def bulk_insert(conn, sql, rows, chunk_size=None):
+    """
+    executemany(sql, rows) in transactions of chunk_size rows; rows may be
+    any iterable (e.g. a generator over a file). Returns the row count.
+    """
+    chunk_size = chunk_size or DB_BULK_CHUNK
+    rows = iter(rows)
+    total = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return total
+        with transaction(conn):
+            conn.executemany(sql, chunk)
+        total += len(chunk)
+
+
+def _split_statements(script):
+    """Split a migration file into statements (executescript would commit mid-migration)."""
+    statements, current = [], ""
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
+
+def available_migrations(directory=MIGRATIONS_DIR):
+    """[(version, name, path)] sorted by version."""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _MIGRATION_RE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    return sorted(migrations)
+
+
+def migrate(path=STUDY_PLANNER_DB, directory=MIGRATIONS_DIR):
+    """
+    Apply pending migrations in order, each in its own transaction, and
+    return the versions applied. BEGIN IMMEDIATE serializes workers that
+    start together; each re-checks a migration once it holds the write lock.
+    """
+    conn = _pooled(path)
+    with _migrate_lock:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " version INTEGER PRIMARY KEY,"
+            " name TEXT NOT NULL,"
+            " applied_at REAL NOT NULL)"
+        )
+        done = {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+        applied = []
+        for version, name, migration_path in available_migrations(directory):
+            if version in done:
+                continue
+            with open(migration_path, encoding="utf-8") as f:
+                statements = _split_statements(f.read())
+            with transaction(conn):
+                if conn.execute("SELECT 1 FROM schema_migrations WHERE version = ?", (version,)).fetchone():
+                    continue
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(
+                    "INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+                    (version, name, time.time()),
+                )
+            applied.append(version)
+            logger.info("Applied migration %04d_%s to %s", version, name, path)
+        _migrated.add((os.getpid(), path))
+        return applied
+
+
+def init_app(app):
+    """Bring the study planner database up to date when the app starts."""
+    migrate()
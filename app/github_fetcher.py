@@ -1,20 +1,26 @@
 import os
-import requests
+from app import http_client
+from app.cache import cached_by_topic
 
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+GITHUB_SEARCH_URL = os.getenv("GITHUB_SEARCH_URL", "https://api.github.com/search/repositories")
+# Read timeout so a slow GitHub search never pins a worker
+GITHUB_READ_TIMEOUT = float(os.getenv("GITHUB_READ_TIMEOUT", "4"))
+GITHUB_CACHE_TTL = int(os.getenv("GITHUB_CACHE_TTL", "3600"))
 
-def fetch_github_repos(query):
-    url = "https://api.github.com/search/repositories"
+
+def github_search_request(query):
+    """Return (params, headers) for a repository search."""
     params = {"q": query, "per_page": 5}
     headers = {
         "Accept": "application/vnd.github.v3+json",
     }
     if GITHUB_TOKEN:
         headers["Authorization"] = f"token {GITHUB_TOKEN}"
+    return params, headers
 
-    response = requests.get(url, params=params, headers=headers)
-    data = response.json()
 
+def parse_github_results(data):
     repos = []
     if "items" in data:
         repos = [
@@ -22,3 +28,17 @@ def fetch_github_repos(query):
             for item in data["items"]
         ]
     return repos
+
+
+@cached_by_topic("github", ttl=GITHUB_CACHE_TTL)
+def fetch_github_repos(query):
+    params, headers = github_search_request(query)
+    response = http_client.get(
+        GITHUB_SEARCH_URL,
+        params=params,
+        headers=headers,
+        read_timeout=GITHUB_READ_TIMEOUT,
+        retries=1,
+        upstream="github",
+    )
+    return parse_github_results(response.json())
@@ -0,0 +1,188 @@
+# app/http_client.py
+
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.metrics import observe_upstream, upstream_error_status
+
+CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", "10"))
+POOL_MAXSIZE = int(os.getenv("UPSTREAM_POOL_MAXSIZE", "32"))
+MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "2"))
+BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.25"))
+BACKOFF_MAX = float(os.getenv("UPSTREAM_BACKOFF_MAX", "4"))
+BREAKER_FAILURES = int(os.getenv("UPSTREAM_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("UPSTREAM_BREAKER_RESET_SECONDS", "30"))
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Other request errors (bad URL, too many redirects, a broken body) fail at once
+RETRYABLE_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling a host whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker. After `failures` failures in a row the
+    circuit opens and calls fail immediately for `reset_seconds`; then one
+    trial call is let through (half-open) and its outcome closes or reopens it.
+    """
+
+    def __init__(self, failures=BREAKER_FAILURES, reset_seconds=BREAKER_RESET_SECONDS):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self._consecutive = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+
+
+_sessions = {}
+_breakers = {}
+_lock = threading.Lock()
+_pid = None
+
+
+def host_of(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_session(url):
+    """
+    Return the keep-alive Session for url's host. Sessions are per process
+    (rebuilt after fork) and shared across threads.
+    """
+    global _pid
+    host = host_of(url)
+    with _lock:
+        if _pid != os.getpid():
+            _sessions.clear()
+            _pid = os.getpid()
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            # Retries are handled in request() so they can back off and feed the breaker
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+            session.mount(host, adapter)
+            _sessions[host] = session
+        return session
+
+
+def get_breaker(url):
+    host = host_of(url)
+    with _lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker()
+        return breaker
+
+
+def backoff(attempt, response=None):
+    """Full-jitter exponential backoff, honouring a short Retry-After."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def request(method, url, connect_timeout=None, read_timeout=None, retries=None, upstream=None, **kwargs):
+    """
+    Send an HTTP request through the pooled session for url's host.
+    Each attempt is timed under the `upstream` label (default: the host).
+
+    Connection errors, timeouts and RETRYABLE_STATUSES are retried up to
+    `retries` times with jittered exponential backoff. The last response is
+    returned even if its status is an error, so callers keep their own
+    status handling. Every exception counts as a breaker failure, so a
+    failed half-open trial always reopens the circuit. Raises
+    CircuitOpenError without sending anything while the host's breaker is open.
+    """
+    timeout = (
+        CONNECT_TIMEOUT if connect_timeout is None else connect_timeout,
+        READ_TIMEOUT if read_timeout is None else read_timeout,
+    )
+    retries = MAX_RETRIES if retries is None else retries
+    session = get_session(url)
+    breaker = get_breaker(url)
+    upstream = upstream or host_of(url)
+
+    for attempt in range(retries + 1):
+        if not breaker.allow():
+            observe_upstream(upstream, "circuit_open", 0.0)
+            raise CircuitOpenError(f"Circuit open for {host_of(url)}")
+
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except requests.exceptions.RequestException as e:
+            observe_upstream(upstream, upstream_error_status(e), time.perf_counter() - started)
+            breaker.record_failure()
+            if attempt >= retries or not isinstance(e, RETRYABLE_ERRORS):
+                raise
+            time.sleep(backoff(attempt))
+            continue
+        except BaseException:
+            breaker.record_failure()
+            raise
+
+        observe_upstream(upstream, response.status_code, time.perf_counter() - started)
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if response.status_code in RETRYABLE_STATUSES and attempt < retries:
+            time.sleep(backoff(attempt, response))
+            continue
+        return response
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
@@ -0,0 +1,184 @@
+# app/jobs.py
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.db import get_conn
+from app.resume_store import save_resume_text
+from app.resume_interview_engine import (
+    cache_resume_text,
+    extract_text_from_resume,
+    generate_interview_questions_cached,
+    get_cached_resume_text,
+)
+
+JOBS_DB = os.getenv("JOBS_DB_PATH", "data/jobs.db")
+# CPU-bound PDF/DOCX parsing runs in worker processes, LLM calls in threads
+EXTRACT_WORKERS = int(os.getenv("JOB_EXTRACT_WORKERS", "2"))
+LLM_WORKERS = int(os.getenv("JOB_LLM_WORKERS", "8"))
+# Finished jobs are kept this long for polling
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+# Jobs stuck in one stage this long lost their worker (restart, OOM) and are failed
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "900"))
+STALE_JOB_ERROR = "Job was interrupted before it finished; please submit it again"
+
+QUEUED = "queued"
+EXTRACTING = "extracting"
+GENERATING = "generating"
+DONE = "done"
+FAILED = "failed"
+
+_local = threading.local()
+_executor_lock = threading.Lock()
+_extract_pool = None
+_llm_pool = None
+_pool_pid = None
+
+
+def _conn():
+    """Pooled per-thread connection to the job table; job state is shared by all workers."""
+    conn = get_conn(JOBS_DB)
+    if getattr(_local, "pid", None) != os.getpid():
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        _local.pid = os.getpid()
+    return conn
+
+
+def _pools(reset=False):
+    """Create the executors lazily, once per process (or again after a crash)."""
+    global _extract_pool, _llm_pool, _pool_pid
+    with _executor_lock:
+        if reset and _extract_pool is not None:
+            _extract_pool.shutdown(wait=False)
+            context = multiprocessing.get_context("spawn")
+            _extract_pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS, mp_context=context)
+        if _pool_pid != os.getpid():
+            # spawn, not fork: the web worker is multi-threaded
+            context = multiprocessing.get_context("spawn")
+            _extract_pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS, mp_context=context)
+            _llm_pool = ThreadPoolExecutor(max_workers=LLM_WORKERS, thread_name_prefix="jobs-llm")
+            _pool_pid = os.getpid()
+        return _extract_pool, _llm_pool
+
+
+def _create(kind):
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    conn = _conn()
+    conn.execute(
+        "INSERT INTO jobs (id, kind, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+        (job_id, kind, QUEUED, now, now),
+    )
+    _fail_stale(conn, now)
+    conn.execute(
+        "DELETE FROM jobs WHERE updated_at < ? AND status IN (?, ?)",
+        (now - JOB_TTL_SECONDS, DONE, FAILED),
+    )
+    return job_id
+
+
+def _fail_stale(conn, now, job_id=None):
+    """Mark unfinished jobs (or just job_id) not updated for JOB_STALE_SECONDS as failed."""
+    conn.execute(
+        "UPDATE jobs SET status = ?, error = ?, updated_at = ? "
+        "WHERE updated_at < ? AND status IN (?, ?, ?) AND (? IS NULL OR id = ?)",
+        (FAILED, STALE_JOB_ERROR, now, now - JOB_STALE_SECONDS, QUEUED, EXTRACTING, GENERATING, job_id, job_id),
+    )
+
+
+def _update(job_id, status, result=None, error=None):
+    _conn().execute(
+        "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+        (status, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+    )
+
+
+def get_job(job_id):
+    """Return the job as a dict, or None if it is unknown or expired."""
+    conn = _conn()
+    _fail_stale(conn, time.time(), job_id)
+    row = conn.execute(
+        "SELECT id, kind, status, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+        (job_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    job = {
+        "id": row[0],
+        "kind": row[1],
+        "status": row[2],
+        "created_at": row[5],
+        "updated_at": row[6],
+    }
+    if row[3] is not None:
+        job["result"] = json.loads(row[3])
+    if row[4] is not None:
+        job["error"] = row[4]
+    return job
+
+
+def _generate_stage(job_id, resume_text, content_digest):
+    try:
+        qa = generate_interview_questions_cached(resume_text, content_digest)
+        _update(job_id, DONE, result={"questions": qa})
+    except Exception as e:
+        _update(job_id, FAILED, error=str(e))
+
+
+def submit_resume_job(user_id, filepath, content_digest):
+    """
+    Queue resume ingestion for an uploaded file and return the job id.
+
+    Stages: extract text in the process pool, save it to the resume store,
+    then generate interview Q&A in the thread pool. Uploads seen before
+    (same SHA-256) skip extraction, and their Q&A is reused. Progress and
+    the final {"questions": [...]} result are readable through get_job.
+    """
+    job_id = _create("interview_questions")
+    extract_pool, llm_pool = _pools()
+
+    def on_text(resume_text):
+        if isinstance(resume_text, str) and resume_text.startswith("Error reading resume:"):
+            _update(job_id, FAILED, error=resume_text)
+            return
+        save_resume_text(user_id, resume_text)
+        _update(job_id, GENERATING)
+        llm_pool.submit(_generate_stage, job_id, resume_text, content_digest)
+
+    def on_extracted(future):
+        try:
+            resume_text = future.result()
+            cache_resume_text(content_digest, resume_text)
+            on_text(resume_text)
+        except Exception as e:
+            _update(job_id, FAILED, error=str(e))
+
+    cached_text = get_cached_resume_text(content_digest)
+    if cached_text is not None:
+        on_text(cached_text)
+        return job_id
+
+    _update(job_id, EXTRACTING)
+    try:
+        future = extract_pool.submit(extract_text_from_resume, filepath)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM on a pathological PDF); start a fresh pool
+        extract_pool, llm_pool = _pools(reset=True)
+        future = extract_pool.submit(extract_text_from_resume, filepath)
+    future.add_done_callback(on_extracted)
+    return job_id
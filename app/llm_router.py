@@ -0,0 +1,514 @@
+# app/llm_router.py
+"""
+Routes chat completions over an ordered list of models.
+
+Each use (roadmap, interview) has its own route list, configured as
+comma-separated "provider:model[@timeout_seconds]" entries, e.g.
+
+    ROADMAP_MODELS="groq:llama3-8b-8192@30,groq:llama-3.1-8b-instant@30"
+
+The first healthy model is called. If it has not answered once its
+LLM_HEDGE_PERCENTILE latency has passed, a hedged duplicate goes to the
+next healthy model and the first successful reply wins. A failed call is
+replaced by the next model at once. Health is tracked per model: recent
+latencies for the hedge threshold and a circuit breaker that takes a
+failing model out of rotation for a while.
+
+Providers: "groq" (needs GROQ_API_KEY) and "stub", a deterministic offline
+model for tests and benchmarks. Others can be added with register_provider.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from types import SimpleNamespace
+
+from app.metrics import Counter, register_collector
+from app.prompt_builder import (
+    PROMPT_MAX_CONTINUATIONS,
+    complete_with_continuation,
+    continuation_messages,
+    reply_max_tokens,
+    stream_with_continuation,
+)
+from app.utils import acreate_completion, get_groq_client
+
+logger = logging.getLogger(__name__)
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_HEDGING = os.getenv("LLM_HEDGING", "1") != "0"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+# Until a model has this many samples, hedge after LLM_HEDGE_DEFAULT_DELAY seconds
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "10"))
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "3"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "60"))
+LLM_ROUTER_WORKERS = int(os.getenv("LLM_ROUTER_WORKERS", "16"))
+# Simulated latency of the stub provider, in seconds
+LLM_STUB_LATENCY = float(os.getenv("LLM_STUB_LATENCY", "0"))
+
+LLM_ROUTER_EVENTS = Counter(
+    "llm_router_events_total",
+    "Model router decisions: hedge, failover, skipped_unhealthy, hedge_won.",
+    ("router", "model", "event"),
+)
+
+_executor = ThreadPoolExecutor(max_workers=LLM_ROUTER_WORKERS, thread_name_prefix="llm-router")
+# Hedged async calls that lost the race keep running until they finish
+_background_tasks = set()
+
+
+class LLMUnavailable(RuntimeError):
+    """Every model in a route list failed or was out of rotation."""
+
+
+# === Providers ===
+
+_STUB_WORDS = "learn build practice review project deploy test design data model api".split()
+
+
+def stub_reply(messages):
+    """Deterministic reply in the format the prompt asks for."""
+    prompt = " ".join(m["content"] for m in messages if m["role"] != "assistant")
+    if "Q1:" in prompt:
+        return "\n".join(
+            f"Q{i}: Stub question {i} about the resume?\n"
+            f"A{i}: " + " ".join(_STUB_WORDS[(i + j) % len(_STUB_WORDS)] for j in range(40))
+            for i in range(1, 11)
+        )
+    return "\n".join(
+        f"- Step {i}: " + " ".join(_STUB_WORDS[(i + j) % len(_STUB_WORDS)] for j in range(10))
+        for i in range(1, 41)
+    )
+
+
+def _stub_response(messages, model, max_tokens):
+    reply = stub_reply(messages)
+    # Continue from where an earlier (cut-off) assistant turn stopped
+    done = "".join(m["content"] for m in messages if m["role"] == "assistant")
+    rest = reply[len(done):] if reply.startswith(done) else reply
+    words = rest.split(" ")
+    finish_reason = "stop"
+    if max_tokens and len(words) > max_tokens:
+        rest = " ".join(words[:max_tokens])
+        finish_reason = "length"
+    usage = SimpleNamespace(prompt_tokens=len(" ".join(m["content"] for m in messages).split()),
+                            completion_tokens=min(len(words), max_tokens or len(words)))
+    return rest, finish_reason, usage
+
+
+class _StubCompletions:
+    def create(self, messages, model="stub", max_tokens=None, stream=False, **kwargs):
+        if LLM_STUB_LATENCY:
+            time.sleep(LLM_STUB_LATENCY)
+        text, finish_reason, usage = _stub_response(messages, model, max_tokens)
+        if not stream:
+            return SimpleNamespace(
+                model=model,
+                usage=usage,
+                choices=[SimpleNamespace(message=SimpleNamespace(content=text), finish_reason=finish_reason)],
+            )
+        return self._stream(model, text, finish_reason, usage)
+
+    def _stream(self, model, text, finish_reason, usage):
+        for i in range(0, len(text), 40):
+            yield SimpleNamespace(
+                model=model, usage=None,
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=text[i:i + 40]), finish_reason=None)],
+            )
+        yield SimpleNamespace(
+            model=model, usage=usage,
+            choices=[SimpleNamespace(delta=SimpleNamespace(content=None), finish_reason=finish_reason)],
+        )
+
+
+class _AsyncStubCompletions:
+    async def create(self, messages, model="stub", max_tokens=None, **kwargs):
+        if LLM_STUB_LATENCY:
+            await asyncio.sleep(LLM_STUB_LATENCY)
+        text, finish_reason, usage = _stub_response(messages, model, max_tokens)
+        return SimpleNamespace(
+            model=model,
+            usage=usage,
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text), finish_reason=finish_reason)],
+        )
+
+
+class StubClient:
+    """Offline stand-in with the chat.completions.create interface of the Groq SDK."""
+
+    def __init__(self, asynchronous=False):
+        self.chat = SimpleNamespace(completions=_AsyncStubCompletions() if asynchronous else _StubCompletions())
+
+
+_providers = {}
+
+
+def register_provider(name, client_factory, async_client_factory=None, is_configured=None):
+    """
+    Make `name` usable in route specs. client_factory() returns an object
+    with chat.completions.create (Groq/OpenAI SDK style); is_configured()
+    says whether the provider can be called at all (e.g. has an API key).
+    """
+    _providers[name] = SimpleNamespace(
+        client=client_factory,
+        async_client=async_client_factory,
+        is_configured=is_configured or (lambda: True),
+    )
+
+
+register_provider("groq", get_groq_client, is_configured=lambda: bool(os.getenv("GROQ_API_KEY")))
+register_provider("stub", StubClient, lambda: StubClient(asynchronous=True))
+
+
+# === Health ===
+
+class ModelHealth:
+    """Recent latencies and a circuit breaker for one provider/model pair."""
+
+    def __init__(self):
+        # Imported here so the app factory does not load requests
+        from app.http_client import CircuitBreaker
+
+        self.breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SECONDS)
+        self.latencies = deque(maxlen=LLM_LATENCY_WINDOW)
+        self.successes = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def record_success(self, seconds):
+        self.breaker.record_success()
+        with self._lock:
+            self.latencies.append(seconds)
+            self.successes += 1
+
+    def record_failure(self):
+        self.breaker.record_failure()
+        with self._lock:
+            self.failures += 1
+
+    def hedge_delay(self):
+        with self._lock:
+            samples = sorted(self.latencies)
+        if len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_DEFAULT_DELAY
+        index = min(len(samples) - 1, int(len(samples) * LLM_HEDGE_PERCENTILE / 100))
+        return samples[index]
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self.latencies)
+            successes, failures = self.successes, self.failures
+        return {
+            "state": self.breaker.state,
+            "successes": successes,
+            "failures": failures,
+            "p50_seconds": round(samples[len(samples) // 2], 3) if samples else None,
+            "hedge_after_seconds": round(self.hedge_delay(), 3),
+        }
+
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+def get_health(provider, model):
+    key = (provider, model)
+    with _health_lock:
+        health = _health.get(key)
+        if health is None:
+            health = _health[key] = ModelHealth()
+        return health
+
+
+def health_report():
+    """{"provider:model": snapshot} for every model called so far."""
+    with _health_lock:
+        items = list(_health.items())
+    return {f"{provider}:{model}": health.snapshot() for (provider, model), health in items}
+
+
+def _render_health():
+    lines = [
+        "# HELP llm_model_up 1 while a model's circuit breaker is closed.",
+        "# TYPE llm_model_up gauge",
+    ]
+    for name, snapshot in sorted(health_report().items()):
+        lines.append(f'llm_model_up{{model="{name}"}} {1 if snapshot["state"] == "closed" else 0}')
+    return lines
+
+
+register_collector(_render_health)
+
+
+# === Routing ===
+
+class ModelRoute:
+    def __init__(self, provider, model, timeout=LLM_TIMEOUT):
+        self.provider = provider
+        self.model = model
+        self.timeout = timeout
+
+    @classmethod
+    def parse(cls, spec):
+        """'provider:model[@timeout]'; a bare model name means groq."""
+        spec = spec.strip()
+        timeout = LLM_TIMEOUT
+        if "@" in spec:
+            spec, _, seconds = spec.rpartition("@")
+            timeout = float(seconds)
+        provider, sep, model = spec.partition(":")
+        if not sep:
+            provider, model = "groq", spec
+        return cls(provider, model, timeout)
+
+    @property
+    def name(self):
+        return f"{self.provider}:{self.model}"
+
+    @property
+    def health(self):
+        return get_health(self.provider, self.model)
+
+    def __repr__(self):
+        return f"ModelRoute({self.name}@{self.timeout})"
+
+
+class ModelRouter:
+    def __init__(self, name, routes):
+        self.name = name
+        self.routes = list(routes)
+
+    @classmethod
+    def from_spec(cls, name, spec):
+        return cls(name, [ModelRoute.parse(part) for part in spec.split(",") if part.strip()])
+
+    @property
+    def primary_model(self):
+        return self.routes[0].model if self.routes else None
+
+    def available(self):
+        """True if at least one route's provider is configured."""
+        return any(self._provider(route).is_configured() for route in self.routes)
+
+    def _provider(self, route):
+        provider = _providers.get(route.provider)
+        if provider is None:
+            raise LLMUnavailable(f"Unknown LLM provider {route.provider!r}")
+        return provider
+
+    def _event(self, route, event):
+        LLM_ROUTER_EVENTS.inc(router=self.name, model=route.name, event=event)
+
+    def _next_route(self, queue, usable=None):
+        """Pop the next configured route whose breaker lets a call through."""
+        while queue:
+            route = queue.popleft()
+            if not self._provider(route).is_configured() or (usable and not usable(route)):
+                continue
+            if route.health.breaker.allow():
+                return route
+            self._event(route, "skipped_unhealthy")
+        return None
+
+    def _call(self, route, messages, max_tokens, kwargs):
+        started = time.perf_counter()
+        try:
+            result = complete_with_continuation(
+                self._provider(route).client(),
+                messages,
+                max_tokens,
+                model=route.model,
+                timeout=route.timeout,
+                upstream=route.provider,
+                **kwargs,
+            )
+        except Exception:
+            route.health.record_failure()
+            raise
+        route.health.record_success(time.perf_counter() - started)
+        return result
+
+    def complete(self, messages, max_tokens, **kwargs):
+        """
+        Returns (text, finish_reason, model) from the first model to answer.
+        Raises LLMUnavailable when every model failed or was skipped.
+        """
+        queue = deque(self.routes)
+        pending = {}
+        errors = []
+
+        def launch():
+            route = self._next_route(queue)
+            if route is not None:
+                pending[_executor.submit(self._call, route, messages, max_tokens, kwargs)] = route
+            return route
+
+        hedges = set()
+        launch()
+        while pending:
+            hedge_delay = None
+            if LLM_HEDGING and len(pending) == 1 and queue:
+                (only,) = pending.values()
+                hedge_delay = max(0.0, only.health.hedge_delay())
+            done, _ = wait(pending, timeout=hedge_delay, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = launch()
+                if hedged is not None:
+                    hedges.add(hedged)
+                    self._event(hedged, "hedge")
+                continue
+            failed = 0
+            for future in done:
+                route = pending.pop(future)
+                try:
+                    text, finish_reason = future.result()
+                except Exception as e:
+                    logger.warning("LLM %s failed: %s", route.name, e)
+                    errors.append(f"{route.name}: {e}")
+                    failed += 1
+                    continue
+                # Slower duplicates still finish in the background; their
+                # outcome only feeds model health
+                if route in hedges:
+                    self._event(route, "hedge_won")
+                return text, finish_reason, route.model
+            # Replace each failed call at once, even while a hedge is still running
+            for _ in range(failed):
+                route = launch()
+                if route is None:
+                    break
+                self._event(route, "failover")
+        raise LLMUnavailable("; ".join(errors) or f"No healthy model for {self.name}")
+
+    def stream(self, messages, max_tokens, **kwargs):
+        """
+        Yield reply lines from the first model whose stream produces one.
+        A model that fails before its first line is skipped; an error after
+        lines were yielded is raised to the caller. Streams are not hedged.
+        """
+        queue = deque(self.routes)
+        errors = []
+        while True:
+            route = self._next_route(queue)
+            if route is None:
+                raise LLMUnavailable("; ".join(errors) or f"No healthy model for {self.name}")
+            if errors:
+                self._event(route, "failover")
+            started = time.perf_counter()
+            lines = stream_with_continuation(
+                self._provider(route).client(),
+                messages,
+                max_tokens,
+                model=route.model,
+                timeout=route.timeout,
+                upstream=route.provider,
+                **kwargs,
+            )
+            yielded = False
+            try:
+                for line in lines:
+                    yielded = True
+                    yield line
+            except GeneratorExit:
+                # The consumer stopped reading; the model itself was fine
+                route.health.record_success(time.perf_counter() - started)
+                raise
+            except Exception as e:
+                route.health.record_failure()
+                if yielded:
+                    raise
+                logger.warning("LLM %s stream failed: %s", route.name, e)
+                errors.append(f"{route.name}: {e}")
+                continue
+            route.health.record_success(time.perf_counter() - started)
+            return
+
+    async def _acall(self, route, client, messages, max_tokens, kwargs):
+        started = time.perf_counter()
+        text = ""
+        request = list(messages)
+        try:
+            for attempt in range(PROMPT_MAX_CONTINUATIONS + 1):
+                response = await acreate_completion(
+                    client,
+                    messages=request,
+                    max_tokens=reply_max_tokens(request, max_tokens),
+                    model=route.model,
+                    timeout=route.timeout,
+                    upstream=route.provider,
+                    **kwargs,
+                )
+                choice = response.choices[0]
+                text += choice.message.content or ""
+                if choice.finish_reason != "length":
+                    break
+                request = continuation_messages(messages, text)
+        except Exception:
+            route.health.record_failure()
+            raise
+        route.health.record_success(time.perf_counter() - started)
+        return text, choice.finish_reason
+
+    async def acomplete(self, messages, max_tokens, clients=None, **kwargs):
+        """
+        Async complete(). `clients` maps provider name to an async client
+        (e.g. the ASGI app's shared AsyncGroq); other providers use their
+        registered async factory, and are skipped if they have none.
+        """
+        clients = clients or {}
+        queue = deque(self.routes)
+        pending = {}
+        errors = []
+
+        def usable(route):
+            return route.provider in clients or self._provider(route).async_client is not None
+
+        def launch():
+            route = self._next_route(queue, usable)
+            if route is not None:
+                client = clients.get(route.provider) or self._provider(route).async_client()
+                task = asyncio.ensure_future(self._acall(route, client, messages, max_tokens, kwargs))
+                pending[task] = route
+            return route
+
+        hedges = set()
+        launch()
+        while pending:
+            hedge_delay = None
+            if LLM_HEDGING and len(pending) == 1 and queue:
+                (only,) = pending.values()
+                hedge_delay = max(0.0, only.health.hedge_delay())
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                hedged = launch()
+                if hedged is not None:
+                    hedges.add(hedged)
+                    self._event(hedged, "hedge")
+                continue
+            for task in done:
+                route = pending.pop(task)
+                try:
+                    text, finish_reason = task.result()
+                except Exception as e:
+                    logger.warning("LLM %s failed: %s", route.name, e)
+                    errors.append(f"{route.name}: {e}")
+                    continue
+                if route in hedges:
+                    self._event(route, "hedge_won")
+                # As in complete(), the slower duplicate runs to completion
+                # so its outcome still feeds model health
+                for other in pending:
+                    _background_tasks.add(other)
+                    other.add_done_callback(_background_tasks.discard)
+                return text, finish_reason, route.model
+            if not pending:
+                route = launch()
+                if route is not None:
+                    self._event(route, "failover")
+        raise LLMUnavailable("; ".join(errors) or f"No healthy model for {self.name}")
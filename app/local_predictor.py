@@ -0,0 +1,282 @@
+# app/local_predictor.py
+
+import atexit
+import json
+import logging
+import math
+import os
+import threading
+
+import numpy as np
+
+from app.utils import ActivityLogWriter, iter_user_activity
+
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = os.getenv("STUDY_MODEL_PATH", "data/study_time_model.json")
+OUTCOME_LOG_PATH = os.getenv("STUDY_OUTCOME_LOG_PATH", "data/study_outcomes.jsonl")
+MIN_TRAINING_ROWS = int(os.getenv("STUDY_MODEL_MIN_ROWS", "30"))
+RIDGE_LAMBDA = float(os.getenv("STUDY_MODEL_RIDGE", "1.0"))
+
+# The 13 inputs accepted by /api/predict, in model column order, with defaults
+FEATURES = [
+    ("failures", 0),
+    ("higher", 0),
+    ("absences", 0),
+    ("freetime", 3),
+    ("goout", 3),
+    ("famrel", 3),
+    ("famsup", 0),
+    ("schoolsup", 0),
+    ("paid", 0),
+    ("traveltime", 2),
+    ("health", 3),
+    ("internet", 1),
+    ("age", 18),
+]
+FEATURE_NAMES = [name for name, _ in FEATURES]
+FEATURE_DEFAULTS = np.array([default for _, default in FEATURES], dtype=np.float64)
+AGE_COLUMN = FEATURE_NAMES.index("age")
+
+MIN_HOURS = 0.25
+MAX_HOURS = 8.0
+# Logged outcomes outside this range are rejected (and skipped when retraining)
+MAX_OUTCOME_HOURS = 24.0
+
+# Coefficients of the hand-tuned heuristic that used to live in routes.py;
+# used until a model has been trained from logged outcomes.
+DEFAULT_MODEL = {
+    "version": 0,
+    "intercept": -0.4,
+    "coefficients": {
+        "failures": -0.20,
+        "higher": 0.30,
+        "absences": -0.05,
+        "freetime": 0.8,
+        "goout": -0.10,
+        "famrel": 0.10,
+        "famsup": 0.05,
+        "schoolsup": 0.03,
+        "paid": 0.02,
+        "traveltime": -0.15,
+        "health": 0.20,
+        "internet": 0.20,
+        "age": 0.02,
+    },
+    "trained_rows": 0,
+}
+
+
+class FeatureError(ValueError):
+    """A request body or feature value the model cannot use; field names the feature, if any."""
+
+    def __init__(self, message, field=None):
+        super().__init__(message)
+        self.field = field
+
+
+def features_from_dict(data):
+    """
+    Parse one request body into a feature row. Missing or falsy values take
+    the default, matching the old fallback heuristic; other values must be
+    finite numbers (truncated, as in frame_to_features). Raises FeatureError.
+    """
+    if not isinstance(data, dict):
+        raise FeatureError("Expected a JSON object of feature values")
+    row = []
+    for name, default in FEATURES:
+        value = data.get(name, default) or default
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            number = math.nan
+        if not math.isfinite(number):
+            raise FeatureError(f"{name} must be a finite number, got {value!r}", name)
+        row.append(int(number))
+    return row
+
+
+def _transform(X):
+    """Raw feature matrix -> model design matrix (age becomes closeness to 18)."""
+    X = np.asarray(X, dtype=np.float64)
+    X = X.copy()
+    X[:, AGE_COLUMN] = np.maximum(0.0, 25.0 - np.abs(X[:, AGE_COLUMN] - 18.0))
+    return X
+
+
+class StudyTimeModel:
+    """Linear model over the 13 study features, serialized as JSON."""
+
+    def __init__(self, params):
+        self.params = params
+        self.intercept = float(params["intercept"])
+        self.weights = np.array(
+            [float(params["coefficients"].get(name, 0.0)) for name in FEATURE_NAMES]
+        )
+
+    def predict(self, X):
+        """Predicted hours/day for each row of the (n, 13) raw feature matrix."""
+        hours = _transform(X) @ self.weights + self.intercept
+        return np.clip(np.round(hours, 2), MIN_HOURS, MAX_HOURS)
+
+    def predict_one(self, data):
+        return float(self.predict([features_from_dict(data)])[0])
+
+
+def frame_to_features(df):
+    """
+    Vectorized validation of a batch of feature rows.
+
+    Returns (X, valid) where X is the (n, 13) feature matrix and valid is a
+    boolean mask of rows whose values were all finite numbers. Missing,
+    empty and zero values take the feature default, as in features_from_dict.
+    """
+    import pandas as pd
+
+    columns = []
+    valid = np.ones(len(df), dtype=bool)
+    for name, default in FEATURES:
+        if name in df.columns:
+            raw = df[name]
+            values = pd.to_numeric(raw, errors="coerce")
+            # A value that is present but not numeric makes the row invalid;
+            # blank strings count as missing
+            bad = (values.isna() & raw.notna()).to_numpy(copy=True)
+            if bad.any():
+                bad[bad] = raw[bad].astype(str).str.strip().to_numpy() != ""
+                valid &= ~bad
+            values = values.fillna(default).to_numpy(dtype=np.float64)
+            values = np.trunc(values)
+            values[values == 0] = default
+        else:
+            values = np.full(len(df), default, dtype=np.float64)
+        columns.append(values)
+    X = np.column_stack(columns) if columns else np.empty((0, len(FEATURES)))
+    # "inf" and 1e400 parse as numbers but have no prediction
+    valid &= np.isfinite(X).all(axis=1)
+    return X, valid
+
+
+_model = None
+_model_mtime = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """
+    Return the current model, reloading it when the file on disk changes
+    (e.g. after retraining in another worker).
+    """
+    global _model, _model_mtime
+    try:
+        mtime = os.path.getmtime(MODEL_PATH)
+    except OSError:
+        mtime = None
+
+    if _model is None or mtime != _model_mtime:
+        with _model_lock:
+            params = DEFAULT_MODEL
+            if mtime is not None:
+                try:
+                    with open(MODEL_PATH, "r") as f:
+                        params = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.error("Could not load study time model, using defaults: %s", e)
+            _model = StudyTimeModel(params)
+            _model_mtime = mtime
+    return _model
+
+
+def predict_hours(data):
+    """Predict hours/day for one request body."""
+    return get_model().predict_one(data)
+
+
+def prediction_payload(data, note):
+    """The /api/predict response body for a prediction made in-process."""
+    return {
+        "predicted_hours": predict_hours(data),
+        "confidence_level": "60%",
+        "key_influencing_factors": [
+            "Free time",
+            "Health",
+            "Travel time",
+            "Failures/absences",
+        ],
+        "recommendation": (
+            "Focus on consistent short study blocks. Reduce distractions and align study windows with high energy periods."
+        ),
+        "note": note,
+    }
+
+
+_outcome_writer = ActivityLogWriter(path=OUTCOME_LOG_PATH)
+atexit.register(_outcome_writer.close)
+
+
+def outcome_hours(value):
+    """Observed hours/day as a float; raises ValueError unless finite and within 0-24."""
+    hours = float(value)
+    if not math.isfinite(hours) or not 0 <= hours <= MAX_OUTCOME_HOURS:
+        raise ValueError(f"actual_hours must be between 0 and {MAX_OUTCOME_HOURS:g}, got {value!r}")
+    return hours
+
+
+def log_outcome(data, actual_hours):
+    """Record the observed study hours for a feature row, for retraining."""
+    record = dict(zip(FEATURE_NAMES, features_from_dict(data)))
+    record["actual_hours"] = outcome_hours(actual_hours)
+    _outcome_writer.append(record)
+
+
+def fit(X, y, ridge=RIDGE_LAMBDA):
+    """Ridge regression on the transformed features; returns model params."""
+    design = _transform(X)
+    mean = design.mean(axis=0)
+    centered = design - mean
+    y = np.asarray(y, dtype=np.float64)
+    y_mean = y.mean()
+    gram = centered.T @ centered + ridge * np.eye(design.shape[1])
+    weights = np.linalg.solve(gram, centered.T @ (y - y_mean))
+    intercept = y_mean - mean @ weights
+    return {
+        "intercept": float(intercept),
+        "coefficients": {name: float(w) for name, w in zip(FEATURE_NAMES, weights)},
+        "trained_rows": int(len(y)),
+    }
+
+
+def retrain(min_rows=MIN_TRAINING_ROWS):
+    """
+    Rebuild the model from the logged outcomes and atomically replace the
+    model file. Returns False (keeping the current model) when there are
+    fewer than min_rows outcomes.
+    """
+    _outcome_writer.flush()
+    rows = []
+    targets = []
+    for record in iter_user_activity(OUTCOME_LOG_PATH):
+        try:
+            row = features_from_dict(record)
+            target = outcome_hours(record["actual_hours"])
+        except (KeyError, TypeError, ValueError, OverflowError):
+            continue
+        rows.append(row)
+        targets.append(target)
+
+    if len(rows) < min_rows:
+        logger.info("Not retraining: %d outcomes logged, need %d", len(rows), min_rows)
+        return False
+
+    params = fit(np.array(rows), np.array(targets))
+    params["version"] = int(get_model().params.get("version", 0)) + 1
+
+    directory = os.path.dirname(MODEL_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{MODEL_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(params, f, indent=2)
+    os.replace(tmp_path, MODEL_PATH)
+    logger.info("Retrained study time model v%s on %d outcomes", params["version"], len(rows))
+    return True
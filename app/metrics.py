@@ -0,0 +1,244 @@
+# app/metrics.py
+"""
+In-process request, upstream, cache and LLM token metrics, rendered in the
+Prometheus text exposition format by the /metrics route.
+
+Values live in the serving process. Under gunicorn with several workers a
+scrape reports the worker that answered it, so scrape each worker (or run
+one worker per container) when exact totals matter.
+"""
+
+import os
+import threading
+import time
+
+from app.cache import cache_stats
+
+# Seconds; spans cache hits (~ms) through slow LLM completions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+
+_METRICS = []
+# Callables returning extra exposition lines, rendered at scrape time
+_collectors = []
+
+
+def _register(metric):
+    _METRICS.append(metric)
+
+
+def register_collector(collect):
+    """Add a function returning exposition lines (e.g. gauges read on scrape)."""
+    _collectors.append(collect)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{_escape(v)}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _register(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; one set of buckets per label combination."""
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+        _register(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [per-bucket counts..., +Inf count, sum]
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = (("le", _format_value(bound)),)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(series[-1], 6))}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to the end of its response body.",
+    ("method", "route", "status"),
+)
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    "upstream_request_duration_seconds",
+    "Duration of each call (each retry attempt) to an upstream service.",
+    ("upstream", "status"),
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens reported in the usage of LLM completions.",
+    ("model", "kind"),
+)
+
+
+
+def observe_request(method, route, status, seconds):
+    if METRICS_ENABLED:
+        HTTP_REQUEST_SECONDS.observe(seconds, method=method, route=route, status=status)
+
+
+def observe_upstream(upstream, status, seconds):
+    """status is the HTTP status code, or 'timeout', 'error' or 'circuit_open'."""
+    if METRICS_ENABLED:
+        UPSTREAM_REQUEST_SECONDS.observe(seconds, upstream=upstream, status=status)
+
+
+def upstream_error_status(exc):
+    """Status label for a failed upstream call (requests, httpx and Groq SDK errors)."""
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    if status_code is not None:
+        return str(status_code)
+    return "timeout" if "timeout" in type(exc).__name__.lower() else "error"
+
+
+def record_token_usage(model, usage):
+    """Count prompt/completion tokens from a completion's usage object (may be None)."""
+    if not METRICS_ENABLED or usage is None:
+        return
+    for kind in ("prompt", "completion"):
+        tokens = getattr(usage, f"{kind}_tokens", None)
+        if tokens:
+            LLM_TOKENS.inc(tokens, model=model, kind=kind)
+
+
+def _render_cache_stats():
+    stats = cache_stats()
+    lines = [
+        "# HELP cache_lookups_total Cache lookups per source and result.",
+        "# TYPE cache_lookups_total counter",
+    ]
+    for source, counters in sorted(stats.items()):
+        for result, field in (("hit", "hits"), ("miss", "misses")):
+            lines.append(f"cache_lookups_total{_format_labels(('source', 'result'), (source, result))} {counters[field]}")
+    lines += [
+        "# HELP cache_hit_ratio Share of cache lookups that were hits since process start.",
+        "# TYPE cache_hit_ratio gauge",
+    ]
+    for source, counters in sorted(stats.items()):
+        total = counters["hits"] + counters["misses"]
+        if total:
+            lines.append(f"cache_hit_ratio{_format_labels(('source',), (source,))} {round(counters['hits'] / total, 4)}")
+    return lines
+
+
+def render():
+    lines = []
+    for metric in _METRICS:
+        lines += metric.render()
+    lines += _render_cache_stats()
+    for collect in _collectors:
+        lines += collect()
+    return "\n".join(lines) + "\n"
+
+
+class UpstreamTimer:
+    """
+    Context manager that records one upstream call:
+
+        with UpstreamTimer("groq") as call:
+            response = client.chat.completions.create(...)
+
+    The call counts as status 200 unless `call.status` is changed; an
+    exception leaving the block is labelled via upstream_error_status.
+    """
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+        self.status = 200
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        status = upstream_error_status(exc) if exc is not None else self.status
+        observe_upstream(self.upstream, status, time.perf_counter() - self._started)
+        return False
+
+
+def init_app(app):
+    """Time every request served by the Flask app, labelled by its URL rule."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record(response):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+        rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        method = request.method
+        status = response.status_code
+        # Streamed bodies finish after this hook; the WSGI server closes the
+        # response once the last chunk is sent, so measure at close
+        response.call_on_close(
+            lambda: observe_request(method, rule, status, time.perf_counter() - started)
+        )
+        return response
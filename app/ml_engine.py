@@ -1,8 +1,26 @@
-import requests
+import os
 import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from app import http_client
+from app import local_predictor
+
+logger = logging.getLogger(__name__)
 
 # === External API Configuration ===
-EXTERNAL_API_URL = "https://study-time-predicter-api-1.onrender.com/predict"
+EXTERNAL_API_URL = os.getenv("PREDICTOR_API_URL", "https://study-time-predicter-api-1.onrender.com/predict")
+# onrender free instances can take a while to wake up from a cold start
+PREDICTOR_READ_TIMEOUT = float(os.getenv("PREDICTOR_READ_TIMEOUT", "20"))
+PREDICTOR_RETRIES = int(os.getenv("PREDICTOR_RETRIES", "1"))
+# "remote": external API first, in-process model as fallback
+# "local": in-process model only
+# "shadow": serve the in-process model, call the external API in the background for comparison
+PREDICTOR_MODE = os.getenv("PREDICTOR_MODE", "remote")
+
+_shadow_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="predict-shadow")
 
 # === Prediction Function ===
 def predict_study_time(data):
@@ -37,12 +55,17 @@ def predict_study_time(data):
             "age": 18  # Default value
         }
 
+        if PREDICTOR_MODE == "local":
+            return max(0, local_predictor.predict_hours(api_data) * 60)
+
         # Make request to external API
-        response = requests.post(
+        response = http_client.post(
             EXTERNAL_API_URL,
             headers={"Content-Type": "application/json"},
             json=api_data,
-            timeout=30
+            read_timeout=PREDICTOR_READ_TIMEOUT,
+            retries=PREDICTOR_RETRIES,
+            upstream="predictor",
         )
 
         if response.status_code != 200:
@@ -64,11 +87,33 @@ def predict_study_time(data):
     except Exception as e:
         raise RuntimeError(f"Prediction failed: {e}")
 
-# === Legacy Retraining Function (No longer needed) ===
+def _compare_with_remote(data, local_hours):
+    try:
+        response = http_client.post(
+            EXTERNAL_API_URL,
+            headers={"Content-Type": "application/json"},
+            json=data,
+            read_timeout=PREDICTOR_READ_TIMEOUT,
+            retries=0,
+            upstream="predictor",
+        )
+        result = response.json()
+        remote_hours = float(result.get("predicted_study_time", result.get("predicted_hours", 0)))
+        logger.info("Shadow prediction: local=%.2fh remote=%.2fh", local_hours, remote_hours)
+    except Exception as e:
+        logger.info("Shadow prediction failed: %s", e)
+
+
+def shadow_predict(data):
+    """Fire-and-forget remote prediction for comparison with the local model."""
+    local_hours = local_predictor.predict_hours(data)
+    _shadow_executor.submit(_compare_with_remote, dict(data), local_hours)
+
+
+# === Retraining ===
 def retrain_model():
     """
-    This function is no longer needed as we use external API.
-    Kept for backward compatibility.
+    Rebuild the in-process study time model from logged outcomes.
+    Returns True when a new model was written.
     """
-    print("ℹ️ Retraining is not needed - using external API for predictions")
-    return True
+    return local_predictor.retrain()
@@ -0,0 +1,214 @@
+# app/prompt_builder.py
+"""
+Prompt assembly under a token budget, shared by the roadmap and interview
+generators.
+
+Tokens are estimated locally (no tokenizer download, no API call). The
+estimate errs on the high side for English text so packed prompts stay
+inside the model's context window.
+"""
+
+import math
+import os
+import re
+
+from app.utils import create_completion, iter_completion_lines
+
+# Context window of the smallest model we call (llama3-8b-8192)
+PROMPT_CONTEXT_TOKENS = int(os.getenv("PROMPT_CONTEXT_TOKENS", "8192"))
+# Upper bound for any single reply, whatever a caller asks for
+PROMPT_MAX_OUTPUT_TOKENS = int(os.getenv("PROMPT_MAX_OUTPUT_TOKENS", "6000"))
+# Follow-up calls made when a reply stops with finish_reason "length"
+PROMPT_MAX_CONTINUATIONS = int(os.getenv("PROMPT_MAX_CONTINUATIONS", "2"))
+# Chat formatting overhead per message, and slack for estimation error
+_MESSAGE_OVERHEAD = 4
+_SAFETY_TOKENS = 128
+_MIN_REPLY_TOKENS = 256
+
+TOKENS_PER_WORD = 1.35
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+CONTINUE_PROMPT = (
+    "Your previous reply was cut off. Continue exactly where it stopped, "
+    "in the same format, without repeating anything already written."
+)
+
+# Resume headings we recognise, mapped to a canonical section name
+_SECTION_KEYWORDS = (
+    ("skills", r"skills|competencies|technologies|tech stack|tools"),
+    ("projects", r"projects?"),
+    ("experience", r"experience|employment|work history|internships?"),
+    ("education", r"education|academics?|qualifications?"),
+    ("certifications", r"certifications?|courses|licenses"),
+    ("achievements", r"achievements?|awards|honou?rs"),
+    ("summary", r"summary|objective|profile|about me"),
+)
+_SECTION_RES = [(name, re.compile(rf"\b(?:{pattern})\b")) for name, pattern in _SECTION_KEYWORDS]
+RESUME_SECTION_PRIORITY = ("skills", "projects", "experience", "summary")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate BPE token count: one token per punctuation mark and one per
+    four characters of each word (so short words count as one token).
+    """
+    return sum(math.ceil(len(piece) / 4) for piece in _TOKEN_RE.findall(text or ""))
+
+
+def estimate_message_tokens(messages) -> int:
+    return sum(estimate_tokens(m["content"]) + _MESSAGE_OVERHEAD for m in messages)
+
+
+def words_to_tokens(words: int) -> int:
+    return math.ceil(words * TOKENS_PER_WORD)
+
+
+def reply_max_tokens(messages, wanted: int) -> int:
+    """
+    max_tokens for a reply expected to need `wanted` tokens, clamped to what
+    is left of the context window after the prompt.
+    """
+    available = PROMPT_CONTEXT_TOKENS - estimate_message_tokens(messages) - _SAFETY_TOKENS
+    return max(_MIN_REPLY_TOKENS, min(wanted, PROMPT_MAX_OUTPUT_TOKENS, available))
+
+
+def prompt_budget(scaffold: str, reply_tokens: int, cap: int) -> int:
+    """Tokens left for variable content inside `scaffold` (at most `cap`)."""
+    used = estimate_tokens(scaffold) + _MESSAGE_OVERHEAD + reply_tokens + _SAFETY_TOKENS
+    return max(0, min(cap, PROMPT_CONTEXT_TOKENS - used))
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Keep whole lines from the start of text while they fit, then whole words."""
+    kept = []
+    used = 0
+    for line in text.split("\n"):
+        cost = estimate_tokens(line) + 1
+        if used + cost <= budget:
+            kept.append(line)
+            used += cost
+            continue
+        words = []
+        for word in line.split():
+            cost = estimate_tokens(word)
+            if used + cost > budget:
+                break
+            words.append(word)
+            used += cost
+        if words:
+            kept.append(" ".join(words))
+        break
+    return "\n".join(kept).strip()
+
+
+def _section_name(line: str):
+    stripped = line.strip().strip("#*•-:|= ").strip()
+    if not stripped or len(stripped) > 40 or len(stripped.split()) > 4:
+        return None
+    normalized = stripped.lower()
+    for name, pattern in _SECTION_RES:
+        if pattern.search(normalized):
+            return name
+    return None
+
+
+def split_sections(text: str):
+    """
+    Split resume text on recognised headings. Returns a list of
+    (name, text) in document order; text before the first heading gets
+    the name "header".
+    """
+    sections = []
+    name, lines = "header", []
+    for line in text.split("\n"):
+        heading = _section_name(line)
+        if heading is not None:
+            if any(l.strip() for l in lines):
+                sections.append((name, "\n".join(lines).strip()))
+            name, lines = heading, [line.strip()]
+        else:
+            lines.append(line)
+    if any(l.strip() for l in lines):
+        sections.append((name, "\n".join(lines).strip()))
+    return sections
+
+
+def pack_sections(text: str, budget: int, priority=RESUME_SECTION_PRIORITY) -> str:
+    """
+    Fit text into `budget` tokens, filling it with the `priority` sections
+    first, then the header, then everything else. Kept sections are
+    returned in their original order. Text without recognised headings is
+    truncated from the end.
+    """
+    if estimate_tokens(text) <= budget:
+        return text.strip()
+    sections = split_sections(text)
+    if len(sections) <= 1:
+        return truncate_to_tokens(text, budget)
+
+    rank = {name: i for i, name in enumerate(priority)}
+    rank.setdefault("header", len(priority))
+    order = sorted(range(len(sections)), key=lambda i: (rank.get(sections[i][0], len(priority) + 1), i))
+
+    kept = {}
+    remaining = budget
+    for i in order:
+        if remaining <= 0:
+            break
+        section = truncate_to_tokens(sections[i][1], remaining)
+        if section:
+            kept[i] = section
+            remaining -= estimate_tokens(section) + 2
+    return "\n\n".join(kept[i] for i in sorted(kept))
+
+
+def continuation_messages(messages, partial_reply: str):
+    """Messages asking the model to carry on from a reply cut off at max_tokens."""
+    return list(messages) + [
+        {"role": "assistant", "content": partial_reply},
+        {"role": "user", "content": CONTINUE_PROMPT},
+    ]
+
+
+def complete_with_continuation(client, messages, max_tokens, max_continuations=None, **kwargs):
+    """
+    One chat completion, continued while it stops with finish_reason
+    "length" (at most max_continuations extra calls). Returns
+    (text, finish_reason) where text is the concatenated reply.
+    """
+    if max_continuations is None:
+        max_continuations = PROMPT_MAX_CONTINUATIONS
+    text = ""
+    request = list(messages)
+    for attempt in range(max_continuations + 1):
+        response = create_completion(
+            client, messages=request, max_tokens=reply_max_tokens(request, max_tokens), **kwargs
+        )
+        choice = response.choices[0]
+        text += choice.message.content or ""
+        if choice.finish_reason != "length" or attempt == max_continuations:
+            return text, choice.finish_reason
+        request = continuation_messages(messages, text)
+    return text, None
+
+
+def stream_with_continuation(client, messages, max_tokens, max_continuations=None, **kwargs):
+    """
+    Streaming counterpart of complete_with_continuation: yields complete
+    reply lines, and when a stream ends on finish_reason "length" holds back
+    the cut-off line and streams its continuation.
+    """
+    if max_continuations is None:
+        max_continuations = PROMPT_MAX_CONTINUATIONS
+    state = {}
+    request = list(messages)
+    for attempt in range(max_continuations + 1):
+        state["hold_partial"] = attempt < max_continuations
+        stream = create_completion(
+            client, messages=request, max_tokens=reply_max_tokens(request, max_tokens), stream=True, **kwargs
+        )
+        yield from iter_completion_lines(stream, state)
+        if state.get("finish_reason") != "length" or not state["hold_partial"]:
+            return
+        request = continuation_messages(messages, state["text"])
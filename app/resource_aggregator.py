@@ -0,0 +1,73 @@
+# app/resource_aggregator.py
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from app.youtube_fetcher import fetch_youtube_videos
+from app.coursera_fetcher import fetch_coursera_courses
+from app.github_fetcher import fetch_github_repos
+
+logger = logging.getLogger(__name__)
+
+# Shared, bounded pool used by every /api/resources request in this process
+MAX_WORKERS = int(os.getenv("RESOURCE_MAX_WORKERS", "16"))
+OVERALL_DEADLINE = float(os.getenv("RESOURCE_OVERALL_DEADLINE", "6"))
+
+# source name -> (response key, fetcher, per-source deadline in seconds)
+SOURCES = {
+    "youtube": ("youtube_videos", fetch_youtube_videos, float(os.getenv("YOUTUBE_DEADLINE", "4"))),
+    "coursera": ("coursera_courses", fetch_coursera_courses, float(os.getenv("COURSERA_DEADLINE", "1"))),
+    "github": ("github_repos", fetch_github_repos, float(os.getenv("GITHUB_DEADLINE", "4"))),
+}
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="resources")
+
+
+def fetch_all_resources(topic, overall_deadline=None):
+    """
+    Run every resource fetcher in parallel and collect whatever finishes in time.
+
+    Each source gets its own deadline, capped by the overall deadline for the
+    request. Sources that fail or run late contribute an empty list and are
+    reported in the "status" field instead of failing the whole response.
+    """
+    if overall_deadline is None:
+        overall_deadline = OVERALL_DEADLINE
+
+    started = time.monotonic()
+    futures = {
+        name: _executor.submit(fetcher, topic)
+        for name, (_, fetcher, _) in SOURCES.items()
+    }
+
+    result = {}
+    status = {}
+    for name, future in futures.items():
+        key, _, source_deadline = SOURCES[name]
+        elapsed = time.monotonic() - started
+        remaining = max(0.0, min(source_deadline, overall_deadline) - elapsed)
+
+        try:
+            result[key] = future.result(timeout=remaining) or []
+            state, error = "ok", None
+        except FutureTimeout:
+            # The worker thread is bounded by the fetcher's own HTTP timeout
+            future.cancel()
+            result[key] = []
+            state, error = "timeout", None
+        except Exception as e:
+            logger.warning("%s fetch failed: %s", name, e)
+            result[key] = []
+            state, error = "error", str(e)
+
+        status[name] = {
+            "state": state,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        }
+        if error:
+            status[name]["error"] = error
+
+    result["status"] = status
+    return result
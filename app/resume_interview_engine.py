@@ -1,36 +1,94 @@
+import logging
+import multiprocessing
 import os
 import re
-from groq import Groq
-from PyPDF2 import PdfReader
-from docx import Document
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from app.content_cache import derive_key, get_content_cache
+from app.llm_router import ModelRouter
+from app.prompt_builder import pack_sections, prompt_budget, split_sections, words_to_tokens
+from app.skill_extractor import top_skills
+
+logger = logging.getLogger(__name__)
 
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+# Ordered "provider:model[@timeout]" list tried by the router (see app.llm_router)
+INTERVIEW_MODELS = os.getenv("INTERVIEW_MODELS", f"groq:{GROQ_MODEL},groq:llama3-8b-8192")
+router = ModelRouter.from_spec("interview", INTERVIEW_MODELS)
+# Bump whenever the prompt or parsing changes so memoized Q&A is regenerated
+INTERVIEW_PROMPT_VERSION = "2"
+INTERVIEW_QUESTIONS = 10
+INTERVIEW_ANSWER_WORDS = (150, 300)
+# Each pair is a question line (~40 tokens) plus an answer of up to the max word count
+INTERVIEW_REPLY_TOKENS = INTERVIEW_QUESTIONS * (40 + words_to_tokens(INTERVIEW_ANSWER_WORDS[1]))
+# Most resume tokens to put in the prompt; skills, projects and experience go first
+RESUME_PROMPT_TOKENS = int(os.getenv("RESUME_PROMPT_TOKENS", "1500"))
+# Skill-specific questions added to the template Q&A used without a model
+FALLBACK_SKILL_QUESTIONS = int(os.getenv("FALLBACK_SKILL_QUESTIONS", "3"))
 
-def generate_interview_questions(resume_text: str):
+QUESTION_RE = re.compile(r"^Q\s*\d+\s*:\s*(.*)$", re.IGNORECASE)
+ANSWER_RE = re.compile(r"^A\s*\d+\s*:\s*(.*)$", re.IGNORECASE)
+
+
+class QAPairParser:
     """
-    Generate interview questions using Groq API
+    Incremental parser for the "Qn: ... / An: ..." reply format.
+
+    feed() takes one line at a time and returns a completed
+    {"question", "answer"} pair as soon as the next question closes it;
+    close() flushes the last pair at end of input.
     """
-    if not resume_text.strip():
-        return ["No resume text found. Please upload a valid file."]
 
-    try:
-        # Fast-fail if API key is missing to avoid network/auth errors
-        if not os.getenv("GROQ_API_KEY"):
-            print("❌ GROQ_API_KEY not found in environment")
-            return _get_fallback_questions(resume_text)
-        else:
-            print("✅ GROQ_API_KEY found:", os.getenv("GROQ_API_KEY")[:10] + "...")
-        # Initialize Groq client with current environment
-        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        # Truncate overly long resumes to avoid oversized payloads/timeouts
-        max_chars = int(os.getenv("RESUME_MAX_CHARS", "6000"))
-        text_for_prompt = (resume_text[:max_chars]).strip()
-        # Prompt (refined to ensure exactly 10 Q&A pairs and concise formatting)
-        prompt = f"""
+    def __init__(self):
+        self.current_q = ""
+        self.current_a = []
+        self.in_answer = False
+
+    def _flush(self):
+        if self.current_q and self.current_a:
+            return {"question": self.current_q, "answer": " ".join(self.current_a).strip()}
+        return None
+
+    def feed(self, raw: str):
+        raw = raw.strip()
+        if not raw:
+            return None
+        q_match = QUESTION_RE.match(raw)
+        if q_match:
+            pair = self._flush()
+            self.current_q = q_match.group(1).strip()
+            self.current_a = []
+            self.in_answer = False
+            return pair
+
+        a_match = ANSWER_RE.match(raw)
+        if a_match:
+            self.in_answer = True
+            self.current_a.append(a_match.group(1).strip())
+            return None
+
+        # Continuation lines (part of the current answer)
+        if self.in_answer:
+            self.current_a.append(raw)
+        return None
+
+    def close(self):
+        pair = self._flush()
+        self.current_q = ""
+        self.current_a = []
+        self.in_answer = False
+        return pair
+
+
+def _build_interview_prompt(text_for_prompt: str) -> str:
+    # Prompt (refined to ensure exactly 10 Q&A pairs and concise formatting)
+    return f"""
 You are an experienced technical interviewer.
-Carefully read the candidate’s resume below and generate exactly 10 high-quality interview questions that match their projects, skills, and experience.
+Carefully read the candidate’s resume below and generate exactly {INTERVIEW_QUESTIONS} high-quality interview questions that match their projects, skills, and experience.
 
-For each question, also generate a 150-300 sentence sample answer based only on the resume.
+For each question, also generate a {INTERVIEW_ANSWER_WORDS[0]}-{INTERVIEW_ANSWER_WORDS[1]} word sample answer based only on the resume.
 
 Strict output format (no extra commentary):
 Q1: <question>
@@ -38,114 +96,205 @@ A1: <answer spanning multiple lines if needed>
 Q2: <question>
 A2: <answer>
 ...
-Q10: <question>
-A10: <answer>
+Q{INTERVIEW_QUESTIONS}: <question>
+A{INTERVIEW_QUESTIONS}: <answer>
 
 Resume content:
 {text_for_prompt}
 """
 
+
+def interview_messages(resume_text: str):
+    # Pack the most relevant resume sections into what the reply leaves of the context
+    budget = prompt_budget(_build_interview_prompt(""), INTERVIEW_REPLY_TOKENS, RESUME_PROMPT_TOKENS)
+    text_for_prompt = pack_sections(resume_text, budget)
+    return [{"role": "user", "content": _build_interview_prompt(text_for_prompt)}]
+
+
+def parse_interview_reply(result: str):
+    """
+    Parse a complete "Qn:/An:" reply. Returns (qa_pairs, True), or the raw
+    lines and False when no pair could be parsed.
+    """
+    lines = [ln.strip() for ln in result.split("\n")]
+    parser = QAPairParser()
+    qa_pairs = []
+    for raw in lines:
+        pair = parser.feed(raw)
+        if pair:
+            qa_pairs.append(pair)
+    # Add the final pair if present
+    pair = parser.close()
+    if pair:
+        qa_pairs.append(pair)
+
+    logger.debug("Parsed %d Q&A pairs", len(qa_pairs))
+    # If parsing failed, return the raw text split by lines
+    if not qa_pairs:
+        logger.info("Could not parse Q&A pairs, returning raw lines")
+        return lines, False
+
+    return qa_pairs, True
+
+
+def generate_interview_questions(resume_text: str):
+    """
+    Generate interview questions with the first available INTERVIEW_MODELS model
+    """
+    qa, _ = _generate_interview_questions(resume_text)
+    return qa
+
+
+def generate_interview_questions_cached(resume_text: str, content_digest: str):
+    """
+    Like generate_interview_questions, but memoized on disk by the uploaded
+    file's SHA-256, the model and the prompt version. Only parsed LLM
+    results are stored; fallback templates are always recomputed.
+    """
+    cache = get_content_cache()
+    key = derive_key(content_digest, router.primary_model, INTERVIEW_PROMPT_VERSION)
+    qa = cache.get("qa", key)
+    if qa is not None:
+        return qa
+
+    qa, from_llm = _generate_interview_questions(resume_text)
+    if from_llm:
+        cache.put("qa", key, qa)
+    return qa
+
+
+def _generate_interview_questions(resume_text: str):
+    """
+    Returns (result, from_llm); from_llm is True only for Q&A pairs parsed
+    from a model reply.
+    """
+    if not resume_text.strip():
+        return ["No resume text found. Please upload a valid file."], False
+
+    try:
+        # Fast-fail if no provider is configured (e.g. GROQ_API_KEY missing)
+        if not router.available():
+            logger.warning("No LLM provider configured, using fallback questions")
+            return fallback_questions(resume_text), False
+
         try:
-            response = client.chat.completions.create(
-                model=GROQ_MODEL,
-                messages=[{"role": "user", "content": prompt}],
+            result, finish_reason, model = router.complete(
+                interview_messages(resume_text),
+                INTERVIEW_REPLY_TOKENS,
                 temperature=0.7,
-                max_tokens=1500,
             )
         except Exception as api_error:
-            print("❌ Groq API call failed:", str(api_error))
-            return _get_fallback_questions(resume_text)
-
-        # Extract reply text
-        result = response.choices[0].message.content.strip()
-        print("🔍 Groq API response length:", len(result))
-        print("🔍 First 200 chars of response:", result[:200])
-        # Parse Q&A pairs properly
-        lines = [ln.strip() for ln in result.split("\n")]
-        qa_pairs = []
-        current_q = ""
-        current_a = []
-        in_answer = False
-
-        question_re = re.compile(r"^Q\s*\d+\s*:\s*(.*)$", re.IGNORECASE)
-        answer_re = re.compile(r"^A\s*\d+\s*:\s*(.*)$", re.IGNORECASE)
-
-        for raw in lines:
-            if not raw:
-                continue
-            q_match = question_re.match(raw)
-            a_match = answer_re.match(raw)
-
-            if q_match:
-                # Flush previous
-                if current_q and current_a:
-                    qa_pairs.append({"question": current_q, "answer": " ".join(current_a).strip()})
-                current_q = q_match.group(1).strip()
-                current_a = []
-                in_answer = False
-                continue
-
-            if a_match:
-                in_answer = True
-                current_a.append(a_match.group(1).strip())
-                continue
-
-            # Continuation lines (part of the current answer)
-            if in_answer:
-                current_a.append(raw)
-
-        # Add the final pair if present
-        if current_q and current_a:
-            qa_pairs.append({"question": current_q, "answer": " ".join(current_a).strip()})
-
-        print("🔍 Parsed Q&A pairs:", len(qa_pairs))
-        if qa_pairs:
-            print("🔍 First pair - Q:", qa_pairs[0].get("question", "")[:50])
-            print("🔍 First pair - A:", qa_pairs[0].get("answer", "")[:50])
-        # If parsing failed, return the raw text split by lines
-        if not qa_pairs:
-            print("🔍 Parsing failed, returning raw lines")
-            return lines
-        
-        return qa_pairs
+            logger.warning("LLM call failed: %s", api_error)
+            return fallback_questions(resume_text), False
+
+        if finish_reason == "length":
+            logger.warning("Interview reply from %s still truncated after continuations", model)
+        result = result.strip()
+        logger.debug("LLM response length: %d", len(result))
+        return parse_interview_reply(result)
 
     except Exception as e:
-        print("Groq API error:", str(e))
-        return _get_fallback_questions(resume_text)
-
-def _get_fallback_questions(resume_text: str) -> list:
-    """
-    Generate template questions when API is unavailable
-    """
-    # Extract skills and projects from resume text
-    skills = []
-    projects = []
-    
-    # Simple keyword extraction
-    text_lower = resume_text.lower()
-    if "python" in text_lower:
-        skills.append("Python")
-    if "flask" in text_lower:
-        skills.append("Flask")
-    if "react" in text_lower:
-        skills.append("React")
-    if "machine learning" in text_lower or "ml" in text_lower:
-        skills.append("Machine Learning")
-    if "sql" in text_lower:
-        skills.append("SQL")
-    
-    # Extract project mentions
-    if "project" in text_lower:
-        projects = ["AI Travel Planner", "AI Study Planner", "Resume Analyzer"]
-    
+        logger.exception("Interview generation error: %s", e)
+        return fallback_questions(resume_text), False
+
+def stream_interview_questions(resume_text: str):
+    """
+    Yield Q&A pairs one at a time while the model streams the reply. Each pair is
+    emitted as soon as the next question closes it. Falls back to the
+    template questions when the API key is missing or the call fails before
+    any pair has been produced.
+    """
+    if not resume_text.strip():
+        return
+
+    if not router.available():
+        yield from fallback_questions(resume_text)
+        return
+
+    parser = QAPairParser()
+    emitted = 0
+    try:
+        lines = router.stream(interview_messages(resume_text), INTERVIEW_REPLY_TOKENS, temperature=0.7)
+        for line in lines:
+            pair = parser.feed(line)
+            if pair:
+                emitted += 1
+                yield pair
+    except Exception as api_error:
+        logger.warning("LLM streaming call failed: %s", api_error)
+        if not emitted:
+            yield from fallback_questions(resume_text)
+            return
+
+    pair = parser.close()
+    if pair:
+        yield pair
+
+
+def _join(names):
+    return names[0] if len(names) == 1 else ", ".join(names[:-1]) + " and " + names[-1]
+
+
+def _project_titles(resume_text: str, limit: int = 3) -> list:
+    """Project names: the short title lines of the resume's projects section."""
+    titles = []
+    for name, text in split_sections(resume_text):
+        if name != "projects":
+            continue
+        for line in text.split("\n")[1:]:
+            title = re.split(r"\s[-–|]\s|:|\(", line.strip().lstrip("•*-–· ").strip(), maxsplit=1)[0].strip()
+            if 2 <= len(title) <= 60 and len(title.split()) <= 8 and not title.endswith("."):
+                titles.append(title)
+            if len(titles) >= limit:
+                return titles
+    return titles
+
+
+def fallback_questions(resume_text: str) -> list:
+    """
+    Generate template questions when no model is available, filled in with
+    the skills and project titles found in the resume
+    """
+    skills = top_skills(resume_text, FALLBACK_SKILL_QUESTIONS + 2)
+    projects = _project_titles(resume_text)
+
+    if projects:
+        project_answer = (
+            f"Based on your resume, you've worked on {_join(projects)}. Walk through the hardest technical "
+            "problem you faced there: the problem, your approach and the result."
+        )
+    else:
+        project_answer = (
+            "Pick the project on your resume with the hardest technical problem and walk through "
+            "the problem, your approach and the result."
+        )
+    if skills:
+        stack_answer = (
+            f"From your resume, I can see you've used {_join(skills)}. Be ready to explain why each "
+            "was chosen and what trade-offs it brought."
+        )
+        goals_answer = (
+            f"Based on your experience with {_join(skills[:2])}, you likely aim to deepen that expertise "
+            "and take on larger technical ownership in software engineering."
+        )
+    else:
+        stack_answer = (
+            "List the languages, frameworks and tools you used, and explain why each was chosen "
+            "and what trade-offs it brought."
+        )
+        goals_answer = (
+            "Connect the experience on your resume to the role you want next and the skills you "
+            "plan to build to get there."
+        )
+
     qa_pairs = [
         {
             "question": "Can you walk me through your most challenging project?",
-            "answer": "Based on your resume, you've worked on several AI projects including an AI Travel Planner and AI Study Planner. These projects likely involved complex problem-solving and technical implementation challenges."
+            "answer": project_answer
         },
         {
             "question": "What technologies did you use in your recent projects?",
-            "answer": "From your resume, I can see you've used Python, Flask, SQL, Machine Learning, and React. These technologies demonstrate a full-stack development approach."
+            "answer": stack_answer
         },
         {
             "question": "How do you handle debugging and troubleshooting?",
@@ -157,44 +306,182 @@ def _get_fallback_questions(resume_text: str) -> list:
         },
         {
             "question": "What are your career goals in the next 2-3 years?",
-            "answer": "Based on your AI and full-stack development experience, you likely aim to advance in software engineering, possibly specializing in AI/ML applications or full-stack development."
+            "answer": goals_answer
         }
     ]
-    
-    # Add skill-specific Q&A if skills detected
-    if skills:
+
+    # Add skill-specific Q&A for the most mentioned skills
+    for skill in skills[:FALLBACK_SKILL_QUESTIONS]:
         qa_pairs.append({
-            "question": f"What's your experience level with {skills[0]}?",
-            "answer": f"Your resume shows experience with {skills[0]}, which is evident from your project implementations and technical skills."
+            "question": f"What's your experience level with {skill}?",
+            "answer": f"Your resume shows experience with {skill}, which is evident from your project implementations and technical skills."
         })
-    
+
     return qa_pairs
 
+def _text_cache_key(content_digest: str) -> str:
+    # Extraction output depends on the page/char limits, so they are part of the key
+    return derive_key(
+        content_digest,
+        os.getenv("RESUME_MAX_PAGES", "5"),
+        os.getenv("RESUME_MAX_CHARS", "6000"),
+    )
+
+
+def get_cached_resume_text(content_digest: str):
+    """Previously extracted text for an upload with this SHA-256, or None."""
+    return get_content_cache().get("text", _text_cache_key(content_digest))
+
+
+def cache_resume_text(content_digest: str, text: str):
+    if not text.startswith("Error reading resume:"):
+        get_content_cache().put("text", _text_cache_key(content_digest), text)
+
+
+def extract_text_from_resume_cached(file_path: str, content_digest: str) -> str:
+    """
+    extract_text_from_resume memoized by the file's SHA-256, so re-uploads
+    of the same resume skip PDF/DOCX parsing entirely.
+    """
+    text = get_cached_resume_text(content_digest)
+    if text is None:
+        text = extract_text_from_resume(file_path)
+        cache_resume_text(content_digest, text)
+    return text
+
+
+# Reject files before parsing them: a resume is never this large
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(10 * 1024 * 1024)))
+RESUME_REJECT_PAGES = int(os.getenv("RESUME_REJECT_PAGES", "100"))
+# Extract PDF pages in a process pool when more than this many pages are read (0 = never)
+RESUME_PARALLEL_MIN_PAGES = int(os.getenv("RESUME_PARALLEL_MIN_PAGES", "0"))
+RESUME_PARALLEL_WORKERS = int(os.getenv("RESUME_PARALLEL_WORKERS", "4"))
+_TEXT_READ_SIZE = 64 * 1024
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+# Per worker process: (path, PdfReader) of the document being extracted
+_worker_reader = None
+
+
+class ResumeRejected(ValueError):
+    """The file is too large or has too many pages to be parsed."""
+
+
+def _extract_pdf_page(file_path: str, index: int) -> str:
+    """Process-pool task: extract one page, reusing this worker's open reader."""
+    global _worker_reader
+    from PyPDF2 import PdfReader
+
+    if _worker_reader is None or _worker_reader[0] != file_path:
+        _worker_reader = (file_path, PdfReader(file_path))
+    return _worker_reader[1].pages[index].extract_text() or ""
+
+
+def _get_page_pool():
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(
+                max_workers=RESUME_PARALLEL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _page_pool
+
+
+def _iter_pdf_pages_parallel(file_path: str, page_count: int):
+    """
+    Yield page texts in order while a bounded window of later pages is
+    extracted ahead in the pool. Unstarted pages are cancelled as soon as
+    the consumer stops iterating.
+    """
+    pool = _get_page_pool()
+    window = RESUME_PARALLEL_WORKERS * 2
+    pending = deque()
+    next_index = 0
+    try:
+        while next_index < page_count or pending:
+            while next_index < page_count and len(pending) < window:
+                pending.append(pool.submit(_extract_pdf_page, file_path, next_index))
+                next_index += 1
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def iter_resume_text(file_path: str):
+    """
+    Yield a resume's text as successive pieces whose concatenation is the
+    full extracted text. Work happens lazily, so a consumer that stops early
+    never parses the remaining pages. Raises ResumeRejected for files over
+    RESUME_MAX_BYTES or PDFs over RESUME_REJECT_PAGES pages.
+    """
+    size = os.path.getsize(file_path)
+    if size > RESUME_MAX_BYTES:
+        raise ResumeRejected(f"file is {size} bytes, limit is {RESUME_MAX_BYTES}")
+
+    _, ext = os.path.splitext(file_path)
+    ext = ext.lower()
+    max_pages = int(os.getenv("RESUME_MAX_PAGES", "5"))
+
+    # Parsers are imported on first use; most requests never touch them
+    if ext == ".pdf":
+        from PyPDF2 import PdfReader
+
+        with open(file_path, "rb") as file_stream:
+            pdf_reader = PdfReader(file_stream)
+            total_pages = len(pdf_reader.pages)
+            if total_pages > RESUME_REJECT_PAGES:
+                raise ResumeRejected(f"PDF has {total_pages} pages, limit is {RESUME_REJECT_PAGES}")
+            page_count = min(max_pages, total_pages)
+
+            if RESUME_PARALLEL_MIN_PAGES and page_count > RESUME_PARALLEL_MIN_PAGES:
+                pages = _iter_pdf_pages_parallel(file_path, page_count)
+            else:
+                pages = (page.extract_text() or "" for page in pdf_reader.pages[:page_count])
+
+            for index, page_text in enumerate(pages):
+                yield page_text if index == 0 else "\n" + page_text
+        return
+
+    if ext == ".docx":
+        from docx import Document
+
+        document = Document(file_path)
+        for index, paragraph in enumerate(document.paragraphs):
+            yield paragraph.text if index == 0 else "\n" + paragraph.text
+        return
+
+    # Fallback: treat as plain text
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as text_file:
+        while True:
+            piece = text_file.read(_TEXT_READ_SIZE)
+            if not piece:
+                break
+            yield piece
+
+
 def extract_text_from_resume(file_path: str) -> str:
     """
     Extract plain text from a resume file. Supports PDF, DOCX, and TXT.
+    Stops reading once RESUME_MAX_CHARS characters of text are available.
     """
     try:
-        _, ext = os.path.splitext(file_path)
-        ext = ext.lower()
-        max_pages = int(os.getenv("RESUME_MAX_PAGES", "5"))
         max_chars = int(os.getenv("RESUME_MAX_CHARS", "6000"))
-
-        if ext == ".pdf":
-            text_chunks = []
-            with open(file_path, "rb") as file_stream:
-                pdf_reader = PdfReader(file_stream)
-                for page in pdf_reader.pages[:max_pages]:
-                    page_text = page.extract_text() or ""
-                    text_chunks.append(page_text)
-            return ("\n".join(text_chunks).strip())[:max_chars]
-
-        if ext == ".docx":
-            document = Document(file_path)
-            return ("\n".join(p.text for p in document.paragraphs).strip())[:max_chars]
-
-        # Fallback: treat as plain text
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as text_file:
-            return (text_file.read().strip())[:max_chars]
+        parts = []
+        size = 0
+        for piece in iter_resume_text(file_path):
+            if not parts:
+                piece = piece.lstrip()
+                if not piece:
+                    continue
+            parts.append(piece)
+            size += len(piece)
+            # Enough once non-whitespace text exists past the budget, so a
+            # final strip() could not pull the cut point back
+            if size > max_chars and "".join(parts)[max_chars:].strip():
+                break
+        return "".join(parts).strip()[:max_chars]
     except Exception as error:
         return f"Error reading resume: {error}"
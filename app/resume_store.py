@@ -1,24 +1,87 @@
 import json
+import logging
 import os
+import threading
+import time
 
+from app.db import get_conn
+
+logger = logging.getLogger(__name__)
+
+RESUME_DB = os.getenv("RESUME_DB_PATH", "uploads/resume_store.db")
+# Previous storage format, imported once into RESUME_DB on first use
+LEGACY_RESUME_JSON = "uploads/resume_store.json"
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _init_db(conn):
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS resumes ("
+        " user_id TEXT PRIMARY KEY,"
+        " resume_text TEXT NOT NULL,"
+        " updated_at REAL NOT NULL)"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)")
+    _migrate_legacy_json(conn)
+
+
+def _migrate_legacy_json(conn, json_path=LEGACY_RESUME_JSON):
+    """
+    Import the old whole-file JSON store once. BEGIN IMMEDIATE serializes
+    workers that start at the same time; the meta flag keeps it one-shot.
+    """
+    if not os.path.exists(json_path):
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        done = conn.execute(
+            "SELECT 1 FROM store_meta WHERE key = 'legacy_json_migrated'"
+        ).fetchone()
+        if not done:
+            with open(json_path, "r") as f:
+                data = json.load(f)
+            now = time.time()
+            # Keep any newer row already written through the new store
+            conn.executemany(
+                "INSERT OR IGNORE INTO resumes (user_id, resume_text, updated_at) VALUES (?, ?, ?)",
+                [(str(user_id), text, now) for user_id, text in data.items()],
+            )
+            conn.execute(
+                "INSERT INTO store_meta (key, value) VALUES ('legacy_json_migrated', ?)",
+                (str(len(data)),),
+            )
+            logger.info("Migrated %d resumes from %s", len(data), json_path)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _conn():
+    """Pooled per-thread connection; the schema and migration run once per process."""
+    global _initialized
+    conn = get_conn(RESUME_DB)
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                _init_db(conn)
+                _initialized = True
+    return conn
 
-RESUME_DB = "uploads/resume_store.json"
-# Ensure uploads directory exists
-os.makedirs(os.path.dirname(RESUME_DB), exist_ok=True)
-# Ensure file exists
-if not os.path.exists(RESUME_DB):
-    with open(RESUME_DB, "w") as f:
-        json.dump({}, f)
 
 def save_resume_text(user_id, resume_text):
-    with open(RESUME_DB, "r+") as f:
-        data = json.load(f)
-        data[user_id] = resume_text
-        f.seek(0)
-        json.dump(data, f, indent=2)
-        f.truncate()
+    _conn().execute(
+        "INSERT INTO resumes (user_id, resume_text, updated_at) VALUES (?, ?, ?) "
+        "ON CONFLICT(user_id) DO UPDATE SET resume_text = excluded.resume_text, "
+        "updated_at = excluded.updated_at",
+        (str(user_id), resume_text, time.time()),
+    )
+
 
 def get_saved_resume(user_id):
-    with open(RESUME_DB, "r") as f:
-        data = json.load(f)
-        return data.get(user_id, "")
+    row = _conn().execute(
+        "SELECT resume_text FROM resumes WHERE user_id = ?", (str(user_id),)
+    ).fetchone()
+    return row[0] if row else ""
@@ -1,13 +1,21 @@
 """
-Retrainer module - No longer needed as we use external API for predictions.
-This file is kept for backward compatibility.
+Retrainer module - rebuilds the in-process study time model
+from outcomes logged via /api/predict/outcome.
 """
 
+import logging
+
+from app.local_predictor import retrain
+
+
 def retrain_model():
     """
-    This function is no longer needed as we use external API for predictions.
-    Kept for backward compatibility.
+    Retrain the local study time model. Kept as a separate entry point
+    so it can be scheduled outside the web process.
     """
-    print("ℹ️ Retraining is not needed - using external API for predictions")
-    return True
+    return retrain()
+
 
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    retrain_model()
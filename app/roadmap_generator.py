@@ -1,45 +1,77 @@
+import logging
 import os
-from groq import Groq
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+from app.llm_router import ModelRouter
+
+logger = logging.getLogger(__name__)
+
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama3-8b-8192")
+# Ordered "provider:model[@timeout]" list tried by the router (see app.llm_router)
+ROADMAP_MODELS = os.getenv("ROADMAP_MODELS", f"groq:{GROQ_MODEL},groq:llama-3.1-8b-instant")
+router = ModelRouter.from_spec("roadmap", ROADMAP_MODELS)
 
-def generate_roadmap(topic: str):
-    """
-    Generate a learning roadmap for a given topic using Groq API
-    """
-    try:
-        prompt = f"""
+ROADMAP_MAX_STEPS = 60
+ROADMAP_STEP_CHARS = 160
+# Up to ROADMAP_MAX_STEPS lines of at most ROADMAP_STEP_CHARS (~4 chars per token)
+ROADMAP_REPLY_TOKENS = ROADMAP_MAX_STEPS * (ROADMAP_STEP_CHARS // 4 + 5)
+
+ROADMAP_SYSTEM_PROMPT = "Be thorough, structured, and pragmatic. Prefer concise single-line steps."
+
+
+def _build_roadmap_prompt(topic: str) -> str:
+    return f"""
         You are an expert curriculum designer.
         Create a comprehensive, actionable learning roadmap for: {topic}.
 
         Requirements:
         - Organize into clear phases (Beginner, Intermediate, Advanced), each 2-4 weeks.
-        - Provide 35-60 concise steps total, one per line.
+        - Provide 35-{ROADMAP_MAX_STEPS} concise steps total, one per line.
         - Each step MUST be a single line: action first, then a short reason.
         - Include periodic review/milestone checks and at least 6 practical projects.
         - Cover fundamentals, core skills, applied practice, and advanced/industry topics.
-        - Keep lines short (<= 160 chars) and avoid markdown code blocks.
+        - Keep lines short (<= {ROADMAP_STEP_CHARS} chars) and avoid markdown code blocks.
         - Start each line with a hyphen and a space ("- ") so it is easy to render.
         """
 
-        response = client.chat.completions.create(
-            model=GROQ_MODEL,
-            messages=[
-                {"role": "system", "content": "Be thorough, structured, and pragmatic. Prefer concise single-line steps."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.5,
-            max_tokens=1500,
-        )
 
-        result = response.choices[0].message.content.strip()
-        # Normalize line endings and ensure one step per line
-        result = "\n".join(
-            [line.strip() for line in result.replace("\r\n", "\n").replace("\r", "\n").split("\n") if line.strip()]
+def roadmap_messages(topic: str):
+    return [
+        {"role": "system", "content": ROADMAP_SYSTEM_PROMPT},
+        {"role": "user", "content": _build_roadmap_prompt(topic)},
+    ]
+
+
+def clean_roadmap_text(result: str) -> str:
+    # Normalize line endings and ensure one step per line
+    result = result.strip()
+    return "\n".join(
+        [line.strip() for line in result.replace("\r\n", "\n").replace("\r", "\n").split("\n") if line.strip()]
+    )
+
+
+def generate_roadmap(topic: str):
+    """
+    Generate a learning roadmap for a given topic, trying each of
+    ROADMAP_MODELS in turn
+    """
+    try:
+        result, finish_reason, model = router.complete(
+            roadmap_messages(topic),
+            ROADMAP_REPLY_TOKENS,
+            temperature=0.5,
         )
-        return result
+        if finish_reason == "length":
+            logger.warning("Roadmap for %r from %s still truncated after continuations", topic, model)
+        return clean_roadmap_text(result)
 
     except Exception as e:
-        print("Groq API error:", str(e))
+        logger.warning("Roadmap generation failed: %s", e)
         return f"Error generating roadmap: {str(e)}"
+
+
+def stream_roadmap(topic: str):
+    """
+    Yield roadmap steps one line at a time as the model streams them.
+    Raises on API errors so the caller can report them to the client.
+    """
+    yield from router.stream(roadmap_messages(topic), ROADMAP_REPLY_TOKENS, temperature=0.5)
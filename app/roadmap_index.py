@@ -0,0 +1,344 @@
+# app/roadmap_index.py
+"""
+Structured roadmaps and full-text search over roadmaps and resources.
+
+parse_roadmap turns generated roadmap text into phases of ordered steps,
+each tagged as a step, project or milestone. Every roadmap and resource
+bundle the app stores is also written here, one row per step or resource,
+into tables with FTS5 indexes (database/migrations/0005_roadmap_search.sql),
+so search() answers from the index instead of regenerating anything.
+"""
+
+import heapq
+import os
+import re
+import time
+
+from app.cache import normalize_topic
+from app.db import get_conn, transaction
+
+# Resource bundles fetched live are re-indexed at most this often per topic
+RESOURCE_REINDEX_SECONDS = int(os.getenv("RESOURCE_REINDEX_SECONDS", "86400"))
+SEARCH_MAX_RESULTS = 50
+# Best FTS5 (BM25) matches per query and table that are re-scored on whole words
+SEARCH_RANK_WINDOW = int(os.getenv("SEARCH_RANK_WINDOW", "100"))
+# Ranking: BM25 saturation and length normalization, around this many characters per step
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_AVG_CHARS = 80
+# Longest prefix in the FTS5 prefix indexes (migration 0005)
+_MAX_PREFIX = 6
+# bm25() column weights: the step text or resource title, then phase or source, then topic
+_COLUMN_WEIGHTS = "10.0, 1.0, 1.0"
+# A word that only starts with a prefix term counts this much of a whole-word match
+_PREFIX_WEIGHT = 0.5
+# Suffixes stripped before comparing words, a rough stand-in for the porter stemmer FTS5 matches with
+_SUFFIXES = ("ing", "ed", "es", "s")
+
+ROADMAP = "roadmap"
+RESOURCES = "resources"
+STEP = "step"
+PROJECT = "project"
+MILESTONE = "milestone"
+DEFAULT_PHASE = "Overview"
+
+_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+_STEP_PREFIX = re.compile(r"^step\s*\d+\s*[:.)\-–]\s*", re.I)
+_PHASE_NUMBERED = re.compile(r"^(?:phase|stage|level|part|module)\s*\d+\b", re.I)
+_PHASE_LEVEL = re.compile(r"^(?:beginner|intermediate|advanced|expert|foundations?)\b", re.I)
+_PHASE_WORDS = re.compile(r"\b(?:weeks?|months?|phase|stage|level)\b", re.I)
+_PROJECT = re.compile(r"\b(?:projects?|capstone|portfolio)\b", re.I)
+_MILESTONE = re.compile(r"\b(?:milestones?|checkpoints?|review|assessment|quiz|exam)\b", re.I)
+_TOKEN = re.compile(r"\w+")
+
+# source name -> (bundle key, item -> (title, url))
+_RESOURCE_FIELDS = {
+    "youtube": ("youtube_videos", lambda item: (
+        item.get("title"), f"https://www.youtube.com/watch?v={item['videoId']}" if item.get("videoId") else None
+    )),
+    "coursera": ("coursera_courses", lambda item: (item.get("title"), item.get("url"))),
+    "github": ("github_repos", lambda item: (item.get("repo") or item.get("title"), item.get("url"))),
+}
+
+
+def _is_heading(text, marked):
+    if not marked:
+        return True
+    if len(text) > 80:
+        return False
+    if text.endswith(":") or _PHASE_NUMBERED.match(text):
+        return True
+    return bool(_PHASE_LEVEL.match(text)) and (":" not in text or bool(_PHASE_WORDS.search(text)))
+
+
+def _step_kind(text):
+    if _PROJECT.search(text):
+        return PROJECT
+    if _MILESTONE.search(text):
+        return MILESTONE
+    return STEP
+
+
+def parse_roadmap(roadmap):
+    """
+    {"phases": [{"title", "steps": [{"index", "text", "kind"}]}]} from
+    roadmap text. Bulleted or numbered lines are steps; unmarked lines,
+    markdown headings and short "Beginner (Weeks 1-3)" / "...:" bullets
+    start a phase. Step indexes run across the whole roadmap.
+    """
+    lines = []
+    for raw in roadmap.split("\n"):
+        line = raw.replace("**", "").replace("__", "").strip()
+        if not line:
+            continue
+        heading = line.startswith("#")
+        marked = not heading and bool(_MARKER.match(line))
+        text = _MARKER.sub("", line.lstrip("#").strip()).strip()
+        if text:
+            lines.append((text, marked, heading))
+    any_marked = any(marked for _, marked, _ in lines)
+
+    phases = [{"title": DEFAULT_PHASE, "steps": []}]
+    index = 0
+    for text, marked, heading in lines:
+        if heading or _is_heading(text, marked or not any_marked):
+            phases.append({"title": text.rstrip(":").strip(), "steps": []})
+            continue
+        text = _STEP_PREFIX.sub("", text) or text
+        phases[-1]["steps"].append({"index": index, "text": text, "kind": _step_kind(text)})
+        index += 1
+    return {"phases": [phase for phase in phases if phase["steps"]]}
+
+
+def roadmap_steps(roadmap):
+    """The text of every step of a roadmap, in order."""
+    return [step["text"] for phase in parse_roadmap(roadmap)["phases"] for step in phase["steps"]]
+
+
+def _mark_indexed(conn, topic, kind):
+    conn.execute(
+        "INSERT OR REPLACE INTO indexed_topics (topic_key, kind, topic, indexed_at) VALUES (?, ?, ?, ?)",
+        (normalize_topic(topic), kind, topic, time.time()),
+    )
+
+
+def index_roadmap(topic, roadmap):
+    """Replace the stored structure of topic's roadmap; returns the parsed roadmap."""
+    parsed = parse_roadmap(roadmap)
+    topic_key = normalize_topic(topic)
+    rows = [
+        (topic_key, topic, phase_index, phase["title"], step["index"], step["kind"], step["text"])
+        for phase_index, phase in enumerate(parsed["phases"])
+        for step in phase["steps"]
+    ]
+    conn = get_conn()
+    with transaction(conn):
+        conn.execute("DELETE FROM roadmap_steps WHERE topic_key = ?", (topic_key,))
+        conn.executemany(
+            "INSERT INTO roadmap_steps (topic_key, topic, phase_index, phase, step_index, kind, text) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        _mark_indexed(conn, topic, ROADMAP)
+    return parsed
+
+
+def index_resources(topic, bundle, max_age=None):
+    """
+    Replace the stored resource titles for topic with those in bundle (an
+    /api/resources payload). With max_age, topics indexed less than
+    max_age seconds ago are left alone. Returns whether anything was written.
+    """
+    topic_key = normalize_topic(topic)
+    conn = get_conn()
+    if max_age is not None:
+        row = conn.execute(
+            "SELECT indexed_at FROM indexed_topics WHERE topic_key = ? AND kind = ?", (topic_key, RESOURCES)
+        ).fetchone()
+        if row is not None and time.time() - row[0] < max_age:
+            return False
+    rows = []
+    for source, (key, fields) in _RESOURCE_FIELDS.items():
+        for position, item in enumerate(bundle.get(key) or []):
+            title, url = fields(item)
+            if title:
+                rows.append((topic_key, topic, source, position, title, url))
+    with transaction(conn):
+        conn.execute("DELETE FROM resource_items WHERE topic_key = ?", (topic_key,))
+        conn.executemany(
+            "INSERT INTO resource_items (topic_key, topic, source, position, title, url) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        _mark_indexed(conn, topic, RESOURCES)
+    return True
+
+
+def rename_indexed_topic(conn, old_topic, new_topic):
+    """
+    Move old_topic's indexed steps and resources to new_topic within the
+    caller's transaction, unless new_topic already has its own. Rows are
+    copied and deleted rather than updated so the FTS triggers see both.
+    """
+    old_key, new_key = normalize_topic(old_topic), normalize_topic(new_topic)
+    for table, columns in (
+        ("roadmap_steps", "phase_index, phase, step_index, kind, text"),
+        ("resource_items", "source, position, title, url"),
+    ):
+        last_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+        if new_key == old_key or conn.execute(
+            f"SELECT 1 FROM {table} WHERE topic_key = ? LIMIT 1", (new_key,)
+        ).fetchone() is None:
+            conn.execute(
+                f"INSERT INTO {table} (topic_key, topic, {columns}) "
+                f"SELECT ?, ?, {columns} FROM {table} WHERE topic_key = ? ORDER BY id",
+                (new_key, new_topic, old_key),
+            )
+        conn.execute(f"DELETE FROM {table} WHERE topic_key = ? AND id <= ?", (old_key, last_id))
+    conn.execute(
+        "UPDATE OR IGNORE indexed_topics SET topic_key = ?, topic = ? WHERE topic_key = ?",
+        (new_key, new_topic, old_key),
+    )
+    if new_key != old_key:
+        conn.execute("DELETE FROM indexed_topics WHERE topic_key = ?", (old_key,))
+
+
+def get_structured_roadmap(topic):
+    """The stored structure of topic's roadmap (as parse_roadmap returns it), or None."""
+    rows = get_conn().execute(
+        "SELECT phase_index, phase, step_index, kind, text FROM roadmap_steps "
+        "WHERE topic_key = ? ORDER BY step_index",
+        (normalize_topic(topic),),
+    ).fetchall()
+    if not rows:
+        return None
+    phases, current = [], None
+    for phase_index, phase, step_index, kind, text in rows:
+        if phase_index != current:
+            phases.append({"title": phase, "steps": []})
+            current = phase_index
+        phases[-1]["steps"].append({"index": step_index, "text": text, "kind": kind})
+    return {"phases": phases}
+
+
+def match_query(text):
+    """
+    An FTS5 query matching every word of text, with FTS syntax characters
+    dropped. A last word of up to _MAX_PREFIX characters also matches
+    longer words (search as you type); those prefixes come from the FTS5
+    prefix index, while longer ones would merge every matching term's
+    posting list. Raises ValueError if text has no words.
+    """
+    tokens = _TOKEN.findall(text.lower())
+    if not tokens:
+        raise ValueError("Search query has no words")
+    last = f'"{tokens[-1]}"*' if len(tokens[-1]) <= _MAX_PREFIX else f'"{tokens[-1]}"'
+    return " ".join([f'"{token}"' for token in tokens[:-1]] + [last])
+
+
+_SEARCH_STEPS = (
+    "SELECT s.topic, s.phase, s.step_index, s.kind, s.text FROM ("
+    " SELECT rowid FROM roadmap_steps_fts"
+    " WHERE roadmap_steps_fts MATCH ? AND rowid BETWEEN ? AND ?"
+    f" ORDER BY bm25(roadmap_steps_fts, {_COLUMN_WEIGHTS}) LIMIT ?"
+    ") m JOIN roadmap_steps s ON s.id = m.rowid "
+    "WHERE ? IS NULL OR s.topic_key = ?"
+)
+_SEARCH_RESOURCES = (
+    "SELECT r.topic, r.source, r.title, r.url FROM ("
+    " SELECT rowid FROM resource_items_fts"
+    " WHERE resource_items_fts MATCH ? AND rowid BETWEEN ? AND ?"
+    f" ORDER BY bm25(resource_items_fts, {_COLUMN_WEIGHTS}) LIMIT ?"
+    ") m JOIN resource_items r ON r.id = m.rowid "
+    "WHERE ? IS NULL OR r.topic_key = ?"
+)
+_ALL_ROWS = (-(2 ** 63), 2 ** 63 - 1)
+
+
+def _topic_rows(conn, table, topic_key):
+    """
+    (first, last) row id of a topic's rows. A topic's rows are written in
+    one transaction, so the range holds only them, and FTS5 skips the rest
+    of the index instead of filtering its matches afterwards.
+    """
+    if topic_key is None:
+        return _ALL_ROWS
+    row = conn.execute(f"SELECT MIN(id), MAX(id) FROM {table} WHERE topic_key = ?", (topic_key,)).fetchone()
+    return row if row[0] is not None else (0, -1)
+
+
+def _stem(word):
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def _score(terms, text):
+    """
+    BM25-style term-frequency score of a step or title, with length
+    normalization. Terms count whole words, compared after stripping
+    common suffixes ("algorithms" matches "algorithm", "go" does not match
+    "algorithms"); a last term short enough to be a prefix in match_query
+    also counts words it starts, at _PREFIX_WEIGHT. Every match contains
+    every term, so BM25's IDF weights would be the same for all of them
+    and are left out; rows matched only through their phase or topic score
+    0 and are dropped.
+    """
+    words = _TOKEN.findall(text.lower())
+    stems = [_stem(word) for word in words]
+    norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * len(text) / _AVG_CHARS)
+    score = 0.0
+    for position, term in enumerate(terms):
+        stem = _stem(term)
+        tf = sum(1 for word in stems if word == stem)
+        if position == len(terms) - 1 and len(term) <= _MAX_PREFIX:
+            tf += _PREFIX_WEIGHT * sum(1 for word, word_stem in zip(words, stems)
+                                       if word_stem != stem and word.startswith(term))
+        score += tf / (tf + norm)
+    return score
+
+
+def _step_result(row, score):
+    topic, phase, step_index, kind, text = row
+    return {"type": STEP, "topic": topic, "phase": phase, "step": step_index + 1, "kind": kind, "text": text,
+            "score": round(score, 4)}
+
+
+def _resource_result(row, score):
+    topic, source, title, url = row
+    return {"type": "resource", "topic": topic, "source": source, "title": title, "url": url,
+            "score": round(score, 4)}
+
+
+def search(text, kinds=(ROADMAP, RESOURCES), topic=None, limit=20):
+    """
+    Roadmap steps and resources matching text, best first, as dicts with a
+    "type" of "step" or "resource". topic restricts results to one topic.
+    FTS5 finds and ranks the matches (BM25, weighted towards the step or
+    title); the best SEARCH_RANK_WINDOW of each table are re-scored on
+    whole words, which bounds the Python work for words found all over
+    the catalog.
+    """
+    query = match_query(text)
+    terms = _TOKEN.findall(text.lower())
+    topic_key = normalize_topic(topic) if topic else None
+    limit = min(limit, SEARCH_MAX_RESULTS)
+    conn = get_conn()
+    scored = []
+    if ROADMAP in kinds:
+        first, last = _topic_rows(conn, "roadmap_steps", topic_key)
+        rows = conn.execute(_SEARCH_STEPS, (query, first, last, SEARCH_RANK_WINDOW, topic_key, topic_key))
+        for row in rows:
+            score = _score(terms, row[4])
+            if score > 0:
+                scored.append((score, _step_result, row))
+    if RESOURCES in kinds:
+        first, last = _topic_rows(conn, "resource_items", topic_key)
+        rows = conn.execute(_SEARCH_RESOURCES, (query, first, last, SEARCH_RANK_WINDOW, topic_key, topic_key))
+        for row in rows:
+            score = _score(terms, row[2])
+            if score > 0:
+                scored.append((score, _resource_result, row))
+    # nlargest keeps the earlier (BM25-order) entry first among equal scores
+    best = heapq.nlargest(limit, scored, key=lambda entry: entry[0])
+    return [result(row, score) for score, result, row in best]
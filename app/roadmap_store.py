@@ -0,0 +1,156 @@
+# app/roadmap_store.py
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.cache import get_cache, normalize_topic, record_lookup
+from app.catalog_store import get_precomputed_roadmap
+from app.roadmap_generator import generate_roadmap, stream_roadmap as stream_roadmap_lines, router
+from app.roadmap_index import index_roadmap
+
+logger = logging.getLogger(__name__)
+
+# Serve cached roadmaps as-is while younger than this...
+ROADMAP_FRESH_SECONDS = int(os.getenv("ROADMAP_FRESH_SECONDS", "86400"))
+# ...serve them and refresh in the background until this age, then regenerate inline.
+ROADMAP_MAX_AGE_SECONDS = int(os.getenv("ROADMAP_MAX_AGE_SECONDS", "604800"))
+# How long a coalesced caller waits for the in-flight generation
+ROADMAP_WAIT_SECONDS = float(os.getenv("ROADMAP_WAIT_SECONDS", "60"))
+
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="roadmap-refresh")
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def roadmap_cache_key(topic, model):
+    return f"roadmap:{model}:{normalize_topic(topic)}"
+
+
+def is_error_roadmap(roadmap):
+    return not roadmap or roadmap.startswith("Error generating roadmap:")
+
+
+def store_roadmap(key, roadmap, precomputed=False, topic=None):
+    """Cache a roadmap; with topic, also index its steps for /api/search."""
+    entry = {"roadmap": roadmap, "generated_at": time.time()}
+    if precomputed:
+        # Refreshed by database/precompute.py, never regenerated on request
+        entry["precomputed"] = True
+    get_cache().set(key, entry, ROADMAP_MAX_AGE_SECONDS)
+    if topic is not None:
+        try:
+            index_roadmap(topic, roadmap)
+        except sqlite3.Error as e:
+            logger.warning("Indexing roadmap for %r failed: %s", topic, e)
+
+
+def copy_cached_roadmaps(old_topic, new_topic):
+    """Cache each model's roadmap for old_topic under new_topic too, unless it has one."""
+    cache = get_cache()
+    for model in {route.model for route in router.routes}:
+        found, entry = cache.get(roadmap_cache_key(old_topic, model))
+        new_key = roadmap_cache_key(new_topic, model)
+        if found and not cache.get(new_key)[0]:
+            cache.set(new_key, entry, ROADMAP_MAX_AGE_SECONDS)
+
+
+def load_precomputed(key, topic):
+    """Copy a catalog topic's precomputed roadmap into the cache; returns it or None."""
+    row = get_precomputed_roadmap(topic)
+    if row is None:
+        return None
+    store_roadmap(key, row[0], precomputed=True)
+    return row[0]
+
+
+def _generate_once(key, topic, model):
+    """
+    Run generate_roadmap for key, coalescing concurrent callers onto one
+    in-flight Groq call. Successful results are written to the cache.
+    """
+    with _inflight_lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _InFlight()
+            _inflight[key] = call
+
+    if not leader:
+        if call.done.wait(ROADMAP_WAIT_SECONDS):
+            return call.result
+        return "Error generating roadmap: timed out waiting for in-flight generation"
+
+    try:
+        call.result = generate_roadmap(topic)
+        if not is_error_roadmap(call.result):
+            store_roadmap(key, call.result, topic=topic)
+        return call.result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        call.done.set()
+
+
+def get_roadmap(topic, model=None):
+    """
+    Return a roadmap for topic, generating it only when nothing usable is cached.
+
+    Fresh entries are returned directly. Stale entries are returned
+    immediately while one background refresh regenerates them. Misses are
+    served from the precomputed catalog when the topic is in it, and
+    otherwise wait on a single shared generation per (topic, model).
+    """
+    model = model or router.primary_model
+    key = roadmap_cache_key(topic, model)
+
+    found, entry = get_cache().get(key)
+    record_lookup("roadmap", found)
+    if not found:
+        return load_precomputed(key, topic) or _generate_once(key, topic, model)
+
+    age = time.time() - entry["generated_at"]
+    if age > ROADMAP_FRESH_SECONDS and not entry.get("precomputed"):
+        with _inflight_lock:
+            refreshing = key in _inflight
+        if not refreshing:
+            _refresh_executor.submit(_generate_once, key, topic, model)
+    return entry["roadmap"]
+
+
+def stream_roadmap(topic, model=None):
+    """
+    Yield roadmap steps line by line. A cached roadmap is replayed directly;
+    otherwise the model's stream is relayed as it arrives and the finished
+    roadmap is stored for later requests.
+    """
+    model = model or router.primary_model
+    key = roadmap_cache_key(topic, model)
+
+    found, entry = get_cache().get(key)
+    record_lookup("roadmap", found)
+    if not found:
+        roadmap = load_precomputed(key, topic)
+        found, entry = roadmap is not None, {"roadmap": roadmap}
+    if found:
+        yield from entry["roadmap"].split("\n")
+        return
+
+    lines = []
+    for line in stream_roadmap_lines(topic):
+        lines.append(line)
+        yield line
+
+    if lines:
+        store_roadmap(key, "\n".join(lines), topic=topic)
@@ -1,27 +1,87 @@
-from flask import Flask, Blueprint, request, jsonify
+from flask import Flask, Blueprint, Response, request, jsonify, stream_with_context
 import json
+import logging
 import os
+import shutil
+import sqlite3
+import tempfile
+import uuid
+from datetime import date
+
 from werkzeug.utils import secure_filename
-import requests
 
-# Local modules
+# Local modules. Modules that pull in requests, numpy or pandas are imported
+# inside the routes that use them, so the app factory stays cheap on cold start.
 from app.resume_store import save_resume_text, get_saved_resume
-from app.youtube_fetcher import fetch_youtube_videos
-from app.coursera_fetcher import fetch_coursera_courses
-from app.github_fetcher import fetch_github_repos
-from app.roadmap_generator import generate_roadmap
-from app.resume_interview_engine import extract_text_from_resume, generate_interview_questions
+from app.roadmap_index import (
+    RESOURCE_REINDEX_SECONDS,
+    ROADMAP,
+    RESOURCES,
+    index_resources,
+    parse_roadmap,
+    roadmap_steps,
+    search,
+)
+from app.roadmap_store import get_roadmap as get_cached_roadmap, is_error_roadmap, stream_roadmap
+from app.scheduler import PLAN_MAX_DAYS, add_topic, get_plan, log_sessions, set_availability
+from app.resume_interview_engine import (
+    extract_text_from_resume_cached,
+    generate_interview_questions,
+    generate_interview_questions_cached,
+    stream_interview_questions,
+)
+from app.skill_extractor import extract_skills, top_skills
+from app.topic_canonicalizer import canonical_topic
+from app.study_store import (
+    STUDY_HISTORY_LIMIT,
+    create_user,
+    get_study_history,
+    get_study_totals,
+    get_user,
+    study_log_row,
+)
 from app.utils import log_user_activity
-from app.ml_engine import EXTERNAL_API_URL
+from app.jobs import submit_resume_job, get_job
+from app.catalog_store import get_precomputed_resources
+from app.content_cache import sha256_bytes
+from app import admission, metrics
+
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 main = Blueprint("main", __name__)
 
+
+def _sse(event, data):
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _sse_response(events):
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _feature_error(e):
+    """400 response for a FeatureError from the in-process model."""
+    body = {"error": str(e)}
+    if e.field:
+        body["field"] = e.field
+    return jsonify(body), 400
+
 # ✅ Health Check
 @main.route("/")
 def index():
     return jsonify({"message": "✅ AI Study Planner API is running"})
 
+# ✅ Prometheus metrics (per process)
+@main.route("/metrics", methods=["GET"])
+def metrics_route():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 # ✅ Study Time Prediction (Proxy to External API) with CORS preflight
 @main.route("/api/predict", methods=["POST", "OPTIONS"])
 def api_predict():
@@ -29,86 +89,63 @@ def api_predict():
     if request.method == "OPTIONS":
         return ("", 200)
 
+    import requests
+    from app import http_client
+    from app.local_predictor import FeatureError, prediction_payload
+    from app.ml_engine import (
+        EXTERNAL_API_URL,
+        PREDICTOR_MODE,
+        PREDICTOR_READ_TIMEOUT,
+        PREDICTOR_RETRIES,
+        shadow_predict,
+    )
+
     try:
         incoming_json = request.get_json(force=True, silent=True) or {}
 
-        # Try forwarding to the external API with basic retries
-        timeouts = [15, 30]
-        last_err = None
-        for t in timeouts:
+        if PREDICTOR_MODE in ("local", "shadow"):
             try:
-                resp = requests.post(
-                    EXTERNAL_API_URL,
-                    headers={"Content-Type": "application/json"},
-                    json=incoming_json,
-                    timeout=t,
-                )
-                if resp.status_code == 200:
-                    # Ensure non-empty and JSON response; otherwise fallback
-                    raw_text = (resp.text or "").strip()
-                    if not raw_text:
-                        last_err = RuntimeError("External API returned 200 with empty body")
-                    else:
-                        try:
-                            data = resp.json()
-                            return jsonify(data), 200
-                        except ValueError:
-                            last_err = RuntimeError("External API returned 200 with non-JSON body")
+                if PREDICTOR_MODE == "shadow":
+                    shadow_predict(incoming_json)
+                return jsonify(prediction_payload(incoming_json, "Predicted by the in-process model")), 200
+            except FeatureError as e:
+                return _feature_error(e)
+
+        # Forward to the external API; the shared client retries with backoff
+        # and its circuit breaker fails fast while the predictor is down
+        last_err = None
+        try:
+            resp = http_client.post(
+                EXTERNAL_API_URL,
+                headers={"Content-Type": "application/json"},
+                json=incoming_json,
+                read_timeout=PREDICTOR_READ_TIMEOUT,
+                retries=PREDICTOR_RETRIES,
+                upstream="predictor",
+            )
+            if resp.status_code == 200:
+                # Ensure non-empty and JSON response; otherwise fallback
+                raw_text = (resp.text or "").strip()
+                if not raw_text:
+                    last_err = RuntimeError("External API returned 200 with empty body")
+                else:
+                    try:
+                        data = resp.json()
+                        return jsonify(data), 200
+                    except ValueError:
+                        last_err = RuntimeError("External API returned 200 with non-JSON body")
+            else:
                 last_err = RuntimeError(f"External API {resp.status_code}: {resp.text[:200]}")
-            except requests.exceptions.RequestException as e:
-                last_err = e
+        except requests.exceptions.RequestException as e:
+            last_err = e
 
-        # Fallback: compute a simple heuristic prediction so the UI remains usable
+        # Fallback: use the in-process model so the UI remains usable
         try:
-            failures = int(incoming_json.get("failures", 0) or 0)
-            higher = int(incoming_json.get("higher", 0) or 0)
-            absences = int(incoming_json.get("absences", 0) or 0)
-            freetime = int(incoming_json.get("freetime", 3) or 3)
-            goout = int(incoming_json.get("goout", 3) or 3)
-            famrel = int(incoming_json.get("famrel", 3) or 3)
-            famsup = int(incoming_json.get("famsup", 0) or 0)
-            schoolsup = int(incoming_json.get("schoolsup", 0) or 0)
-            paid = int(incoming_json.get("paid", 0) or 0)
-            traveltime = int(incoming_json.get("traveltime", 2) or 2)
-            health = int(incoming_json.get("health", 3) or 3)
-            internet = int(incoming_json.get("internet", 1) or 1)
-            age = int(incoming_json.get("age", 18) or 18)
-
-            # Simple deterministic heuristic in hours/day
-            base = 0.5
-            score = (
-                base
-                + 0.8 * freetime
-                - 0.10 * goout
-                + 0.10 * (famrel - 3)
-                + 0.05 * famsup
-                + 0.03 * schoolsup
-                + 0.02 * paid
-                - 0.15 * traveltime
-                + 0.20 * (health - 3)
-                + 0.20 * internet
-                + 0.30 * higher
-                - 0.20 * failures
-                - 0.05 * absences
-                + 0.02 * max(0, 25 - abs(age - 18))
-            )
-            predicted_hours = max(0.25, min(8.0, round(score, 2)))
-
-            fallback = {
-                "predicted_hours": predicted_hours,
-                "confidence_level": "60%",
-                "key_influencing_factors": [
-                    "Free time",
-                    "Health",
-                    "Travel time",
-                    "Failures/absences",
-                ],
-                "recommendation": (
-                    "Focus on consistent short study blocks. Reduce distractions and align study windows with high energy periods."
-                ),
-                "note": "Returned by fallback heuristic due to external API timeout",
-            }
-            return jsonify(fallback), 200
+            return jsonify(prediction_payload(
+                incoming_json, "Returned by fallback heuristic due to external API timeout"
+            )), 200
+        except FeatureError as e:
+            return _feature_error(e)
         except Exception:
             # If fallback itself fails, return the last API error
             return jsonify({"error": f"API request failed: {last_err}"}), 502
@@ -116,49 +153,207 @@ def api_predict():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-# ✅ Unified Resource Fetch
+PREDICT_BATCH_CHUNK_ROWS = int(os.getenv("PREDICT_BATCH_CHUNK_ROWS", "10000"))
+
+
+def _batch_chunks():
+    """
+    Yield (DataFrame, objects) for at most PREDICT_BATCH_CHUNK_ROWS rows of
+    the request at a time; objects marks the JSON rows that are objects
+    (None for CSV, where every row is).
+    """
+    import numpy as np
+    import pandas as pd
+
+    if "file" in request.files:
+        # Flask closes uploaded files when the view returns, before the
+        # streamed response is consumed, so spool the upload to a file we own
+        source = tempfile.TemporaryFile()
+        shutil.copyfileobj(request.files["file"].stream, source)
+        source.seek(0)
+    elif request.mimetype == "text/csv":
+        source = request.stream
+    else:
+        rows = request.get_json(force=True, silent=True)
+        if not isinstance(rows, list):
+            raise ValueError("Expected a JSON array of feature objects or a CSV upload")
+        for start in range(0, len(rows), PREDICT_BATCH_CHUNK_ROWS):
+            chunk = rows[start:start + PREDICT_BATCH_CHUNK_ROWS]
+            objects = np.array([isinstance(r, dict) for r in chunk], dtype=bool)
+            yield pd.DataFrame.from_records([r if ok else {} for r, ok in zip(chunk, objects)]), objects
+        return
+
+    for frame in pd.read_csv(source, chunksize=PREDICT_BATCH_CHUNK_ROWS, dtype=str):
+        yield frame, None
+
+# ✅ Batch Study Time Prediction (JSON array or CSV upload -> NDJSON, one line per row)
+@main.route("/api/predict/batch", methods=["POST"])
+def api_predict_batch():
+    import numpy as np
+    import pandas as pd
+    from app.local_predictor import frame_to_features, get_model
+
+    chunks = _batch_chunks()
+    try:
+        first = next(chunks, None)
+    except (ValueError, pd.errors.ParserError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    def results():
+        model = get_model()
+        offset = 0
+        chunk = first
+        while chunk is not None:
+            frame, objects = chunk
+            if objects is None:
+                objects = np.ones(len(frame), dtype=bool)
+            X, valid = frame_to_features(frame)
+            hours = model.predict(X)
+            valid &= np.isfinite(hours)
+            lines = []
+            for i, (h, ok, is_object) in enumerate(zip(hours.tolist(), valid.tolist(), objects.tolist())):
+                if not is_object:
+                    line = {"row": offset + i, "error": "Row is not a JSON object"}
+                elif not ok:
+                    line = {"row": offset + i, "error": "Non-numeric or non-finite feature value"}
+                else:
+                    line = {"row": offset + i, "predicted_hours": h}
+                lines.append(json.dumps(line))
+            yield "\n".join(lines) + "\n"
+            offset += len(frame)
+            try:
+                chunk = next(chunks, None)
+            except (ValueError, pd.errors.ParserError) as e:
+                yield json.dumps({"error": str(e)}) + "\n"
+                return
+
+    return Response(stream_with_context(results()), mimetype="application/x-ndjson")
+
+# ✅ Record observed study hours for a feature row (training data for retrain_model)
+@main.route("/api/predict/outcome", methods=["POST"])
+def api_predict_outcome():
+    from app.local_predictor import log_outcome
+
+    data = request.get_json(silent=True) or {}
+    try:
+        log_outcome(data, data["actual_hours"])
+    except (KeyError, TypeError, ValueError, OverflowError) as e:
+        return jsonify({"error": f"Invalid outcome: {e}"}), 400
+    return jsonify({"status": "logged"}), 201
+
+# ✅ Unified Resource Fetch (?topic=..., or ?user_id=... to use the saved resume's top skill)
 @main.route("/api/resources")
 def api_resources():
     topic = request.args.get("topic", "").strip()
+    user_id = request.args.get("user_id", "")
+    if not topic and user_id:
+        skills = top_skills(get_saved_resume(user_id), 1)
+        if not skills:
+            return jsonify({"error": "No skills found in saved resume"}), 404
+        topic = skills[0]
     if not topic:
         return jsonify({"error": "Missing topic parameter"}), 400
+    topic = canonical_topic(topic)
 
-    try:
-        youtube_videos = []
-        coursera_courses = []
-        github_repos = []
-
-        try:
-            youtube_videos = fetch_youtube_videos(topic)
-        except Exception as e:
-            print("❌ YouTube error:", e)
+    from app.resource_aggregator import fetch_all_resources
 
-        try:
-            coursera_courses = fetch_coursera_courses(topic)
-        except Exception as e:
-            print("❌ Coursera error:", e)
-
-        try:
-            github_repos = fetch_github_repos(topic)
-        except Exception as e:
-            print("❌ GitHub error:", e)
-
-        return jsonify({
-            "youtube_videos": youtube_videos,
-            "coursera_courses": coursera_courses,
-            "github_repos": github_repos
-        })
+    try:
+        bundle = get_precomputed_resources(topic)
+        if bundle is None:
+            bundle = fetch_all_resources(topic)
+            if all(status["state"] == "ok" for status in bundle["status"].values()):
+                try:
+                    index_resources(topic, bundle, max_age=RESOURCE_REINDEX_SECONDS)
+                except sqlite3.Error as e:
+                    logger.warning("Indexing resources for %r failed: %s", topic, e)
+        return jsonify({**bundle, "topic": topic})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# ✅ Skills found in a resume (POST {"resumeText": ...} or GET ?user_id=... for the saved one)
+@main.route("/api/skills", methods=["GET", "POST"])
+def api_skills():
+    if request.method == "POST":
+        data = request.get_json(silent=True)
+        if not data or "resumeText" not in data:
+            return jsonify({"error": "Missing resumeText in request"}), 400
+        resume_text = data["resumeText"] or ""
+    else:
+        user_id = request.args.get("user_id", "")
+        if not user_id:
+            return jsonify({"error": "Missing user_id"}), 400
+        resume_text = get_saved_resume(user_id)
+        if not resume_text:
+            return jsonify({"error": "No saved resume found"}), 404
+
+    return jsonify({"skills": extract_skills(resume_text)})
+
 # ✅ Roadmap API
 @main.route("/api/roadmap", methods=["GET"])
 def get_roadmap():
-    topic = request.args.get("topic", "")
+    topic = request.args.get("topic", "").strip()
+    if not topic:
+        return jsonify({"error": "No topic provided"}), 400
+    topic = canonical_topic(topic)
+    roadmap = get_cached_roadmap(topic)
+    if is_error_roadmap(roadmap):
+        return jsonify({"roadmap": roadmap, "topic": topic})
+    return jsonify({"roadmap": roadmap, "topic": topic, "phases": parse_roadmap(roadmap)["phases"]})
+
+# ✅ Full-text search over stored roadmap steps and resources (?q=...&type=roadmap|resources&topic=...&limit=N)
+@main.route("/api/search", methods=["GET"])
+def api_search():
+    query = request.args.get("q", "")
+    kind = request.args.get("type", "")
+    if kind and kind not in (ROADMAP, RESOURCES):
+        return jsonify({"error": "type must be roadmap or resources"}), 400
+    topic = request.args.get("topic", "").strip()
+    topic = canonical_topic(topic, learn=False) if topic else None
+    try:
+        limit = max(int(request.args.get("limit", 20)), 1)
+        results = search(query, (kind,) if kind else (ROADMAP, RESOURCES), topic, limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"query": query, "results": results})
+
+# ✅ Roadmap API (streamed as server-sent events, one step per event)
+@main.route("/api/roadmap/stream", methods=["GET"])
+def stream_roadmap_route():
+    topic = request.args.get("topic", "").strip()
     if not topic:
         return jsonify({"error": "No topic provided"}), 400
-    roadmap = generate_roadmap(topic)
-    return jsonify({"roadmap": roadmap})
+    topic = canonical_topic(topic)
+
+    def events():
+        count = 0
+        try:
+            for step in stream_roadmap(topic):
+                count += 1
+                yield _sse("step", {"index": count, "text": step})
+        except Exception as e:
+            yield _sse("error", {"error": f"Error generating roadmap: {e}"})
+            return
+        yield _sse("done", {"steps": count})
+
+    return _sse_response(events())
+
+def _save_upload(file):
+    """
+    Store an uploaded resume under the SHA-256 of its bytes, so identical
+    uploads share one file and different files never overwrite each other.
+    Returns (filepath, digest).
+    """
+    data = file.read()
+    digest = sha256_bytes(data)
+    _, ext = os.path.splitext(secure_filename(file.filename or ""))
+    filepath = os.path.join("uploads", f"{digest}{ext.lower()}")
+    os.makedirs("uploads", exist_ok=True)
+    if not os.path.exists(filepath):
+        tmp_path = f"{filepath}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+    return filepath, digest
 
 # ✅ Interview Q&A from Resume Upload (with user ID)
 @main.route("/api/interview_questions", methods=["POST"])
@@ -167,25 +362,41 @@ def interview_questions():
         return jsonify({"error": "Missing resume or user ID"}), 400
 
     user_id = request.form["user_id"]
-    file = request.files["resume"]
-    filename = secure_filename(file.filename)
-    filepath = os.path.join("uploads", filename)
-    os.makedirs("uploads", exist_ok=True)
-    file.save(filepath)
+    filepath, digest = _save_upload(request.files["resume"])
 
     try:
-        resume_text = extract_text_from_resume(filepath)
-        print("📄 Resume Content:\n", resume_text[:500])  # Debug print for verification
+        resume_text = extract_text_from_resume_cached(filepath, digest)
+        logger.debug("Extracted %d characters from upload %s", len(resume_text), digest[:12])
         # If extraction failed, return a clear 400 instead of a generic network error on client
         if isinstance(resume_text, str) and resume_text.startswith("Error reading resume:"):
             return jsonify({"error": resume_text}), 400
 
         save_resume_text(user_id, resume_text)  # ✅ Store for future use
-        qa = generate_interview_questions(resume_text)
+        qa = generate_interview_questions_cached(resume_text, digest)
         return jsonify({"questions": qa})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# ✅ Interview Q&A from Resume Upload, processed in the background
+@main.route("/api/interview_questions/jobs", methods=["POST"])
+def interview_questions_job():
+    if "resume" not in request.files or "user_id" not in request.form:
+        return jsonify({"error": "Missing resume or user ID"}), 400
+
+    user_id = request.form["user_id"]
+    filepath, digest = _save_upload(request.files["resume"])
+
+    job_id = submit_resume_job(user_id, filepath, digest)
+    return jsonify({"job_id": job_id, "status_url": f"/api/jobs/{job_id}"}), 202
+
+# ✅ Background job status/result
+@main.route("/api/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
 # ✅ Generate Q&A from raw resume text (Blueprint route)
 @main.route("/api/generate-questions", methods=["POST"])
 def generate_questions_from_text():
@@ -208,17 +419,133 @@ def generate_questions_blueprint():
             return jsonify({"error": "Missing resumeText in request"}), 400
 
         resume_text = data["resumeText"]
-        print("🔍 Flask route - resumeText length:", len(resume_text))
-        print("🔍 Flask route - GROQ_API_KEY set:", bool(os.getenv("GROQ_API_KEY")))
         qa_pairs = generate_interview_questions(resume_text)
-        print("🔍 Flask route - qa_pairs returned:", len(qa_pairs) if qa_pairs else 0)
-        if qa_pairs and len(qa_pairs) > 0:
-            print("🔍 Flask route - first pair has answer:", bool(qa_pairs[0].get("answer")))
         return jsonify({"qaPairs": qa_pairs})
     except Exception as e:
-        print("🔍 Flask route - exception:", str(e))
+        logger.exception("Interview Q&A failed: %s", e)
         return jsonify({"error": str(e)}), 500
 
+# ✅ Q&A from "resumeText", streamed as server-sent events, one pair per event
+@main.route("/api/interview/stream", methods=["POST"])
+def stream_interview_route():
+    data = request.get_json(silent=True)
+    if not data or "resumeText" not in data:
+        return jsonify({"error": "Missing resumeText in request"}), 400
+
+    resume_text = data["resumeText"]
+
+    def events():
+        count = 0
+        try:
+            for pair in stream_interview_questions(resume_text):
+                count += 1
+                yield _sse("qa", pair)
+        except Exception as e:
+            yield _sse("error", {"error": str(e)})
+            return
+        yield _sse("done", {"pairs": count})
+
+    return _sse_response(events())
+
+# ✅ Create (or look up) a user by username
+@main.route("/api/users", methods=["POST"])
+def api_create_user():
+    data = request.get_json(silent=True) or {}
+    username = str(data.get("username", "")).strip()
+    if not username:
+        return jsonify({"error": "Missing username"}), 400
+    return jsonify({"user_id": create_user(username, data.get("email"))}), 201
+
+# ✅ Record study time: one {"user_id", "date", "hours_spent"} object or a list of them
+@main.route("/api/study_logs", methods=["POST"])
+def api_add_study_logs():
+    data = request.get_json(silent=True)
+    entries = data if isinstance(data, list) else [data]
+    try:
+        rows = [study_log_row(entry) for entry in entries]
+        inserted = log_sessions(rows)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except sqlite3.IntegrityError:
+        return jsonify({"error": "Unknown user_id"}), 404
+    return jsonify({"inserted": inserted}), 201
+
+# ✅ Study history for a user (?user_id=...&from=YYYY-MM-DD&to=YYYY-MM-DD&limit=...)
+@main.route("/api/study_logs", methods=["GET"])
+def api_study_history():
+    try:
+        user_id = int(request.args["user_id"])
+        start, end = (
+            date.fromisoformat(request.args[name]).isoformat() if request.args.get(name) else None
+            for name in ("from", "to")
+        )
+        # SQLite reads a negative LIMIT as no limit at all
+        limit = min(max(int(request.args.get("limit", STUDY_HISTORY_LIMIT)), 1), STUDY_HISTORY_LIMIT)
+    except (KeyError, ValueError) as e:
+        return jsonify({"error": f"Invalid query: {e}"}), 400
+    if get_user(user_id) is None:
+        return jsonify({"error": "User not found"}), 404
+    return jsonify({
+        "logs": get_study_history(user_id, start, end, limit),
+        **get_study_totals(user_id, start, end),
+    })
+
+# ✅ Study plan for a user (?user_id=...&date=YYYY-MM-DD&days=N), built from their study items
+@main.route("/api/plan", methods=["GET"])
+def api_plan():
+    try:
+        user_id = int(request.args["user_id"])
+        day = date.fromisoformat(request.args["date"]) if request.args.get("date") else None
+        days = min(max(int(request.args.get("days", 1)), 1), PLAN_MAX_DAYS)
+    except (KeyError, ValueError) as e:
+        return jsonify({"error": f"Invalid query: {e}"}), 400
+    if get_user(user_id) is None:
+        return jsonify({"error": "User not found"}), 404
+    return jsonify({"user_id": user_id, "plans": get_plan(user_id, day, days)})
+
+# ✅ Add a topic's roadmap steps to a user's study items (steps default to the topic's roadmap)
+@main.route("/api/plan/topics", methods=["POST"])
+def api_plan_add_topic():
+    data = request.get_json(silent=True) or {}
+    topic = str(data.get("topic", "")).strip()
+    steps = data.get("steps")
+    try:
+        user_id = int(data["user_id"])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Missing or invalid user_id"}), 400
+    if not topic:
+        return jsonify({"error": "No topic provided"}), 400
+    if steps is not None and not (isinstance(steps, list) and all(isinstance(step, str) for step in steps)):
+        return jsonify({"error": "steps must be a list of strings"}), 400
+    if get_user(user_id) is None:
+        return jsonify({"error": "User not found"}), 404
+    topic = canonical_topic(topic)
+    if steps is None:
+        # Only this path may call Groq, so only it takes a slot
+        with admission.acquire("groq"):
+            roadmap = get_cached_roadmap(topic)
+        if is_error_roadmap(roadmap):
+            return jsonify({"error": roadmap or "Empty roadmap"}), 502
+        steps = roadmap_steps(roadmap)
+    steps = [step.strip() for step in steps if step.strip()]
+    return jsonify({"topic": topic, "steps": len(steps), "added": add_topic(user_id, topic, steps)}), 201
+
+# ✅ Set a user's free study minutes: a number (every day), 7 numbers (Mon-Sun) or {"mon": 90, ...}
+@main.route("/api/plan/availability", methods=["PUT"])
+def api_plan_availability():
+    data = request.get_json(silent=True) or {}
+    try:
+        user_id = int(data["user_id"])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Missing or invalid user_id"}), 400
+    if get_user(user_id) is None:
+        return jsonify({"error": "User not found"}), 404
+    try:
+        availability = set_availability(user_id, data.get("minutes"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"user_id": user_id, "availability": availability})
+
 # ✅ Retrieve Saved Resume
 @main.route("/api/saved_resume", methods=["GET"])
 def get_saved():
@@ -1,11 +1,395 @@
-def generate_daily_plan(user_id):
-    # In real case, fetch user preferences from DB
-    plan = {
-        "user": user_id,
-        "tasks": [
-            {"task": "Watch a tutorial video", "duration": "1 hour"},
-            {"task": "Practice coding problems", "duration": "2 hours"},
-            {"task": "Revise previous topics", "duration": "1 hour"},
-        ]
+# app/scheduler.py
+"""
+Daily study plans from a user's roadmap steps, free time and study history.
+
+Each roadmap step a user takes on becomes a study item. Studying an item
+schedules its next review with SM-2 spaced-repetition intervals (1 day,
+6 days, then the previous interval times the item's ease), so items the
+user finds hard come back sooner. A day's plan is filled from a priority
+queue of what is ready: overdue reviews first (oldest due date first),
+then new steps in roadmap order, until the user's free minutes for that
+weekday run out.
+
+Plans are stored per (user, day). The nightly batch (database/build_plans.py)
+writes them for every user; /api/plan builds a missing one on demand.
+Logging a session only updates the studied item, patches the stored plan
+for that day and drops the user's stored plans for later days, which may
+already list the item; nothing else is rescheduled.
+"""
+
+import heapq
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from itertools import groupby
+
+from app.cache import normalize_topic
+from app.db import STUDY_PLANNER_DB, bulk_insert, connect, get_conn, transaction
+from app.study_store import add_study_logs
+
+# Free minutes per day for users who have not set their availability
+DEFAULT_DAILY_MINUTES = int(os.getenv("DEFAULT_DAILY_MINUTES", "60"))
+# Estimated minutes to study a new roadmap step, and to review one
+STEP_MINUTES = int(os.getenv("STEP_MINUTES", "45"))
+REVIEW_MINUTES = int(os.getenv("REVIEW_MINUTES", "15"))
+# New steps started per day at most, however much time is free
+NEW_STEPS_PER_DAY = int(os.getenv("NEW_STEPS_PER_DAY", "2"))
+PLAN_MAX_DAYS = 14
+
+# SM-2 parameters; projected plans assume each planned session goes well
+MIN_EASE = 1.3
+DEFAULT_QUALITY = 4
+PASSING_QUALITY = 3
+
+NEW = "new"
+REVIEW = "review"
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+_ITEM_COLUMNS = "id, topic, step_index, title, minutes, repetitions, interval_days, ease, due_date"
+_INSERT_PLAN = "INSERT OR REPLACE INTO study_plans (user_id, date, plan, generated_at) VALUES (?, ?, ?, ?)"
+
+
+def next_review(repetitions, interval_days, ease, quality):
+    """SM-2: (repetitions, interval_days, ease) after a session graded quality (0-5)."""
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if quality < PASSING_QUALITY:
+        return 0, 1.0, ease
+    if repetitions == 0:
+        interval_days = 1.0
+    elif repetitions == 1:
+        interval_days = 6.0
+    else:
+        interval_days = interval_days * ease
+    return repetitions + 1, interval_days, ease
+
+
+def _item(row):
+    return dict(zip(("id", "topic", "step_index", "title", "minutes", "repetitions", "interval_days", "ease",
+                     "due_date"), row))
+
+
+def _task(item, kind):
+    return {
+        "item_id": item["id"],
+        "topic": item["topic"],
+        "step": item["step_index"] + 1,
+        "title": item["title"],
+        "kind": kind,
+        "minutes": item["minutes"] if kind == NEW else min(REVIEW_MINUTES, item["minutes"]),
+        "done": False,
     }
-    return plan
+
+
+def plan_days(items, availability, start, days=1, logged_minutes=0):
+    """
+    Plans for `days` consecutive days from start (a date), as dicts with the
+    day's available, planned and logged minutes and its tasks.
+
+    items are study item dicts (see _ITEM_COLUMNS); availability is the
+    free minutes for each weekday, Monday first; logged_minutes is time
+    already studied on the start day. Days after the first are a projection
+    that assumes every planned task is done.
+    """
+    waiting = []  # (due ordinal, id, item): reviews not due yet
+    ready = []  # ((0, due ordinal, id) or (1, step, id), item): the priority queue
+    for item in items:
+        if item["due_date"] is None:
+            ready.append(((1, item["step_index"], item["id"]), item))
+        else:
+            waiting.append((date.fromisoformat(item["due_date"]).toordinal(), item["id"], item))
+    heapq.heapify(ready)
+    heapq.heapify(waiting)
+
+    plans = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        ordinal = day.toordinal()
+        while waiting and waiting[0][0] <= ordinal:
+            due, item_id, item = heapq.heappop(waiting)
+            heapq.heappush(ready, ((0, due, item_id), item))
+
+        available = availability[day.weekday()]
+        logged = logged_minutes if offset == 0 else 0
+        remaining = available - logged
+        tasks, new_steps, deferred = [], 0, []
+        while ready and remaining > 0:
+            priority, item = heapq.heappop(ready)
+            kind = NEW if priority[0] == 1 else REVIEW
+            if kind == NEW and new_steps >= NEW_STEPS_PER_DAY:
+                heapq.heappush(ready, (priority, item))
+                break
+            task = _task(item, kind)
+            # Something that does not fit is still planned on an otherwise empty day,
+            # so users with little free time keep making progress
+            if task["minutes"] > remaining and tasks:
+                deferred.append((priority, item))
+                if kind == NEW:
+                    break
+                continue
+            tasks.append(task)
+            remaining -= task["minutes"]
+            new_steps += kind == NEW
+            if offset + 1 < days:
+                repetitions, interval, ease = next_review(
+                    item["repetitions"], item["interval_days"], item["ease"], DEFAULT_QUALITY
+                )
+                projected = {**item, "repetitions": repetitions, "interval_days": interval, "ease": ease}
+                heapq.heappush(waiting, (ordinal + max(1, round(interval)), item["id"], projected))
+        for entry in deferred:
+            heapq.heappush(ready, entry)
+
+        plans.append({
+            "date": day.isoformat(),
+            "available_minutes": available,
+            "planned_minutes": sum(task["minutes"] for task in tasks),
+            "logged_minutes": logged,
+            "tasks": tasks,
+        })
+    return plans
+
+
+def _user_items(conn, user_id):
+    return [_item(row) for row in conn.execute(
+        f"SELECT {_ITEM_COLUMNS} FROM study_items WHERE user_id = ?", (user_id,)
+    )]
+
+
+def get_availability(user_id, conn=None):
+    """Free minutes for each weekday, Monday first."""
+    availability = [DEFAULT_DAILY_MINUTES] * 7
+    rows = (conn or get_conn()).execute(
+        "SELECT weekday, minutes FROM study_availability WHERE user_id = ?", (user_id,)
+    )
+    for weekday, minutes in rows:
+        availability[weekday] = minutes
+    return availability
+
+
+def _logged_minutes(conn, user_id, day):
+    row = conn.execute(
+        "SELECT COALESCE(SUM(hours_spent), 0) FROM study_logs WHERE user_id = ? AND date = ?",
+        (user_id, day),
+    ).fetchone()
+    return round(row[0] * 60)
+
+
+def _invalidate_plans(conn, user_id):
+    """Drop stored plans from today on; they are rebuilt when next requested."""
+    conn.execute(
+        "DELETE FROM study_plans WHERE user_id = ? AND date >= ?", (user_id, date.today().isoformat())
+    )
+
+
+def add_topic(user_id, topic, steps, minutes=STEP_MINUTES):
+    """Add a roadmap's steps as study items; returns how many were new."""
+    conn = get_conn()
+    rows = [
+        (user_id, normalize_topic(topic), topic, index, step[:500], minutes)
+        for index, step in enumerate(steps)
+    ]
+    with transaction(conn):
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO study_items (user_id, topic_key, topic, step_index, title, minutes) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        added = conn.total_changes - before
+        _invalidate_plans(conn, user_id)
+    return added
+
+
+def rename_topic(conn, old_topic, new_topic):
+    """
+    Move study items of old_topic to new_topic within the caller's
+    transaction. Items whose step a user already has under new_topic stay
+    under the old key, so no progress is dropped.
+    """
+    old_key, new_key = normalize_topic(old_topic), normalize_topic(new_topic)
+    users = [row[0] for row in conn.execute(
+        "SELECT DISTINCT user_id FROM study_items WHERE topic_key = ?", (old_key,)
+    )]
+    conn.execute(
+        "UPDATE OR IGNORE study_items SET topic_key = ?, topic = ? WHERE topic_key = ?", (new_key, new_topic, old_key)
+    )
+    for user_id in users:
+        _invalidate_plans(conn, user_id)
+
+
+def set_availability(user_id, minutes):
+    """
+    Set a user's free minutes per weekday from one number (every day), a
+    list of seven numbers (Monday first) or a {"mon": ..., ...} dict.
+    Raises ValueError for anything else.
+    """
+    availability = get_availability(user_id)
+    if isinstance(minutes, dict):
+        unknown = set(minutes) - set(WEEKDAYS)
+        if unknown:
+            raise ValueError(f"Unknown weekdays: {', '.join(sorted(unknown))}")
+        for name, value in minutes.items():
+            availability[WEEKDAYS.index(name)] = value
+    elif isinstance(minutes, list) and len(minutes) == 7:
+        availability = list(minutes)
+    elif isinstance(minutes, (int, float)) and not isinstance(minutes, bool):
+        availability = [minutes] * 7
+    else:
+        raise ValueError("minutes must be a number, a list of 7 numbers or a weekday dict")
+    try:
+        availability = [int(value) for value in availability]
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("minutes must be whole numbers")
+    if any(not 0 <= value <= 24 * 60 for value in availability):
+        raise ValueError("minutes must be between 0 and 1440")
+
+    conn = get_conn()
+    with transaction(conn):
+        conn.executemany(
+            "INSERT OR REPLACE INTO study_availability (user_id, weekday, minutes) VALUES (?, ?, ?)",
+            [(user_id, weekday, value) for weekday, value in enumerate(availability)],
+        )
+        _invalidate_plans(conn, user_id)
+    return availability
+
+
+def _stored_plan(conn, user_id, day):
+    row = conn.execute("SELECT plan FROM study_plans WHERE user_id = ? AND date = ?", (user_id, day)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def _store_plan(conn, user_id, plan):
+    conn.execute(_INSERT_PLAN, (user_id, plan["date"], json.dumps(plan, separators=(",", ":")), time.time()))
+
+
+def _after_plan(items, plan, day):
+    """
+    items as they would be after the plan's open tasks are done on day (a
+    date), as plan_days projects them; finished tasks were already
+    rescheduled by log_sessions.
+    """
+    planned = {task["item_id"] for task in plan["tasks"] if not task["done"]}
+    projected = []
+    for item in items:
+        if item["id"] in planned:
+            repetitions, interval, ease = next_review(
+                item["repetitions"], item["interval_days"], item["ease"], DEFAULT_QUALITY
+            )
+            due = day + timedelta(days=max(1, round(interval)))
+            item = {**item, "repetitions": repetitions, "interval_days": interval, "ease": ease,
+                    "due_date": due.isoformat()}
+        projected.append(item)
+    return projected
+
+
+def get_plan(user_id, day=None, days=1):
+    """
+    Plans for `days` days from day (a date, default today). The first day's
+    plan is the stored one, built and stored if missing; the rest are
+    projected from the current item state, assuming the first day's tasks
+    get done.
+    """
+    conn = get_conn()
+    day = day or date.today()
+    stored = _stored_plan(conn, user_id, day.isoformat())
+    if stored is not None and days == 1:
+        return [stored]
+    items = _user_items(conn, user_id)
+    availability = get_availability(user_id, conn)
+    if stored is not None:
+        return [stored] + plan_days(_after_plan(items, stored, day), availability, day + timedelta(days=1), days - 1)
+    plans = plan_days(items, availability, day, days, _logged_minutes(conn, user_id, day.isoformat()))
+    _store_plan(conn, user_id, plans[0])
+    return plans
+
+
+def generate_daily_plan(user_id, day=None):
+    """The user's plan for one day (default today)."""
+    return get_plan(user_id, day)[0]
+
+
+def log_sessions(rows):
+    """
+    Insert study_log_row() tuples and apply them to the schedule: each
+    session naming an item reschedules that item (quality defaults to 4),
+    stored plans for the logged days are patched with the logged time and
+    finished tasks, and stored plans after the first day with a rescheduled
+    item are dropped (the nightly batch may have planned it there already).
+    Raises ValueError for items of another user.
+    """
+    conn = get_conn()
+    owners = {}
+    for user_id, _, _, item_id, _ in rows:
+        if item_id is None:
+            continue
+        if item_id not in owners:
+            row = conn.execute("SELECT user_id FROM study_items WHERE id = ?", (item_id,)).fetchone()
+            owners[item_id] = row[0] if row else None
+        if owners[item_id] != user_id:
+            raise ValueError(f"Unknown item_id {item_id} for user {user_id}")
+
+    inserted = add_study_logs(rows)
+
+    sessions = defaultdict(lambda: [0.0, set()])
+    rescheduled = {}  # user id -> first day an item was studied
+    with transaction(conn):
+        # Oldest first, so several sessions on one item apply in order
+        for user_id, day, hours, item_id, quality in sorted(rows, key=lambda row: row[1]):
+            sessions[(user_id, day)][0] += hours
+            if item_id is None:
+                continue
+            sessions[(user_id, day)][1].add(item_id)
+            rescheduled[user_id] = min(day, rescheduled.get(user_id, day))
+            item = _item(conn.execute(f"SELECT {_ITEM_COLUMNS} FROM study_items WHERE id = ?", (item_id,)).fetchone())
+            repetitions, interval, ease = next_review(
+                item["repetitions"], item["interval_days"], item["ease"],
+                DEFAULT_QUALITY if quality is None else quality,
+            )
+            due = date.fromisoformat(day) + timedelta(days=max(1, round(interval)))
+            conn.execute(
+                "UPDATE study_items SET repetitions = ?, interval_days = ?, ease = ?, due_date = ?, "
+                "last_studied = ? WHERE id = ?",
+                (repetitions, interval, ease, due.isoformat(), day, item_id),
+            )
+        for (user_id, day), (hours, item_ids) in sessions.items():
+            plan = _stored_plan(conn, user_id, day)
+            if plan is None:
+                continue
+            plan["logged_minutes"] += round(hours * 60)
+            for task in plan["tasks"]:
+                task["done"] = task["done"] or task["item_id"] in item_ids
+            _store_plan(conn, user_id, plan)
+        for user_id, day in rescheduled.items():
+            conn.execute("DELETE FROM study_plans WHERE user_id = ? AND date > ?", (user_id, day))
+    return inserted
+
+
+def _batch_plans(day, shard, shards):
+    reader = connect(STUDY_PLANNER_DB)
+    try:
+        availability = defaultdict(lambda: [DEFAULT_DAILY_MINUTES] * 7)
+        for user_id, weekday, minutes in reader.execute(
+            "SELECT user_id, weekday, minutes FROM study_availability WHERE user_id % ? = ?", (shards, shard)
+        ):
+            availability[user_id][weekday] = minutes
+        rows = reader.execute(
+            f"SELECT user_id, {_ITEM_COLUMNS} FROM study_items WHERE user_id % ? = ? ORDER BY user_id",
+            (shards, shard),
+        )
+        generated_at = time.time()
+        for user_id, user_rows in groupby(rows, key=lambda row: row[0]):
+            plan = plan_days([_item(row[1:]) for row in user_rows], availability[user_id], day)[0]
+            yield user_id, day.isoformat(), json.dumps(plan, separators=(",", ":")), generated_at
+    finally:
+        reader.close()
+
+
+def build_plans(day, shard=0, shards=1):
+    """
+    Build and store `day`'s plan for every user with study items whose
+    id % shards == shard (run shards in parallel processes to split the
+    work). Replaces plans already stored for that day, so run it before
+    the day starts. Returns the number of plans written.
+    """
+    return bulk_insert(get_conn(), _INSERT_PLAN, _batch_plans(day, shard, shards))
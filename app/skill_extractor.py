@@ -0,0 +1,283 @@
+# app/skill_extractor.py
+"""
+Skill extraction from resume text.
+
+The taxonomy below is compiled once (on first use) into a single regular
+expression whose alternation is factored into a prefix trie, so the
+engine does not retry hundreds of alternatives at every offset: a scan is
+one left-to-right pass that only follows branches matching the text seen
+so far. Matches must sit on token boundaries, so "ml" does not match
+inside "html" and "java" does not match inside "javascript".
+
+Aliases prefixed with "=" are case-sensitive. They cover short or
+ambiguous names ("Go", "R", "ML") that would otherwise match ordinary
+words.
+"""
+
+import re
+import threading
+
+# (canonical name, category, comma-separated aliases)
+_TAXONOMY = (
+    # Languages
+    ("Python", "language", "python, python3"),
+    ("Java", "language", "java, java 8, java 11, java 17"),
+    ("JavaScript", "language", "javascript, =JS, es6, ecmascript"),
+    ("TypeScript", "language", "typescript, =TS"),
+    ("C", "language", "=C, ansi c"),
+    ("C++", "language", "c++, cpp"),
+    ("C#", "language", "c#, csharp, c sharp"),
+    ("Go", "language", "golang, =Go"),
+    ("Rust", "language", "rust"),
+    ("Ruby", "language", "ruby"),
+    ("PHP", "language", "php"),
+    ("Kotlin", "language", "kotlin"),
+    ("Swift", "language", "=Swift, swiftui"),
+    ("Objective-C", "language", "objective-c, objective c"),
+    ("Scala", "language", "scala"),
+    ("R", "language", "=R, rstudio"),
+    ("MATLAB", "language", "matlab"),
+    ("Perl", "language", "perl"),
+    ("Dart", "language", "dart"),
+    ("Elixir", "language", "elixir"),
+    ("Haskell", "language", "haskell"),
+    ("Lua", "language", "lua"),
+    ("Bash", "language", "bash, shell scripting, shell script, zsh"),
+    ("PowerShell", "language", "powershell"),
+    ("SQL", "language", "sql, t-sql, pl/sql, plsql"),
+    ("HTML", "language", "html, html5"),
+    ("CSS", "language", "css, css3"),
+    ("Sass", "language", "sass, scss"),
+    ("Solidity", "language", "solidity"),
+    ("Assembly", "language", "assembly language, x86 assembly, arm assembly"),
+    ("VBA", "language", "vba"),
+    # Web frameworks and libraries
+    ("Flask", "framework", "flask"),
+    ("Django", "framework", "django, django rest framework, drf"),
+    ("FastAPI", "framework", "fastapi"),
+    ("React", "framework", "react, react.js, reactjs"),
+    ("React Native", "framework", "react native"),
+    ("Redux", "framework", "redux"),
+    ("Next.js", "framework", "next.js, nextjs"),
+    ("Angular", "framework", "angular, angularjs, angular.js"),
+    ("Vue.js", "framework", "vue, vue.js, vuejs, vue3"),
+    ("Nuxt", "framework", "nuxt, nuxt.js"),
+    ("Svelte", "framework", "svelte, sveltekit"),
+    ("jQuery", "framework", "jquery"),
+    ("Node.js", "framework", "node.js, nodejs, =Node"),
+    ("Express", "framework", "express.js, expressjs, =Express"),
+    ("NestJS", "framework", "nestjs, nest.js"),
+    ("Spring", "framework", "spring boot, springboot, spring framework, spring mvc"),
+    ("Hibernate", "framework", "hibernate"),
+    ("ASP.NET", "framework", "asp.net, asp.net core"),
+    (".NET", "framework", ".net, .net core, dotnet"),
+    ("Ruby on Rails", "framework", "ruby on rails, rails"),
+    ("Laravel", "framework", "laravel"),
+    ("Symfony", "framework", "symfony"),
+    ("Flutter", "framework", "flutter"),
+    ("Android", "framework", "android, android sdk"),
+    ("iOS", "framework", "ios"),
+    ("Electron", "framework", "electron"),
+    ("Tailwind CSS", "framework", "tailwind, tailwindcss, tailwind css"),
+    ("Bootstrap", "framework", "bootstrap"),
+    ("GraphQL", "framework", "graphql"),
+    ("REST APIs", "framework", "rest api, rest apis, restful, restful api, =REST"),
+    ("gRPC", "framework", "grpc"),
+    ("WebSockets", "framework", "websocket, websockets, socket.io"),
+    ("Streamlit", "framework", "streamlit"),
+    ("Celery", "framework", "celery"),
+    # Data, ML and AI
+    ("Machine Learning", "data", "machine learning, =ML"),
+    ("Deep Learning", "data", "deep learning"),
+    ("Artificial Intelligence", "data", "artificial intelligence, =AI"),
+    ("NLP", "data", "nlp, natural language processing"),
+    ("Computer Vision", "data", "computer vision, opencv"),
+    ("Generative AI", "data", "generative ai, genai, gen ai"),
+    ("LLMs", "data", "llm, llms, large language models, large language model"),
+    ("Prompt Engineering", "data", "prompt engineering"),
+    ("LangChain", "data", "langchain"),
+    ("RAG", "data", "retrieval augmented generation, retrieval-augmented generation, =RAG"),
+    ("TensorFlow", "data", "tensorflow, tf.keras"),
+    ("PyTorch", "data", "pytorch, torch"),
+    ("Keras", "data", "keras"),
+    ("scikit-learn", "data", "scikit-learn, scikit learn, sklearn"),
+    ("XGBoost", "data", "xgboost, lightgbm, catboost"),
+    ("Hugging Face", "data", "hugging face, huggingface, transformers"),
+    ("pandas", "data", "pandas"),
+    ("NumPy", "data", "numpy"),
+    ("SciPy", "data", "scipy"),
+    ("Matplotlib", "data", "matplotlib, seaborn, plotly"),
+    ("Jupyter", "data", "jupyter, jupyter notebook, jupyterlab"),
+    ("Data Analysis", "data", "data analysis, data analytics, exploratory data analysis, =EDA"),
+    ("Data Science", "data", "data science"),
+    ("Data Engineering", "data", "data engineering, etl, elt, data pipelines, data pipeline"),
+    ("Statistics", "data", "statistics, statistical analysis, hypothesis testing, a/b testing"),
+    ("Apache Spark", "data", "apache spark, spark, pyspark"),
+    ("Hadoop", "data", "hadoop, hdfs, mapreduce"),
+    ("Apache Kafka", "data", "kafka, apache kafka"),
+    ("Airflow", "data", "airflow, apache airflow"),
+    ("dbt", "data", "=dbt"),
+    ("Tableau", "data", "tableau"),
+    ("Power BI", "data", "power bi, powerbi"),
+    ("Excel", "data", "=Excel, ms excel, microsoft excel, advanced excel"),
+    ("MLOps", "data", "mlops, mlflow, kubeflow"),
+    ("Reinforcement Learning", "data", "reinforcement learning"),
+    ("Time Series", "data", "time series, forecasting"),
+    # Databases
+    ("PostgreSQL", "database", "postgresql, postgres, psql"),
+    ("MySQL", "database", "mysql, mariadb"),
+    ("SQLite", "database", "sqlite, sqlite3"),
+    ("Oracle Database", "database", "oracle database, oracle db, =Oracle"),
+    ("SQL Server", "database", "sql server, mssql, ms sql"),
+    ("MongoDB", "database", "mongodb, mongo, mongoose"),
+    ("Redis", "database", "redis"),
+    ("Cassandra", "database", "cassandra"),
+    ("DynamoDB", "database", "dynamodb"),
+    ("Elasticsearch", "database", "elasticsearch, elastic search, opensearch"),
+    ("Firebase", "database", "firebase, firestore"),
+    ("Supabase", "database", "supabase"),
+    ("Neo4j", "database", "neo4j"),
+    ("Snowflake", "database", "snowflake"),
+    ("BigQuery", "database", "bigquery, big query"),
+    ("Vector Databases", "database", "vector database, vector databases, pinecone, faiss, chromadb, weaviate"),
+    ("SQLAlchemy", "database", "sqlalchemy"),
+    ("Prisma", "database", "prisma"),
+    # Cloud and DevOps
+    ("AWS", "cloud", "aws, amazon web services, ec2, =S3, aws lambda, cloudformation"),
+    ("Azure", "cloud", "azure, microsoft azure"),
+    ("Google Cloud", "cloud", "google cloud, google cloud platform, =GCP"),
+    ("Docker", "cloud", "docker, dockerfile, docker compose, docker-compose"),
+    ("Kubernetes", "cloud", "kubernetes, k8s, helm"),
+    ("Terraform", "cloud", "terraform"),
+    ("Ansible", "cloud", "ansible"),
+    ("CI/CD", "cloud", "ci/cd, continuous integration, continuous deployment, continuous delivery"),
+    ("GitHub Actions", "cloud", "github actions"),
+    ("Jenkins", "cloud", "jenkins"),
+    ("GitLab CI", "cloud", "gitlab ci, gitlab-ci"),
+    ("Linux", "cloud", "linux, ubuntu, debian, centos, red hat, rhel"),
+    ("Nginx", "cloud", "nginx"),
+    ("Apache HTTP Server", "cloud", "apache http server, httpd"),
+    ("Serverless", "cloud", "serverless"),
+    ("Heroku", "cloud", "heroku"),
+    ("Vercel", "cloud", "vercel, netlify"),
+    ("Microservices", "cloud", "microservices, microservice, micro-services"),
+    ("Prometheus", "cloud", "prometheus, grafana"),
+    ("Networking", "cloud", "tcp/ip, computer networks, computer networking"),
+    # Tools and practices
+    ("Git", "tool", "git, github, gitlab, bitbucket"),
+    ("Jira", "tool", "jira, confluence"),
+    ("Postman", "tool", "postman"),
+    ("Figma", "tool", "figma"),
+    ("Selenium", "tool", "selenium"),
+    ("Playwright", "tool", "playwright, cypress"),
+    ("pytest", "tool", "pytest, unittest"),
+    ("Jest", "tool", "jest, mocha"),
+    ("JUnit", "tool", "junit"),
+    ("Webpack", "tool", "webpack, vite, babel"),
+    ("Unit Testing", "practice", "unit testing, unit tests, test-driven development, =TDD"),
+    ("Agile", "practice", "agile, scrum, kanban"),
+    ("Object-Oriented Programming", "practice", "object-oriented programming, object oriented programming, =OOP, =OOPS"),
+    ("Data Structures and Algorithms", "practice", "data structures, algorithms, =DSA"),
+    ("System Design", "practice", "system design, distributed systems, scalability"),
+    ("Design Patterns", "practice", "design patterns"),
+    ("Cybersecurity", "practice", "cybersecurity, cyber security, network security, penetration testing, owasp"),
+    ("Blockchain", "practice", "blockchain, web3, ethereum, smart contracts"),
+    ("UI/UX Design", "practice", "ui/ux, ux design, ui design, user experience"),
+    ("Embedded Systems", "practice", "embedded systems, embedded c, arduino, raspberry pi, iot"),
+    ("Game Development", "practice", "unity3d, unity engine, unreal engine, game development"),
+)
+
+# A match may not be glued to a word character or to the symbols that
+# occur inside technology names ("c++", "c#", "node.js", ".net", "r&d")
+_BOUNDARY_BEFORE = r"(?<![\w+#.&])"
+_BOUNDARY_AFTER = r"(?![\w+#&]|\.\w)"
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def _split_aliases(aliases):
+    for alias in aliases.split(","):
+        alias = alias.strip()
+        if alias.startswith("="):
+            yield alias[1:], True
+        elif alias:
+            yield alias.lower(), False
+
+
+def _alias_key(text):
+    """Lookup key for matched text: case-folded, whitespace collapsed."""
+    return " ".join(text.split()).lower()
+
+
+def _trie_pattern(words):
+    """
+    Regex alternation for `words`, factored by common prefixes:
+    ["java", "javascript", "jax"] -> "ja(?:va(?:script)?|x)".
+    Longer continuations are tried first so the longest alias wins.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for token in re.findall(r"\s+|.", word):
+            node = node.setdefault(r"\s+" if token.isspace() else re.escape(token), {})
+        node[""] = {}
+
+    def build(node):
+        ends = "" in node
+        branches = [token + build(child) for token, child in sorted(node.items()) if token]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends:
+            # A shorter alias ends here; make the continuation optional
+            body = f"(?:{body})?" if len(branches) > 1 or len(body) > 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+def _compile():
+    skills = {}
+    folded, exact = [], []
+    for name, category, aliases in _TAXONOMY:
+        for alias, case_sensitive in _split_aliases(aliases):
+            skills[_alias_key(alias)] = (name, category)
+            (exact if case_sensitive else folded).append(alias)
+    parts = [_trie_pattern(folded)]
+    if exact:
+        parts.append("(?-i:" + _trie_pattern(exact) + ")")
+    pattern = _BOUNDARY_BEFORE + "(?:" + "|".join(parts) + ")" + _BOUNDARY_AFTER
+    return re.compile(pattern, re.IGNORECASE), skills
+
+
+def get_matcher():
+    """(compiled regex, {alias key: (skill, category)}), built once per process."""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = _compile()
+    return _matcher
+
+
+def extract_skills(text: str) -> list:
+    """
+    Skills mentioned in text, most mentioned first (ties by first mention):
+    [{"skill", "category", "count", "positions": [[start, end], ...]}].
+    """
+    pattern, skills = get_matcher()
+    found = {}
+    for match in pattern.finditer(text or ""):
+        name, category = skills[_alias_key(match.group())]
+        entry = found.get(name)
+        if entry is None:
+            entry = found[name] = {"skill": name, "category": category, "count": 0, "positions": []}
+        entry["count"] += 1
+        entry["positions"].append([match.start(), match.end()])
+    return sorted(found.values(), key=lambda e: (-e["count"], e["positions"][0][0]))
+
+
+def top_skills(text: str, limit: int = 5) -> list:
+    """Names of the `limit` most mentioned skills."""
+    return [entry["skill"] for entry in extract_skills(text)[:limit]]
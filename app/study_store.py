@@ -0,0 +1,89 @@
+# app/study_store.py
+"""
+Users and their study logs in the study planner database.
+
+History queries filter on (user_id, date) and are answered from the
+covering index idx_study_logs_user_date, so their cost depends on the
+user's own rows rather than the size of the table.
+"""
+
+import os
+from datetime import date
+
+from app.db import bulk_insert, get_conn
+
+# Most log rows returned by one history request
+STUDY_HISTORY_LIMIT = int(os.getenv("STUDY_HISTORY_LIMIT", "1000"))
+
+# Open-ended ranges use these bounds so every history query shares one statement
+_MIN_DATE = "0000-01-01"
+_MAX_DATE = "9999-12-31"
+
+_INSERT_LOG = (
+    "INSERT INTO study_logs (user_id, date, hours_spent, item_id, quality) VALUES (?, ?, ?, ?, ?)"
+)
+
+
+def study_log_row(entry):
+    """
+    (user_id, date, hours_spent, item_id, quality) from a dict, validated;
+    raises ValueError. item_id (a scheduled study item) and quality (0-5,
+    how well the session went) are optional.
+    """
+    try:
+        user_id = int(entry["user_id"])
+        day = date.fromisoformat(str(entry["date"])).isoformat()
+        hours = float(entry["hours_spent"])
+        item_id = int(entry["item_id"]) if entry.get("item_id") is not None else None
+        quality = int(entry["quality"]) if entry.get("quality") is not None else None
+    except (KeyError, TypeError, AttributeError, OverflowError) as e:
+        raise ValueError(f"Invalid study log {entry!r}: {e}")
+    if not 0 <= hours <= 24:
+        raise ValueError(f"hours_spent must be between 0 and 24, got {hours}")
+    if quality is not None and not 0 <= quality <= 5:
+        raise ValueError(f"quality must be between 0 and 5, got {quality}")
+    return user_id, day, hours, item_id, quality
+
+
+def create_user(username, email=None):
+    """Id of the user with this username, creating it (or updating its email) as needed."""
+    row = get_conn().execute(
+        "INSERT INTO users (username, email) VALUES (?, ?) "
+        "ON CONFLICT(username) DO UPDATE SET email = COALESCE(excluded.email, users.email) "
+        "RETURNING id",
+        (username, email),
+    ).fetchone()
+    return row[0]
+
+
+def get_user(user_id):
+    row = get_conn().execute("SELECT id, username, email FROM users WHERE id = ?", (user_id,)).fetchone()
+    return {"id": row[0], "username": row[1], "email": row[2]} if row else None
+
+
+def add_study_log(user_id, day, hours_spent, item_id=None, quality=None):
+    return get_conn().execute(_INSERT_LOG, (user_id, day, hours_spent, item_id, quality)).lastrowid
+
+
+def add_study_logs(rows, chunk_size=None):
+    """Insert an iterable of study_log_row() tuples in chunked transactions."""
+    return bulk_insert(get_conn(), _INSERT_LOG, rows, chunk_size)
+
+
+def get_study_history(user_id, start=None, end=None, limit=STUDY_HISTORY_LIMIT):
+    """A user's logs between start and end (ISO dates, inclusive), newest first."""
+    rows = get_conn().execute(
+        "SELECT date, hours_spent FROM study_logs "
+        "WHERE user_id = ? AND date BETWEEN ? AND ? ORDER BY date DESC LIMIT ?",
+        (user_id, start or _MIN_DATE, end or _MAX_DATE, limit),
+    )
+    return [{"date": day, "hours_spent": hours} for day, hours in rows]
+
+
+def get_study_totals(user_id, start=None, end=None):
+    row = get_conn().execute(
+        "SELECT COUNT(DISTINCT date), COALESCE(SUM(hours_spent), 0) FROM study_logs "
+        "WHERE user_id = ? AND date BETWEEN ? AND ?",
+        (user_id, start or _MIN_DATE, end or _MAX_DATE),
+    ).fetchone()
+    return {"days": row[0], "total_hours": round(row[1], 2)}
@@ -0,0 +1,436 @@
+# app/topic_canonicalizer.py
+"""
+Map the many spellings of a topic to one canonical topic, so "ML",
+"machine-learning", "Machine Learning basics" and "machne learning" share
+one roadmap, one resource bundle and one set of upstream calls.
+
+A topic is first reduced to a key: case-folded words with punctuation and
+filler words ("basics", "intro to", "tutorial") dropped. The key is then
+looked up in an in-memory table of canonical keys and aliases; failing
+that, unknown words are corrected to known words one typo away and the
+spacing is ignored, and a known key found that way whose character-trigram
+similarity (Dice coefficient) to the request is at least
+TOPIC_SIMILARITY_THRESHOLD wins and is remembered as an alias. A key that
+matches nothing becomes a new canonical topic, named after the request
+without its filler words. A learned topic that is later matched by a
+spelling whose words more other topics use ("kubernetes operators" for
+"kubernets operators") is renamed to that spelling, so a typo in the first
+request does not stick. Topics, aliases and renames live in the study
+planner database; each worker keeps the index in memory and loads rows
+added by other workers every TOPIC_REFRESH_SECONDS, or at once when it is
+about to add a topic. A rename moves the roadmaps, resources, search
+index rows and study items stored under the old name in the same
+transaction.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from app import catalog_store, roadmap_index, scheduler
+from app.db import get_conn, transaction
+from app.roadmap_store import copy_cached_roadmaps
+
+logger = logging.getLogger(__name__)
+
+# Minimum trigram Dice similarity for a fuzzy match (1 disables fuzzy matching)
+TOPIC_SIMILARITY_THRESHOLD = float(os.getenv("TOPIC_SIMILARITY_THRESHOLD", "0.75"))
+TOPIC_REFRESH_SECONDS = float(os.getenv("TOPIC_REFRESH_SECONDS", "30"))
+# Longer topics are passed through as-is and never learned
+TOPIC_MAX_CHARS = 100
+# Shorter words ("go", "c#", "sql") are never corrected; one typo makes them another word
+_MIN_FUZZY_CHARS = 4
+
+EXACT = "exact"
+ALIAS = "alias"
+FUZZY = "fuzzy"
+NEW = "new"
+
+_WORD = re.compile(r"[\w+#]+")
+_DIGITS = re.compile(r"\d+")
+_FILLER = frozenset((
+    "basic", "basics", "beginner", "beginners", "complete", "course", "crash", "for", "fundamentals",
+    "guide", "intro", "introduction", "learn", "roadmap", "to", "tutorial", "tutorials", "101",
+))
+# Left lowercase in learned display names, except as the first word
+_MINOR_WORDS = frozenset(("a", "an", "and", "at", "by", "in", "of", "on", "or", "the", "vs", "with"))
+
+# Canonical topic -> comma-separated spellings that always map to it
+_SEED_ALIASES = (
+    ("Machine Learning", "ml"),
+    ("Deep Learning", "dl"),
+    ("Artificial Intelligence", "ai"),
+    ("Generative AI", "genai, gen ai"),
+    ("Large Language Models", "llm, llms"),
+    ("Natural Language Processing", "nlp"),
+    ("Computer Vision", "cv"),
+    ("Reinforcement Learning", "rl"),
+    ("Data Structures and Algorithms", "dsa, data structures algorithms"),
+    ("Object-Oriented Programming", "oop, object oriented programming"),
+    ("JavaScript", "js, ecmascript, es6"),
+    ("TypeScript", "ts"),
+    ("Python", "py, python3, python 3"),
+    ("Go", "golang"),
+    ("C++", "cpp"),
+    ("C#", "csharp, c sharp"),
+    ("React", "reactjs, react js"),
+    ("Node.js", "node, nodejs"),
+    ("Vue.js", "vue, vuejs"),
+    ("PostgreSQL", "postgres, psql"),
+    ("Kubernetes", "k8s"),
+    ("Amazon Web Services", "aws"),
+    ("Google Cloud Platform", "gcp"),
+    ("CI/CD", "cicd, continuous integration"),
+    ("DevOps", "dev ops"),
+    ("Site Reliability Engineering", "sre"),
+    ("Cybersecurity", "cyber security, infosec"),
+    ("Operating Systems", "os"),
+)
+
+
+def topic_key(topic):
+    """
+    Lookup key for a topic: case-folded words (keeping "+" and "#", so C++
+    and C# survive) without filler words, unless the topic is only filler.
+    """
+    words = _WORD.findall(str(topic or "").casefold())
+    kept = [word for word in words if word not in _FILLER]
+    return " ".join(kept or words)
+
+
+def display_name(topic):
+    """
+    Name for a topic learned from a request: the request without filler
+    words, keeping the punctuation within runs of kept words ("Node.js")
+    and capitalizing all-lowercase words, so its topic_key is unchanged.
+    """
+    topic = " ".join(str(topic or "").split())
+    matches = list(_WORD.finditer(topic))
+    keep = [match.group().casefold() not in _FILLER for match in matches]
+    if not any(keep):
+        keep = [True] * len(matches)
+    pieces = []
+    for i, match in enumerate(matches):
+        if not keep[i]:
+            continue
+        if i and keep[i - 1]:
+            pieces[-1] += topic[matches[i - 1].end():match.end()]
+        else:
+            pieces.append(match.group())
+    words = " ".join(pieces).split()
+    return " ".join(
+        word[:1].upper() + word[1:] if word.islower() and (i == 0 or word not in _MINOR_WORDS) else word
+        for i, word in enumerate(words)
+    )
+
+
+_SEED_KEYS = frozenset(topic_key(display) for display, _ in _SEED_ALIASES)
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(key, other):
+    """Dice coefficient of the character trigrams of two keys."""
+    grams, other_grams = trigrams(key), trigrams(other)
+    return 2 * len(grams & other_grams) / (len(grams) + len(other_grams))
+
+
+def _deletes(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+class TopicIndex:
+    """
+    Canonical topics and aliases by key, plus the vocabulary of words in
+    canonical keys with their single-character deletions, which finds the
+    known words one typo away from an unknown one. Not thread-safe for
+    writers; TopicCanonicalizer serializes them.
+    """
+
+    def __init__(self, threshold=TOPIC_SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.topics = {}  # topic id -> display name
+        self.by_key = {}  # canonical key or alias key -> topic id
+        self._compact = {}  # canonical key without spaces -> key ("javascript" -> "java script")
+        self._words = defaultdict(int)  # word -> number of canonical keys using it
+        self._variants = defaultdict(set)  # word with one character deleted -> words
+
+    def __len__(self):
+        return len(self.topics)
+
+    def add_topic(self, topic_id, key, display):
+        self.topics[topic_id] = display
+        self.by_key.setdefault(key, topic_id)
+        self._compact.setdefault(key.replace(" ", ""), key)
+        for word in key.split():
+            if word not in self._words and len(word) >= _MIN_FUZZY_CHARS and not _DIGITS.search(word):
+                for variant in _deletes(word):
+                    self._variants[variant].add(word)
+            self._words[word] += 1
+
+    def add_alias(self, key, topic_id):
+        self.by_key.setdefault(key, topic_id)
+
+    def rename(self, topic_id, key, display):
+        """Make key and display a topic's canonical spelling; its old key stays as an alias."""
+        if self.by_key.get(key, topic_id) != topic_id:
+            return
+        self.topics.pop(topic_id, None)
+        self.add_topic(topic_id, key, display)
+
+    def usage(self, key, topic_id):
+        """How many other topics' keys use the words of key; a rough measure of correct spelling."""
+        own = set(topic_key(self.topics[topic_id]).split())
+        return sum(self._words.get(word, 0) - (word in own) for word in set(key.split()))
+
+    def exact(self, key):
+        return self.by_key.get(key)
+
+    def _neighbours(self, word):
+        """Known words (other than word) one insertion, deletion, substitution or transposition away."""
+        candidates = set(self._variants.get(word, ()))
+        for variant in _deletes(word):
+            candidates.update(self._variants.get(variant, ()))
+            if variant in self._words:
+                candidates.add(variant)
+        candidates.discard(word)
+        return candidates
+
+    def _correct(self, word):
+        """The closest known word one edit away, or None."""
+        candidates = self._neighbours(word)
+        if not candidates:
+            return None
+        # Most similar first, then the most used
+        return max(candidates, key=lambda known: (similarity(word, known), self._words[known], known))
+
+    def similar(self, key):
+        """
+        (topic id, trigram similarity) of a key spelled differently from a
+        known one, or None: the same letters with different spacing
+        ("machinelearning"), or known words with typos ("machne learning"),
+        each unknown word of _MIN_FUZZY_CHARS or more letters replaced by
+        the closest known word one edit away. Only matches whose trigram
+        Dice similarity to the query reaches the threshold are returned.
+
+        Candidates come from exact lookups of the corrected key, so the
+        cost depends on the length of the query, not on the number or
+        overlap of known topics, as scanning trigram posting lists would.
+        """
+        if self.threshold >= 1:
+            return None
+        words = key.split()
+        corrected = [
+            (self._correct(word) if word not in self._words and len(word) >= _MIN_FUZZY_CHARS
+             and not _DIGITS.search(word) else None) or word
+            for word in words
+        ]
+        for candidate in (" ".join(corrected), self._compact.get(key.replace(" ", ""))):
+            if candidate is None or candidate == key or candidate not in self.by_key:
+                continue
+            score = similarity(key, candidate)
+            if score >= self.threshold:
+                return self.by_key[candidate], score
+        return None
+
+    def misspelled(self, key):
+        """
+        (topic id, trigram similarity) of a known key that is this one with
+        a word misspelled, or None. similar() leaves known words alone, so
+        it never maps "kubernetes operators" to an earlier "kubernets
+        operators"; this looks for such a topic before key becomes a new one.
+        """
+        if self.threshold >= 1:
+            return None
+        words = key.split()
+        for i, word in enumerate(words):
+            if len(word) < _MIN_FUZZY_CHARS or _DIGITS.search(word):
+                continue
+            for other in sorted(self._neighbours(word)):
+                candidate = " ".join(words[:i] + [other] + words[i + 1:])
+                if candidate in self.by_key:
+                    score = similarity(key, candidate)
+                    if score >= self.threshold:
+                        return self.by_key[candidate], score
+        return None
+
+
+class TopicCanonicalizer:
+    def __init__(self, threshold=TOPIC_SIMILARITY_THRESHOLD, refresh_seconds=TOPIC_REFRESH_SECONDS):
+        self.index = TopicIndex(threshold)
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._last_topic_id = 0
+        self._last_alias_id = 0
+        self._last_rename_id = 0
+        self._refreshed_at = 0.0
+        self._seeded = False
+
+    def _seed(self, conn):
+        now = time.time()
+        with transaction(conn):
+            for display, aliases in _SEED_ALIASES:
+                conn.execute(
+                    "INSERT OR IGNORE INTO topics (topic_key, topic, created_at) VALUES (?, ?, ?)",
+                    (topic_key(display), display, now),
+                )
+                topic_id = conn.execute(
+                    "SELECT id FROM topics WHERE topic_key = ?", (topic_key(display),)
+                ).fetchone()[0]
+                conn.executemany(
+                    "INSERT OR IGNORE INTO topic_aliases (alias_key, topic_id, source, created_at) "
+                    "VALUES (?, ?, 'seed', ?)",
+                    [(topic_key(alias), topic_id, now) for alias in aliases.split(",")],
+                )
+
+    def refresh(self):
+        """Load topics, aliases and renames added since the last refresh (by any worker)."""
+        conn = get_conn()
+        with self._lock:
+            if not self._seeded:
+                self._seed(conn)
+                self._seeded = True
+            for topic_id, key, display in conn.execute(
+                "SELECT id, topic_key, topic FROM topics WHERE id > ? ORDER BY id", (self._last_topic_id,)
+            ):
+                self.index.add_topic(topic_id, key, display)
+                self._last_topic_id = topic_id
+            for alias_id, key, topic_id in conn.execute(
+                "SELECT id, alias_key, topic_id FROM topic_aliases WHERE id > ? ORDER BY id", (self._last_alias_id,)
+            ):
+                self.index.add_alias(key, topic_id)
+                self._last_alias_id = alias_id
+            for rename_id, topic_id, key, display in conn.execute(
+                "SELECT id, topic_id, topic_key, topic FROM topic_renames WHERE id > ? ORDER BY id",
+                (self._last_rename_id,),
+            ):
+                self.index.rename(topic_id, key, display)
+                self._last_rename_id = rename_id
+            self._refreshed_at = time.monotonic()
+
+    def _match(self, key):
+        topic_id = self.index.exact(key)
+        if topic_id is not None:
+            return topic_id, 1.0
+        return self.index.similar(key) or (None, 0.0)
+
+    def resolve(self, topic, learn=True):
+        """
+        (canonical topic, how, similarity) for a requested topic; how is
+        "exact", "alias", "fuzzy" or "new". Unknown topics and fuzzy
+        matches are learned unless learn is false.
+        """
+        topic = " ".join(str(topic or "").split())
+        key = topic_key(topic)
+        if not key or len(topic) > TOPIC_MAX_CHARS:
+            return topic, NEW, 0.0
+        if not self._seeded or time.monotonic() - self._refreshed_at > self.refresh_seconds:
+            self.refresh()
+
+        topic_id, score = self._match(key)
+        if topic_id is None:
+            # Another worker may have just added it
+            self.refresh()
+            topic_id, score = self._match(key)
+        if topic_id is None:
+            misspelled = self.index.misspelled(key)
+            if misspelled is not None and self._better_spelling(key, misspelled[0]):
+                topic_id, score = misspelled
+                display = self._rename(key, topic_id, display_name(topic)) if learn else self.index.topics[topic_id]
+                return display, FUZZY, round(score, 3)
+            return (self._learn_topic(key, display_name(topic)) if learn else topic), NEW, 1.0
+
+        display = self.index.topics[topic_id]
+        if key == topic_key(display):
+            return display, EXACT, 1.0
+        if score < 1.0:
+            if learn and self._better_spelling(key, topic_id):
+                display = self._rename(key, topic_id, display_name(topic))
+            elif learn:
+                self._learn_alias(key, topic_id, score)
+            return display, FUZZY, round(score, 3)
+        return display, ALIAS, 1.0
+
+    def _learn_topic(self, key, display):
+        conn = get_conn()
+        conn.execute(
+            "INSERT OR IGNORE INTO topics (topic_key, topic, created_at) VALUES (?, ?, ?)",
+            (key, display, time.time()),
+        )
+        self.refresh()
+        return self.index.topics[self.index.exact(key)]
+
+    def _better_spelling(self, key, topic_id):
+        """Whether key should replace a learned topic's spelling (seeded topics are never renamed)."""
+        current = topic_key(self.index.topics[topic_id])
+        return current not in _SEED_KEYS and self.index.usage(key, topic_id) > self.index.usage(current, topic_id)
+
+    def _rename(self, key, topic_id, display):
+        """Make key and display the topic's canonical spelling, keeping the old key as an alias; returns the display."""
+        old_display = self.index.topics[topic_id]
+        old_key = topic_key(old_display)
+        now = time.time()
+        conn = get_conn()
+        try:
+            with transaction(conn):
+                conn.execute("UPDATE topics SET topic_key = ?, topic = ? WHERE id = ?", (key, display, topic_id))
+                conn.execute(
+                    "INSERT OR IGNORE INTO topic_aliases (alias_key, topic_id, source, created_at) "
+                    "VALUES (?, ?, 'renamed', ?)",
+                    (old_key, topic_id, now),
+                )
+                conn.execute(
+                    "INSERT INTO topic_renames (topic_id, topic_key, topic, created_at) VALUES (?, ?, ?, ?)",
+                    (topic_id, key, display, now),
+                )
+                catalog_store.rename_topic(conn, old_display, display)
+                roadmap_index.rename_indexed_topic(conn, old_display, display)
+                scheduler.rename_topic(conn, old_display, display)
+        except sqlite3.IntegrityError:
+            # Another worker learned key as a topic of its own meanwhile
+            self.refresh()
+            return self.index.topics[topic_id]
+        self.refresh()
+        copy_cached_roadmaps(old_display, display)
+        logger.info("Topic %r renamed to %r", old_key, display)
+        return self.index.topics[topic_id]
+
+    def _learn_alias(self, key, topic_id, score):
+        get_conn().execute(
+            "INSERT OR IGNORE INTO topic_aliases (alias_key, topic_id, source, score, created_at) "
+            "VALUES (?, ?, 'fuzzy', ?, ?)",
+            (key, topic_id, score, time.time()),
+        )
+        with self._lock:
+            self.index.add_alias(key, topic_id)
+        logger.info("Topic %r mapped to %r (similarity %.2f)", key, self.index.topics[topic_id], score)
+
+
+_canonicalizer = None
+_canonicalizer_lock = threading.Lock()
+
+
+def get_canonicalizer():
+    global _canonicalizer
+    if _canonicalizer is None:
+        with _canonicalizer_lock:
+            if _canonicalizer is None:
+                _canonicalizer = TopicCanonicalizer()
+    return _canonicalizer
+
+
+def resolve_topic(topic, learn=True):
+    """(canonical topic, how, similarity); see TopicCanonicalizer.resolve."""
+    return get_canonicalizer().resolve(topic, learn)
+
+
+def canonical_topic(topic, learn=True):
+    """The canonical spelling of a requested topic, learning it if it is new (and learn is true)."""
+    return resolve_topic(topic, learn)[0]
@@ -1,9 +1,117 @@
+import atexit
 import json
+import logging
+import os
+import threading
+import time
 from datetime import datetime
 
+from app.metrics import UpstreamTimer, record_token_usage
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_LOG_PATH = os.getenv("ACTIVITY_LOG_PATH", "data/user_activity_log.jsonl")
+# Whole-array JSON file written by older versions; still readable, never written
+LEGACY_ACTIVITY_LOG_PATH = "data/user_activity_log.json"
+ACTIVITY_FLUSH_BATCH = int(os.getenv("ACTIVITY_FLUSH_BATCH", "100"))
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv("ACTIVITY_FLUSH_INTERVAL", "1.0"))
+# "always": fsync every batch, "interval": at most once per ACTIVITY_FSYNC_INTERVAL, "never"
+ACTIVITY_FSYNC = os.getenv("ACTIVITY_FSYNC", "interval")
+ACTIVITY_FSYNC_INTERVAL = float(os.getenv("ACTIVITY_FSYNC_INTERVAL", "5.0"))
+
+
+class ActivityLogWriter:
+    """
+    Buffered JSON-Lines sink. Records are queued in memory and a background
+    thread appends them in batches once ACTIVITY_FLUSH_BATCH records are
+    pending or ACTIVITY_FLUSH_INTERVAL seconds have passed. Each batch is a
+    single O_APPEND write, so several worker processes can share one file.
+    """
+
+    def __init__(self, path=ACTIVITY_LOG_PATH, batch_size=ACTIVITY_FLUSH_BATCH,
+                 interval=ACTIVITY_FLUSH_INTERVAL, fsync=ACTIVITY_FSYNC):
+        self.path = path
+        self.batch_size = batch_size
+        self.interval = interval
+        self.fsync = fsync
+        self._pending = []
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._last_fsync = 0.0
+        self._closed = False
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # Threads do not survive fork; restart the flusher in each worker
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="activity-log-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def append(self, record):
+        with self._cond:
+            self._ensure_thread()
+            self._pending.append(record)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._pending and not self._closed:
+                    self._cond.wait(self.interval)
+                elif len(self._pending) < self.batch_size and not self._closed:
+                    self._cond.wait(self.interval)
+                if self._closed and not self._pending:
+                    return
+            try:
+                self.flush()
+            except OSError as e:
+                logger.error("Activity log flush failed: %s", e)
+
+    def flush(self):
+        """Write every pending record to disk now."""
+        with self._cond:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        payload = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in batch)
+        with self._write_lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, payload.encode("utf-8"))
+                now = time.monotonic()
+                if self.fsync == "always" or (
+                    self.fsync == "interval" and now - self._last_fsync >= ACTIVITY_FSYNC_INTERVAL
+                ):
+                    os.fsync(fd)
+                    self._last_fsync = now
+            finally:
+                os.close(fd)
+
+    def close(self):
+        """Flush remaining records and stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+_activity_writer = ActivityLogWriter()
+atexit.register(_activity_writer.close)
+
+
 def log_user_activity(free_time, days_completed, engagement, predicted_minutes):
     """
-    Append a prediction record to the JSON log file.
+    Queue a prediction record for the JSON-Lines activity log.
     """
     record = {
         "timestamp": datetime.utcnow().isoformat(),
@@ -12,19 +120,134 @@ def log_user_activity(free_time, days_completed, engagement, predicted_minutes):
         "engagement_score": engagement,
         "predicted_minutes": predicted_minutes
     }
+    _activity_writer.append(record)
 
-    try:
-        # If file exists, load and append
-        with open("data/user_activity_log.json", "r+") as f:
-            data = json.load(f)
-            data.append(record)
-            f.seek(0)
-            json.dump(data, f, indent=2)
 
+def flush_user_activity():
+    """Force buffered activity records to disk (e.g. before reading them)."""
+    _activity_writer.flush()
+
+
+def iter_user_activity(path=None):
+    """
+    Yield logged activity records one at a time, oldest first, without
+    loading the whole history. Records from the legacy JSON array file are
+    yielded first when it is still present.
+    """
+    if path is None:
+        path = ACTIVITY_LOG_PATH
+        if os.path.exists(LEGACY_ACTIVITY_LOG_PATH):
+            with open(LEGACY_ACTIVITY_LOG_PATH, "r") as f:
+                yield from json.load(f)
+
+    try:
+        f = open(path, "r", encoding="utf-8")
     except FileNotFoundError:
-        # If file doesn't exist, create new list
-        with open("data/user_activity_log.json", "w") as f:
-            json.dump([record], f, indent=2)
+        return
+    with f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A torn final line from a crash mid-write; skip it
+                continue
+
+
+_groq_clients = {}
+_groq_lock = threading.Lock()
+
+
+def get_groq_client(api_key=None):
+    """
+    Groq client for api_key (default: GROQ_API_KEY), built on first use and
+    reused for the life of the process. The SDK is only imported here, so
+    processes that never call the LLM do not pay for loading it.
+    """
+    if api_key is None:
+        api_key = os.getenv("GROQ_API_KEY")
+    # Clients hold connection pools, which must not cross a fork
+    key = (os.getpid(), api_key)
+    client = _groq_clients.get(key)
+    if client is None:
+        with _groq_lock:
+            client = _groq_clients.get(key)
+            if client is None:
+                from groq import Groq
+
+                client = _groq_clients[key] = Groq(api_key=api_key)
+    return client
+
+
+def create_completion(client, upstream="groq", **kwargs):
+    """
+    client.chat.completions.create(**kwargs), timed under the `upstream`
+    label. Token usage of a non-streamed reply is counted here; for streams
+    it is counted by iter_completion_lines from the final chunk.
+    """
+    with UpstreamTimer(upstream):
+        response = client.chat.completions.create(**kwargs)
+    if not kwargs.get("stream"):
+        record_token_usage(kwargs.get("model"), getattr(response, "usage", None))
+    return response
+
+
+async def acreate_completion(client, upstream="groq", **kwargs):
+    """create_completion for async clients (AsyncGroq); no streaming."""
+    with UpstreamTimer(upstream):
+        response = await client.chat.completions.create(**kwargs)
+    record_token_usage(kwargs.get("model"), getattr(response, "usage", None))
+    return response
+
+
+def _stream_usage(chunk):
+    # OpenAI-style streams put usage on the last chunk; Groq reports it under x_groq
+    usage = getattr(chunk, "usage", None)
+    if usage is None:
+        usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+    return usage
+
+
+def iter_completion_lines(stream, state=None):
+    """
+    Turn a streaming chat completion into complete, stripped, non-empty lines
+    as soon as each newline arrives.
+
+    With a `state` dict, the raw reply text is appended to state["text"] and
+    the stream's finish_reason stored in it, a state["partial"] line left by
+    a previous stream is prepended, and if
+    state["hold_partial"] is set a last line cut off by finish_reason
+    "length" is kept in state["partial"] instead of being yielded.
+    """
+    buffer = state.pop("partial", "") if state is not None else ""
+    finish_reason = None
+    for chunk in stream:
+        usage = _stream_usage(chunk)
+        if usage is not None:
+            record_token_usage(getattr(chunk, "model", None), usage)
+        if not chunk.choices:
+            continue
+        finish_reason = chunk.choices[0].finish_reason or finish_reason
+        delta = chunk.choices[0].delta.content or ""
+        if not delta:
+            continue
+        if state is not None:
+            state["text"] = state.get("text", "") + delta
+        buffer += delta.replace("\r\n", "\n").replace("\r", "\n")
+        *complete, buffer = buffer.split("\n")
+        for line in complete:
+            if line.strip():
+                yield line.strip()
+    if state is not None:
+        state["finish_reason"] = finish_reason
+        if finish_reason == "length" and state.get("hold_partial") and buffer.strip():
+            state["partial"] = buffer
+            return
+    if buffer.strip():
+        yield buffer.strip()
+
 
 def sample_helper():
     return "Helper function here"
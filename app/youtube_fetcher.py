@@ -1,25 +1,23 @@
 # app/youtube_fetcher.py
 
+import logging
 import os
-from dotenv import load_dotenv
-import requests
+from app import http_client
+from app.cache import cached_by_topic
 
-# Load .env variables
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+# .env is loaded once by the app package
 API_KEY = os.getenv("YOUTUBE_API_KEY")
+YOUTUBE_SEARCH_URL = os.getenv("YOUTUBE_SEARCH_URL", "https://www.googleapis.com/youtube/v3/search")
+# Read timeout so a slow YouTube search never pins a worker
+YOUTUBE_READ_TIMEOUT = float(os.getenv("YOUTUBE_READ_TIMEOUT", "4"))
+# Search results change slowly and each call costs 100 quota units
+YOUTUBE_CACHE_TTL = int(os.getenv("YOUTUBE_CACHE_TTL", "21600"))
 
-print("✅ Loaded API Key:", API_KEY)
 
-def fetch_youtube_videos(query):
-    """
-    Fetch top 5 YouTube videos matching the query.
-    """
-    if not API_KEY:
-        print("❌ API Key is missing")
-        return []
-
-    url = "https://www.googleapis.com/youtube/v3/search"
-    params = {
+def youtube_search_params(query):
+    return {
         "part": "snippet",
         "q": query,
         "key": API_KEY,
@@ -27,18 +25,35 @@ def fetch_youtube_videos(query):
         "type": "video"
     }
 
-    response = requests.get(url, params=params)
-    data = response.json()
 
+def parse_youtube_results(data):
     if "items" not in data:
-        print("❌ Unexpected API response:", data)
+        logger.warning("Unexpected YouTube API response: %s", str(data)[:500])
         return []
 
-    results = [
+    return [
         {
             "title": item["snippet"]["title"],
             "videoId": item["id"]["videoId"]
         }
         for item in data["items"]
     ]
-    return results
+
+
+@cached_by_topic("youtube", ttl=YOUTUBE_CACHE_TTL)
+def fetch_youtube_videos(query):
+    """
+    Fetch top 5 YouTube videos matching the query.
+    """
+    if not API_KEY:
+        logger.warning("YOUTUBE_API_KEY is missing, skipping YouTube search")
+        return []
+
+    response = http_client.get(
+        YOUTUBE_SEARCH_URL,
+        params=youtube_search_params(query),
+        read_timeout=YOUTUBE_READ_TIMEOUT,
+        retries=1,
+        upstream="youtube",
+    )
+    return parse_youtube_results(response.json())
@@ -0,0 +1,205 @@
+"""
+Offline benchmark of the upstream-backed endpoints: starts the mock
+upstream and the API (benchmarks/harness.py) in a throwaway working
+directory, drives each endpoint at a fixed concurrency and reports
+throughput and latency percentiles per serving mode as JSON.
+
+    python -m benchmarks.bench_endpoints --requests 300 --concurrency 30 --output run.json
+    python -m benchmarks.bench_endpoints --baseline run.json --max-regression 15
+
+Every request uses its own topic, resume or feature row, so each one
+reaches the (mock) upstream; --distinct N cycles through N inputs instead,
+measuring the cache-hit paths. /api/saved_resume reads resumes seeded
+into the database before the run.
+
+With --baseline, each endpoint's p50/p99 latency and throughput are
+compared with a previous run's results file; with --max-regression as
+well, the run exits with status 1 when any of them got worse by more than
+that many percent, so it can gate CI like benchmarks.import_time.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import uuid
+
+from benchmarks.harness import drive, free_port, mock_env, start_mock, start_server, stop, write_results
+from benchmarks.mock_upstream import WORDS, add_mock_arguments, mock_argv
+
+SKILLS = "Python, Flask, SQL, Docker, Kubernetes, React, Machine Learning, Git, AWS, REST APIs"
+# Lower is better for these; throughput_rps is the other way around
+LATENCY_METRICS = ("p50_ms", "p99_ms")
+
+
+def resume_text(key, chars):
+    lines = [f"Candidate {key}", "Software Engineer", f"Skills: {SKILLS}", "Experience"]
+    i = 0
+    while sum(len(line) + 1 for line in lines) < chars:
+        lines.append(f"- {WORDS[i % len(WORDS)]} {WORDS[(i * 7 + key) % len(WORDS)]} services for team {i}")
+        i += 1
+    return "\n".join(lines)[:chars]
+
+
+def multipart(fields, files):
+    """(body, headers) of a multipart/form-data request; files maps name -> (filename, bytes)."""
+    boundary = uuid.uuid4().hex
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in fields.items()
+    ]
+    for name, (filename, content) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: text/plain\r\n\r\n".encode() + content + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+def endpoints(args):
+    """Endpoint name -> make_request(client, i) for harness.drive."""
+    def key(i):
+        return i % args.distinct if args.distinct else i
+
+    def interview_questions(client, i):
+        body, headers = multipart(
+            {"user_id": f"upload-{key(i)}"},
+            {"resume": (f"resume-{key(i)}.txt", resume_text(key(i), args.resume_chars).encode())},
+        )
+        return client.request("POST", "/api/interview_questions", body=body, headers=headers)
+
+    return {
+        "resources": lambda client, i: client.get("/api/resources", params={"topic": f"bench topic {key(i)}"}),
+        "roadmap": lambda client, i: client.get("/api/roadmap", params={"topic": f"bench topic {key(i)}"}),
+        "predict": lambda client, i: client.post(
+            "/api/predict", json={"freetime": key(i) % 5 + 1, "studytime": key(i) % 4 + 1, "row": key(i)}
+        ),
+        "interview_questions": interview_questions,
+        "saved_resume": lambda client, i: client.get(
+            "/api/saved_resume", params={"user_id": f"bench-{key(i) % args.saved_resumes}"}
+        ),
+    }
+
+
+def seed_resumes(count, chars):
+    # RESUME_DB_PATH is set by main() before this import
+    from app.resume_store import save_resume_text
+
+    for key in range(count):
+        save_resume_text(f"bench-{key}", resume_text(key, chars))
+
+
+def run_mode(mode, args, mock_port, resume_db):
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix=f"bench_endpoints_{mode}_") as workdir:
+        env = {
+            **mock_env(mock_port),
+            "RESUME_DB_PATH": resume_db,
+            "STUDY_PLANNER_DB": os.path.join(workdir, "study_planner.db"),
+            "ADMISSION_ENABLED": "1" if args.admission else "0",
+        }
+        server = start_server(mode, port, env, workers=args.workers, threads=args.threads, workdir=workdir)
+        try:
+            make_requests = endpoints(args)
+            results = {}
+            for name in args.endpoints.split(","):
+                results[name] = asyncio.run(drive(
+                    f"http://127.0.0.1:{port}", make_requests[name], args.requests, args.concurrency
+                ))
+            return results
+        finally:
+            stop(server)
+
+
+def _change_pct(baseline, current):
+    if not baseline or current is None:
+        return None
+    return round((current - baseline) / baseline * 100, 1)
+
+
+def compare(results, baseline, max_regression=None):
+    """
+    {mode: {endpoint: {metric: {"baseline", "current", "change_pct"}}}} for
+    every endpoint in both runs, and the list of regressions beyond
+    max_regression percent.
+    """
+    comparison, regressions = {}, []
+    for mode, endpoints_run in results["modes"].items():
+        for name, current in endpoints_run.items():
+            previous = baseline.get("modes", {}).get(mode, {}).get(name)
+            if previous is None:
+                continue
+            metrics = {}
+            for metric in LATENCY_METRICS + ("throughput_rps", "errors"):
+                change = _change_pct(previous.get(metric), current.get(metric))
+                metrics[metric] = {"baseline": previous.get(metric), "current": current.get(metric), "change_pct": change}
+                if max_regression is None or change is None or metric == "errors":
+                    continue
+                worse = change if metric in LATENCY_METRICS else -change
+                if worse > max_regression:
+                    regressions.append(f"{mode} {name} {metric} {previous[metric]} -> {current[metric]} ({change:+}%)")
+            comparison.setdefault(mode, {})[name] = metrics
+    return comparison, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--modes", default="wsgi,asgi")
+    parser.add_argument("--endpoints", default="resources,roadmap,predict,interview_questions,saved_resume")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint and mode")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads per worker (wsgi)")
+    parser.add_argument("--distinct", type=int, default=0,
+                        help="cycle through this many inputs per endpoint (0: every request is new)")
+    parser.add_argument("--resume-chars", type=int, default=3000, help="size of each uploaded or saved resume")
+    parser.add_argument("--saved-resumes", type=int, default=1000, help="resumes seeded for /api/saved_resume")
+    parser.add_argument("--admission", action="store_true", help="keep rate limiting and load shedding on")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare with")
+    parser.add_argument("--max-regression", type=float, default=None,
+                        help="fail if a latency percentile or the throughput is this many percent worse")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    unknown = set(args.endpoints.split(",")) - set(endpoints(args))
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory(prefix="bench_endpoints_") as workdir:
+        resume_db = os.environ["RESUME_DB_PATH"] = os.path.join(workdir, "resume_store.db")
+        seed_resumes(args.saved_resumes, args.resume_chars)
+
+        mock_port = free_port()
+        mock = start_mock(mock_port, mock_argv(args))
+        try:
+            results = {
+                "config": {
+                    key: getattr(args, key)
+                    for key in ("requests", "concurrency", "workers", "threads", "distinct", "resume_chars",
+                                "admission", "latency_ms", "jitter_ms", "error_rate", "items", "completion_lines",
+                                "upstream_latency_ms", "upstream_error_rate")
+                },
+                "modes": {mode: run_mode(mode, args, mock_port, resume_db) for mode in args.modes.split(",")},
+            }
+        finally:
+            stop(mock)
+
+    regressions = []
+    if baseline is not None:
+        results["comparison"], regressions = compare(results, baseline, args.max_regression)
+    write_results(results, args.output)
+    for regression in regressions:
+        print(f"❌ regression: {regression}", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark resume text extraction over a synthetic corpus of PDF, DOCX and
+TXT files. Compares the streaming extractor (extract_text_from_resume)
+with the previous extract-everything-then-truncate approach and checks
+that both return the same text.
+
+    python -m benchmarks.bench_extraction --files 40 --pages 1,5,20
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from PyPDF2 import PdfReader
+from docx import Document
+
+from app.resume_interview_engine import extract_text_from_resume
+
+WORDS = (
+    "python flask react sql docker kubernetes machine learning pandas numpy api "
+    "design led team built deployed optimized pipeline latency service data model"
+).split()
+
+
+def _line(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def write_pdf(path, pages, lines_per_page, rng):
+    """Write a minimal valid PDF with one Helvetica text stream per page."""
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(b"")  # filled in below
+    page_ids = []
+    for _ in range(pages):
+        ops = ["BT /F1 10 Tf 14 TL 50 780 Td"]
+        for _ in range(lines_per_page):
+            ops.append(f"({_line(rng)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        content_id = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (pages_id, font_id, content_id)
+        ))
+    kids = b" ".join(b"%d 0 R" % pid for pid in page_ids)
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_at = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog_id, xref_at
+    )
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_docx(path, paragraphs, rng):
+    document = Document()
+    for _ in range(paragraphs):
+        document.add_paragraph(_line(rng, 20))
+    document.save(path)
+
+
+def write_txt(path, lines, rng):
+    with open(path, "w") as f:
+        f.write("\n".join(_line(rng) for _ in range(lines)))
+
+
+def legacy_extract(file_path):
+    """The pre-streaming implementation, kept here as the baseline."""
+    ext = os.path.splitext(file_path)[1].lower()
+    max_pages = int(os.getenv("RESUME_MAX_PAGES", "5"))
+    max_chars = int(os.getenv("RESUME_MAX_CHARS", "6000"))
+    if ext == ".pdf":
+        with open(file_path, "rb") as file_stream:
+            reader = PdfReader(file_stream)
+            chunks = [page.extract_text() or "" for page in reader.pages[:max_pages]]
+        return "\n".join(chunks).strip()[:max_chars]
+    if ext == ".docx":
+        return "\n".join(p.text for p in Document(file_path).paragraphs).strip()[:max_chars]
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read().strip()[:max_chars]
+
+
+def build_corpus(root, files, page_counts, seed):
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(files):
+        pages = page_counts[(i // 3) % len(page_counts)]
+        kind = ("pdf", "docx", "txt")[i % 3]
+        path = os.path.join(root, f"resume_{i}.{kind}")
+        if kind == "pdf":
+            write_pdf(path, pages, 45, rng)
+        elif kind == "docx":
+            write_docx(path, pages * 20, rng)
+        else:
+            write_txt(path, pages * 45, rng)
+        corpus.append((kind, pages, path))
+    return corpus
+
+
+def time_extractor(extract, corpus, repeat):
+    timings = {}
+    for kind, pages, path in corpus:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            extract(path)
+            timings.setdefault(f"{kind}/{pages}p", []).append((time.perf_counter() - started) * 1000)
+    return {
+        key: {
+            "n": len(values),
+            "mean_ms": round(statistics.mean(values), 3),
+            "p50_ms": round(statistics.median(values), 3),
+            "max_ms": round(max(values), 3),
+        }
+        for key, values in sorted(timings.items())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=30)
+    parser.add_argument("--pages", default="1,5,20", help="comma-separated page counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    page_counts = [int(p) for p in args.pages.split(",")]
+    with tempfile.TemporaryDirectory() as root:
+        corpus = build_corpus(root, args.files, page_counts, args.seed)
+
+        mismatches = [path for _, _, path in corpus if legacy_extract(path) != extract_text_from_resume(path)]
+        results = {
+            "files": len(corpus),
+            "max_chars": int(os.getenv("RESUME_MAX_CHARS", "6000")),
+            "max_pages": int(os.getenv("RESUME_MAX_PAGES", "5")),
+            "mismatches": len(mismatches),
+            "legacy": time_extractor(legacy_extract, corpus, args.repeat),
+            "streaming": time_extractor(extract_text_from_resume, corpus, args.repeat),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
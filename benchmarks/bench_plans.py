@@ -0,0 +1,81 @@
+"""
+Benchmark the nightly plan batch on a throwaway database: create users
+with study items in mixed spaced-repetition states, then time
+database.build_plans for one day.
+
+    python -m benchmarks.bench_plans --users 100000 --items 20 --workers 4
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.harness import write_results
+
+
+def synthetic_items(users, items, seed):
+    rng = random.Random(seed)
+    today = date.today()
+    for user_id in range(1, users + 1):
+        for step in range(items):
+            if rng.random() < 0.5:
+                yield user_id, "topic", "Topic", step, f"Step {step + 1}", 45, 0, 0.0, 2.5, None
+            else:
+                interval = rng.choice((1.0, 6.0, 15.0, 36.0))
+                due = today + timedelta(days=rng.randint(-5, int(interval)))
+                yield user_id, "topic", "Topic", step, f"Step {step + 1}", 45, 2, interval, 2.5, due.isoformat()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--items", type=int, default=20, help="study items per user")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_plans_")
+    os.environ["STUDY_PLANNER_DB"] = os.path.join(workdir, "study_planner.db")
+    # Imported after STUDY_PLANNER_DB points at the throwaway database
+    from app.db import bulk_insert, get_conn
+    from database.build_plans import run
+
+    conn = get_conn()
+    started = time.perf_counter()
+    bulk_insert(conn, "INSERT INTO users (id, username) VALUES (?, ?)",
+                ((user_id, f"bench-user-{user_id}") for user_id in range(1, args.users + 1)))
+    items = bulk_insert(
+        conn,
+        "INSERT INTO study_items (user_id, topic_key, topic, step_index, title, minutes, repetitions, "
+        "interval_days, ease, due_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        synthetic_items(args.users, args.items, args.seed),
+    )
+    setup_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    plans = run(date.today(), max(1, args.workers))
+    batch_s = time.perf_counter() - started
+
+    tasks = conn.execute(
+        "SELECT AVG(json_array_length(plan, '$.tasks')) FROM study_plans WHERE date = ?",
+        (date.today().isoformat(),),
+    ).fetchone()[0]
+    write_results({
+        "users": args.users,
+        "items": items,
+        "workers": args.workers,
+        "setup_s": round(setup_s, 1),
+        "plans": plans,
+        "batch_s": round(batch_s, 1),
+        "users_per_s": round(plans / batch_s) if batch_s else None,
+        "mean_tasks_per_plan": round(tasks or 0, 2),
+        "database": os.environ["STUDY_PLANNER_DB"],
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark roadmap/resource search on a throwaway database: index a
+synthetic catalog of roadmaps and resource bundles, then time /api/search
+style queries (words, prefixes, very common words, topic-filtered)
+against the FTS5 index.
+
+    python -m benchmarks.bench_search --topics 2000 --queries 2000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.harness import summarize, write_results
+
+TECH_WORDS = (
+    "python docker kubernetes rust sql pandas numpy react typescript graphql terraform linux networking "
+    "testing security caching queues concurrency async compilers databases indexing statistics regression "
+    "transformers embeddings deployment monitoring profiling algorithms recursion graphs streaming"
+).split()
+VERBS = ("Learn", "Practice", "Build", "Review", "Deploy", "Read about", "Implement", "Debug")
+
+
+class Vocabulary:
+    """Tech words plus generated ones, drawn with Zipf-like frequencies like real text."""
+
+    def __init__(self, rng, size):
+        syllables = ("ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "qu", "ba", "do")
+        generated = {"".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(size)}
+        self.words = TECH_WORDS + sorted(generated - set(TECH_WORDS))
+        self.weights = [1 / (rank + 1) for rank in range(len(self.words))]
+        self.rng = rng
+
+    def sample(self, count):
+        return self.rng.choices(self.words, self.weights, k=count)
+
+
+def synthetic_roadmap(rng, vocabulary):
+    lines = []
+    for phase in ("Beginner (Weeks 1-3)", "Intermediate (Weeks 4-6)", "Advanced (Weeks 7-9)"):
+        lines.append(phase)
+        for _ in range(rng.randint(10, 16)):
+            words = " ".join(vocabulary.sample(4))
+            suffix = rng.choice(("", " project", " milestone check", " to understand the basics"))
+            lines.append(f"- {rng.choice(VERBS)} {words}{suffix}")
+    return "\n".join(lines)
+
+
+def synthetic_bundle(rng, vocabulary, topic):
+    return {
+        "youtube_videos": [{"title": f"{topic} {' '.join(vocabulary.sample(2))} tutorial", "videoId": f"v{i}"}
+                           for i in range(5)],
+        "coursera_courses": [{"title": f"{topic} Fundamentals", "url": "https://www.coursera.org"}],
+        "github_repos": [{"repo": f"org/{vocabulary.sample(1)[0]}-{topic.lower().replace(' ', '-')}",
+                          "url": "https://github.com"} for _ in range(5)],
+    }
+
+
+def time_search(search, queries):
+    latencies = []
+    started = time.perf_counter()
+    hits = 0
+    for text, topic in queries:
+        t0 = time.perf_counter()
+        hits += len(search(text, topic=topic))
+        latencies.append((time.perf_counter() - t0) * 1000)
+    summary = summarize(latencies, 0, time.perf_counter() - started)
+    summary["mean_hits"] = round(hits / len(queries), 1) if queries else 0
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--vocabulary", type=int, default=5000, help="distinct words in the synthetic catalog")
+    parser.add_argument("--seed", type=int, default=9)
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_search_")
+    os.environ["STUDY_PLANNER_DB"] = os.path.join(workdir, "study_planner.db")
+    # Imported after STUDY_PLANNER_DB points at the throwaway database
+    from app.db import get_conn
+    from app.roadmap_index import index_resources, index_roadmap, search
+
+    rng = random.Random(args.seed)
+    vocabulary = Vocabulary(rng, args.vocabulary)
+    topics = [f"{rng.choice(TECH_WORDS).title()} {' '.join(vocabulary.sample(2))} {i}" for i in range(args.topics)]
+    started = time.perf_counter()
+    for topic in topics:
+        index_roadmap(topic, synthetic_roadmap(rng, vocabulary))
+        index_resources(topic, synthetic_bundle(rng, vocabulary, topic))
+    index_s = time.perf_counter() - started
+    steps = get_conn().execute("SELECT COUNT(*) FROM roadmap_steps").fetchone()[0]
+    resources = get_conn().execute("SELECT COUNT(*) FROM resource_items").fetchone()[0]
+
+    # Queries follow the catalog's word frequencies; "common_word" always
+    # picks one of the most frequent words, the worst case for ranking
+    word = [(vocabulary.sample(1)[0], None) for _ in range(args.queries)]
+    phrase = [(" ".join(vocabulary.sample(2)), None) for _ in range(args.queries)]
+    prefix = [(vocabulary.sample(1)[0][:3], None) for _ in range(args.queries)]
+    common = [(rng.choice(TECH_WORDS[:5]), None) for _ in range(args.queries)]
+    in_topic = [(vocabulary.sample(1)[0], rng.choice(topics)) for _ in range(args.queries)]
+
+    write_results({
+        "topics": len(topics),
+        "steps": steps,
+        "resources": resources,
+        "index_s": round(index_s, 2),
+        "one_word": time_search(search, word),
+        "two_words": time_search(search, phrase),
+        "prefix": time_search(search, prefix),
+        "common_word": time_search(search, common),
+        "one_topic": time_search(search, in_topic),
+        "database": os.environ["STUDY_PLANNER_DB"],
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
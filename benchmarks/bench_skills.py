@@ -0,0 +1,158 @@
+"""
+Benchmark skill extraction over a synthetic corpus of resumes. Compares the
+compiled single-pass matcher (app.skill_extractor) with one regex search per
+alias and with the substring checks the fallback Q&A used before, and checks
+that the compiled matcher counts the same skills as the per-alias scan
+(leftmost-longest, so "react native" is not also counted as "react").
+
+    python -m benchmarks.bench_skills --resumes 2000
+"""
+
+import argparse
+import random
+import re
+import statistics
+import time
+
+from app.skill_extractor import (
+    _BOUNDARY_AFTER,
+    _BOUNDARY_BEFORE,
+    _TAXONOMY,
+    _split_aliases,
+    extract_skills,
+    get_matcher,
+)
+from benchmarks.harness import write_results
+
+FILLER = (
+    "designed built led team shipped improved latency service customers data pipeline "
+    "reduced cost migrated internal platform reporting dashboards html emails mentored "
+    "interns partnered product weekly releases spring 2023 go to market r&d summary"
+).split()
+HEADINGS = ("Summary", "Skills", "Projects", "Experience", "Education")
+
+
+def build_corpus(count, seed):
+    rng = random.Random(seed)
+    aliases = [alias for _, _, spec in _TAXONOMY for alias, _ in _split_aliases(spec)]
+    corpus = []
+    for _ in range(count):
+        lines = []
+        for heading in HEADINGS:
+            lines.append(heading)
+            for _ in range(rng.randint(2, 8)):
+                words = [rng.choice(FILLER) for _ in range(rng.randint(8, 20))]
+                for _ in range(rng.randint(0, 3)):
+                    words.insert(rng.randrange(len(words) + 1), rng.choice(aliases))
+                lines.append(" ".join(words))
+        corpus.append("\n".join(lines))
+    return corpus
+
+
+def legacy_skills(text):
+    """The substring checks fallback_questions used, kept as the baseline."""
+    text_lower = text.lower()
+    skills = []
+    if "python" in text_lower:
+        skills.append("Python")
+    if "flask" in text_lower:
+        skills.append("Flask")
+    if "react" in text_lower:
+        skills.append("React")
+    if "machine learning" in text_lower or "ml" in text_lower:
+        skills.append("Machine Learning")
+    if "sql" in text_lower:
+        skills.append("SQL")
+    return skills
+
+
+def per_alias_patterns():
+    patterns = []
+    for name, _, spec in _TAXONOMY:
+        for alias, case_sensitive in _split_aliases(spec):
+            body = r"\s+".join(re.escape(part) for part in alias.split())
+            flags = 0 if case_sensitive else re.IGNORECASE
+            patterns.append((name, re.compile(_BOUNDARY_BEFORE + body + _BOUNDARY_AFTER, flags)))
+    return patterns
+
+
+def per_alias_skills(text, patterns):
+    """{skill: count} from every alias's matches, keeping the leftmost-longest of overlaps."""
+    spans = sorted(
+        (match.start(), -match.end(), name)
+        for name, pattern in patterns
+        for match in pattern.finditer(text)
+    )
+    counts = {}
+    last_end = 0
+    for start, neg_end, name in spans:
+        if start >= last_end:
+            counts[name] = counts.get(name, 0) + 1
+            last_end = -neg_end
+    return counts
+
+
+def time_extractor(extract, corpus):
+    """Returns (timing summary, outputs)."""
+    timings = []
+    outputs = []
+    started = time.perf_counter()
+    for text in corpus:
+        t0 = time.perf_counter()
+        outputs.append(extract(text))
+        timings.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    megabytes = sum(len(text) for text in corpus) / 1e6
+    return {
+        "total_ms": round(elapsed * 1000, 1),
+        "resumes_per_s": round(len(corpus) / elapsed, 1),
+        "mb_per_s": round(megabytes / elapsed, 2),
+        "p50_ms": round(statistics.median(timings), 4),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 4),
+    }, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.resumes, args.seed)
+
+    started = time.perf_counter()
+    pattern, aliases = get_matcher()
+    compile_ms = (time.perf_counter() - started) * 1000
+    patterns = per_alias_patterns()
+
+    compiled, compiled_out = time_extractor(extract_skills, corpus)
+    per_alias, per_alias_out = time_extractor(lambda text: per_alias_skills(text, patterns), corpus)
+    legacy, legacy_out = time_extractor(legacy_skills, corpus)
+
+    found = [{entry["skill"]: entry["count"] for entry in entries} for entries in compiled_out]
+    mismatches = sum(1 for expected, got in zip(per_alias_out, found) if expected != got)
+    # "ml" in "html" and friends: the old checks report skills no alias matches
+    legacy_false = sum(
+        1 for old, got in zip(legacy_out, found) if "Machine Learning" in old and "Machine Learning" not in got
+    )
+
+    results = {
+        "resumes": len(corpus),
+        "mean_chars": round(statistics.mean(len(text) for text in corpus)),
+        "skills": len(_TAXONOMY),
+        "aliases": len(aliases),
+        "compile_ms": round(compile_ms, 2),
+        "pattern_chars": len(pattern.pattern),
+        "mismatches": mismatches,
+        "legacy_false_machine_learning": legacy_false,
+        "compiled": compiled,
+        "per_alias": per_alias,
+        "legacy_substring": legacy,
+    }
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark the study log store on a throwaway database: bulk-insert a
+synthetic history for many users, then time per-user history and totals
+queries and report the query plan SQLite picks for them.
+
+    python -m benchmarks.bench_study_logs --users 2000 --days 365
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.harness import summarize, write_results
+
+
+def synthetic_logs(user_ids, days, seed):
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=days)
+    for offset in range(days):
+        day = (start + timedelta(days=offset)).isoformat()
+        for user_id in user_ids:
+            if rng.random() < 0.6:
+                yield user_id, day, round(rng.uniform(0.25, 4.0), 2), None, None
+
+
+def time_queries(fn, user_ids, queries, rng):
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(queries):
+        user_id = rng.choice(user_ids)
+        t0 = time.perf_counter()
+        fn(user_id)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return summarize(latencies, 0, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_study_logs_")
+    os.environ["STUDY_PLANNER_DB"] = os.path.join(workdir, "study_planner.db")
+    # Imported after STUDY_PLANNER_DB points at the throwaway database
+    from app import study_store
+    from app.db import get_conn
+
+    user_ids = [study_store.create_user(f"bench-user-{i}") for i in range(args.users)]
+
+    started = time.perf_counter()
+    inserted = study_store.add_study_logs(synthetic_logs(user_ids, args.days, args.seed))
+    insert_s = time.perf_counter() - started
+
+    recent = (date.today() - timedelta(days=30)).isoformat()
+    rng = random.Random(args.seed)
+    plan = get_conn().execute(
+        "EXPLAIN QUERY PLAN SELECT date, hours_spent FROM study_logs "
+        "WHERE user_id = ? AND date BETWEEN ? AND ? ORDER BY date DESC LIMIT ?",
+        (user_ids[0], recent, "9999-12-31", 100),
+    ).fetchall()
+
+    results = {
+        "users": len(user_ids),
+        "rows": inserted,
+        "bulk_insert_s": round(insert_s, 2),
+        "bulk_insert_rows_per_s": round(inserted / insert_s) if insert_s else None,
+        "history_plan": [row[-1] for row in plan],
+        "history_all": time_queries(study_store.get_study_history, user_ids, args.queries, rng),
+        "history_last_30_days": time_queries(
+            lambda user_id: study_store.get_study_history(user_id, start=recent), user_ids, args.queries, rng
+        ),
+        "totals": time_queries(study_store.get_study_totals, user_ids, args.queries, rng),
+        "database": os.environ["STUDY_PLANNER_DB"],
+    }
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
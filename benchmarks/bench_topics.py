@@ -0,0 +1,104 @@
+"""
+Benchmark topic canonicalization over a large synthetic topic catalog on a
+throwaway database: time loading the index, then resolve() for exact
+spellings, aliases, filler-word variants, typos (corrected, then checked
+against the trigram similarity threshold and learned as aliases) and
+unseen topics (learned as new topics).
+
+    python -m benchmarks.bench_topics --topics 100000 --queries 2000
+"""
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+
+from benchmarks.harness import summarize, write_results
+
+SUBJECTS = (
+    "python rust golang java kotlin swift scala haskell elixir erlang clojure julia fortran cobol dart lua perl "
+    "docker kubernetes terraform ansible kafka spark hadoop airflow redis postgresql mongodb cassandra graphql "
+    "react angular svelte django flask fastapi spring rails laravel pytorch tensorflow keras pandas numpy"
+).split()
+AREAS = (
+    "web development", "data engineering", "machine learning", "system design", "security", "testing",
+    "performance tuning", "concurrency", "networking", "databases", "cloud deployment", "mobile apps",
+    "game development", "compilers", "embedded systems", "observability", "data visualization", "microservices",
+)
+LEVELS = ("", "advanced", "applied", "modern", "practical", "distributed", "scalable", "secure", "functional")
+
+
+def synthetic_topics(count, rng):
+    topics = set()
+    while len(topics) < count:
+        words = [rng.choice(LEVELS), rng.choice(SUBJECTS), rng.choice(AREAS), str(rng.randint(1, 400))]
+        topics.add(" ".join(word for word in words if word).title())
+    return sorted(topics)
+
+
+def typo(text, rng):
+    letters = [i for i, char in enumerate(text) if char.isalpha()]
+    i = rng.choice(letters)
+    edit = rng.choice(("drop", "swap", "replace"))
+    if edit == "drop":
+        return text[:i] + text[i + 1:]
+    if edit == "swap" and i + 1 < len(text):
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return text[:i] + rng.choice(string.ascii_lowercase) + text[i + 1:]
+
+
+def time_resolve(resolve, queries):
+    latencies = []
+    matches = {}
+    started = time.perf_counter()
+    for query in queries:
+        t0 = time.perf_counter()
+        _, how, _ = resolve(query)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        matches[how] = matches.get(how, 0) + 1
+    summary = summarize(latencies, 0, time.perf_counter() - started)
+    summary["matches"] = matches
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--topics", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_topics_")
+    os.environ["STUDY_PLANNER_DB"] = os.path.join(workdir, "study_planner.db")
+    # Imported after STUDY_PLANNER_DB points at the throwaway database
+    from app.db import bulk_insert, get_conn
+    from app.topic_canonicalizer import TopicCanonicalizer, topic_key
+
+    rng = random.Random(args.seed)
+    topics = synthetic_topics(args.topics, rng)
+    bulk_insert(get_conn(), "INSERT INTO topics (topic_key, topic, created_at) VALUES (?, ?, 0)",
+                ((topic_key(topic), topic) for topic in topics))
+
+    canonicalizer = TopicCanonicalizer()
+    started = time.perf_counter()
+    canonicalizer.refresh()
+    load_s = time.perf_counter() - started
+
+    sample = [rng.choice(topics) for _ in range(args.queries)]
+    write_results({
+        "topics": len(canonicalizer.index),
+        "load_s": round(load_s, 2),
+        "exact": time_resolve(canonicalizer.resolve, [topic.lower() for topic in sample]),
+        "alias": time_resolve(canonicalizer.resolve, [rng.choice(("ML", "k8s", "golang", "JS")) for _ in sample]),
+        "filler_words": time_resolve(canonicalizer.resolve, [f"Intro to {topic} for beginners" for topic in sample]),
+        "typo": time_resolve(canonicalizer.resolve, [typo(topic, rng) for topic in sample]),
+        "unseen": time_resolve(canonicalizer.resolve, [f"Quantum {rng.choice(SUBJECTS)} {i}" for i in range(len(sample))]),
+        "database": os.environ["STUDY_PLANNER_DB"],
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Shared pieces for the HTTP benchmarks: starting the mock upstream and the
+API server as subprocesses, driving requests at a fixed concurrency and
+summarizing latencies.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode, urlsplit
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_http(url, timeout=30.0, process=None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"{url}: server exited with code {process.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not become ready within {timeout}s")
+
+
+def start_mock(port, mock_args=()):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.mock_upstream", "--port", str(port), *mock_args],
+        cwd=REPO_ROOT,
+        stdout=subprocess.DEVNULL,
+    )
+    wait_for_http(f"http://127.0.0.1:{port}/", process=process)
+    return process
+
+
+def mock_env(port):
+    base = f"http://127.0.0.1:{port}"
+    return {
+        "YOUTUBE_API_KEY": "mock",
+        "YOUTUBE_SEARCH_URL": f"{base}/youtube/v3/search",
+        "GITHUB_SEARCH_URL": f"{base}/search/repositories",
+        "PREDICTOR_API_URL": f"{base}/predict",
+        "GROQ_BASE_URL": base,
+        "GROQ_API_KEY": "mock",
+    }
+
+
+def server_command(mode, port, workers, threads):
+    """Command line for serving the API in 'wsgi' (gunicorn) or 'asgi' (uvicorn) mode."""
+    if mode == "wsgi":
+        return [
+            sys.executable, "-m", "gunicorn", "run:app",
+            "-b", f"127.0.0.1:{port}", "-w", str(workers),
+            "--threads", str(threads), "--log-level", "warning",
+        ]
+    if mode == "asgi":
+        return [
+            sys.executable, "-m", "uvicorn", "asgi:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ]
+    raise ValueError(f"unknown mode {mode!r}")
+
+
+def start_server(mode, port, env, workers=1, threads=8, workdir=None):
+    """Serve the API; relative paths the app writes to (uploads/, data/) resolve in workdir if given."""
+    process = subprocess.Popen(
+        server_command(mode, port, workers, threads),
+        cwd=workdir or REPO_ROOT,
+        env={**os.environ, **env, "PYTHONPATH": REPO_ROOT},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    wait_for_http(f"http://127.0.0.1:{port}/", process=process)
+    return process
+
+
+def stop(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies_ms, errors, elapsed_s):
+    values = sorted(latencies_ms)
+    total = len(values) + errors
+    return {
+        "requests": total,
+        "ok": len(values),
+        "errors": errors,
+        "throughput_rps": round(total / elapsed_s, 2) if elapsed_s else None,
+        "mean_ms": round(statistics.mean(values), 2) if values else None,
+        "p50_ms": round(percentile(values, 50), 2) if values else None,
+        "p90_ms": round(percentile(values, 90), 2) if values else None,
+        "p99_ms": round(percentile(values, 99), 2) if values else None,
+        "max_ms": round(values[-1], 2) if values else None,
+    }
+
+
+class Response:
+    def __init__(self, status_code, headers, body):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class LoadClient:
+    """
+    Minimal keep-alive HTTP/1.1 client on raw asyncio streams. The load
+    generator must stay cheaper than the server it measures, and httpx's
+    connection pool costs O(connections) per request at high concurrency.
+    One LoadClient owns one connection and sends one request at a time.
+    """
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+    async def request(self, method, path, params=None, json_body=None, body=b"", headers=None):
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        headers = dict(headers or {})
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers.setdefault("Content-Type", "application/json")
+        return await asyncio.wait_for(self._roundtrip(method, path, body, headers), self.timeout)
+
+    def get(self, path, params=None, **kwargs):
+        return self.request("GET", path, params=params, **kwargs)
+
+    def post(self, path, json=None, **kwargs):
+        return self.request("POST", path, json_body=json, **kwargs)
+
+    async def _roundtrip(self, method, path, body, headers):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        self._writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            await self.close()
+            raise ConnectionError("server closed the connection")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self._reader.readline()
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readline()
+            payload = b"".join(chunks)
+        elif "content-length" in response_headers:
+            payload = await self._reader.readexactly(int(response_headers["content-length"]))
+        else:
+            payload = await self._reader.read()
+            await self.close()
+
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return Response(status, response_headers, payload)
+
+
+async def drive(base_url, make_request, total, concurrency, timeout=120.0):
+    """
+    Send `total` requests with at most `concurrency` in flight, one
+    keep-alive connection per concurrent worker. make_request(client, i)
+    must return an awaitable Response; see LoadClient.
+    """
+    url = urlsplit(base_url)
+    latencies = []
+    errors = 0
+    error_statuses = {}
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        client = LoadClient(url.hostname, url.port, timeout)
+        try:
+            while next_index < total:
+                i = next_index
+                next_index += 1
+                started = time.perf_counter()
+                try:
+                    response = await make_request(client, i)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                    errors += 1
+                    await client.close()
+                    continue
+                if response.status_code >= 400:
+                    errors += 1
+                    error_statuses[response.status_code] = error_statuses.get(response.status_code, 0) + 1
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    summary = summarize(latencies, errors, elapsed)
+    if error_statuses:
+        summary["error_statuses"] = {str(status): count for status, count in sorted(error_statuses.items())}
+    return summary
+
+
+def write_results(results, path=None):
+    text = json.dumps(results, indent=2)
+    if path:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    print(text)
@@ -0,0 +1,126 @@
+"""
+Cold-start cost of the app factory, measured with `python -X importtime`.
+
+Each run is a fresh interpreter, so nothing is shared between runs except
+the bytecode cache (one untimed warm-up run fills it). Reports the median
+import time of the whole statement, the modules that dominate it and any
+heavy dependency that was imported even though no route has run yet.
+
+    python -m benchmarks.import_time --runs 5 --max-ms 400
+
+Exits with status 1 when --max-ms is exceeded or a --forbid module is
+loaded, so it can gate CI as a startup regression check.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.harness import REPO_ROOT, write_results
+
+DEFAULT_STATEMENT = "from app import create_app; create_app()"
+# Loaded on first use of the routes that need them, never by create_app
+DEFAULT_FORBID = ("groq", "httpx", "requests", "numpy", "pandas", "PyPDF2", "docx")
+
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output into a list of (module, self_us, cumulative_us, depth)
+    in the order the lines were printed.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # "import time:       381 |     155644 |   app.routes", two spaces per level
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        module = name.lstrip(" ")
+        depth = (len(name) - len(module) - 1) // 2
+        rows.append((module, int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def measure_once(statement, python=sys.executable):
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT}
+    started = time.perf_counter()
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{result.stderr[-2000:]}")
+    return wall_ms, parse_importtime(result.stderr)
+
+
+def run(statement, runs, top, forbid):
+    measure_once(statement)  # warm the bytecode cache
+
+    walls = []
+    totals = []
+    cumulative = {}
+    loaded = set()
+    for _ in range(runs):
+        wall_ms, rows = measure_once(statement)
+        walls.append(wall_ms)
+        totals.append(sum(self_us for _, self_us, _, _ in rows) / 1000)
+        for module, _, cumulative_us, _ in rows:
+            cumulative.setdefault(module, []).append(cumulative_us / 1000)
+            loaded.add(module)
+
+    slowest = sorted(
+        ((module, statistics.median(values)) for module, values in cumulative.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+    forbidden = sorted(
+        name for name in forbid
+        if any(module == name or module.startswith(name + ".") for module in loaded)
+    )
+    return {
+        "statement": statement,
+        "python": sys.version.split()[0],
+        "runs": runs,
+        "import_ms_median": round(statistics.median(totals), 2),
+        "import_ms_min": round(min(totals), 2),
+        "wall_ms_median": round(statistics.median(walls), 2),
+        "modules_loaded": len(loaded),
+        "slowest_modules": [{"module": m, "cumulative_ms": round(ms, 2)} for m, ms in slowest],
+        "forbidden_loaded": forbidden,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--statement", default=DEFAULT_STATEMENT, help="code to time with -X importtime")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="number of slowest modules to report")
+    parser.add_argument("--forbid", default=",".join(DEFAULT_FORBID),
+                        help="comma-separated modules that must not be imported ('' to disable)")
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="fail if the median import time exceeds this many milliseconds")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    forbid = [name for name in args.forbid.split(",") if name]
+    results = run(args.statement, args.runs, args.top, forbid)
+    write_results(results, args.output)
+
+    failures = []
+    if args.max_ms is not None and results["import_ms_median"] > args.max_ms:
+        failures.append(f"median import time {results['import_ms_median']} ms exceeds {args.max_ms} ms")
+    if results["forbidden_loaded"]:
+        failures.append(f"imported at startup: {', '.join(results['forbidden_loaded'])}")
+    for failure in failures:
+        print(f"❌ {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
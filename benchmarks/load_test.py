@@ -0,0 +1,84 @@
+"""
+Compare the sync (gunicorn/Flask) and async (uvicorn/ASGI) serving modes
+against a local mock upstream. Each endpoint is driven at a fixed
+concurrency with unique topics, so every request reaches the upstream.
+
+    python -m benchmarks.load_test --concurrency 200 --requests 2000 --latency-ms 300
+"""
+
+import argparse
+import asyncio
+import tempfile
+
+from benchmarks.harness import (
+    drive,
+    free_port,
+    mock_env,
+    start_mock,
+    start_server,
+    stop,
+    write_results,
+)
+
+ENDPOINTS = {
+    "resources": lambda client, i: client.get("/api/resources", params={"topic": f"topic {i}"}),
+    "roadmap": lambda client, i: client.get("/api/roadmap", params={"topic": f"topic {i}"}),
+    "predict": lambda client, i: client.post("/api/predict", json={"freetime": i % 5 + 1}),
+    "interview": lambda client, i: client.post("/api/interview", json={"resumeText": f"Python developer {i}"}),
+}
+
+
+def run_mode(mode, args, mock_port):
+    port = free_port()
+    with tempfile.TemporaryDirectory() as workdir:
+        env = {
+            **mock_env(mock_port),
+            # Measure upstream concurrency, not cache hits or admission control
+            "RESOURCE_CACHE_MAX_ENTRIES": "0",
+            "ADMISSION_ENABLED": "0",
+            "RESUME_DB_PATH": f"{workdir}/resume_store.db",
+        }
+        server = start_server(mode, port, env, workers=args.workers, threads=args.threads)
+        try:
+            results = {}
+            for name in args.endpoints.split(","):
+                results[name] = asyncio.run(drive(
+                    f"http://127.0.0.1:{port}", ENDPOINTS[name], args.requests, args.concurrency
+                ))
+            return results
+        finally:
+            stop(server)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--modes", default="wsgi,asgi")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads per worker (wsgi)")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="mock upstream latency")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    mock_port = free_port()
+    mock = start_mock(mock_port, ["--latency-ms", str(args.latency_ms)])
+    try:
+        results = {
+            "config": {
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "workers": args.workers,
+                "threads": args.threads,
+                "upstream_latency_ms": args.latency_ms,
+            },
+            "modes": {mode: run_mode(mode, args, mock_port) for mode in args.modes.split(",")},
+        }
+    finally:
+        stop(mock)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Local stand-in for every upstream the API talks to: YouTube search,
+GitHub search, the onrender study-time predictor and Groq's
+OpenAI-compatible chat completions (plain and streamed).
+
+Latency, error rate and payload size are configurable, so benchmarks can
+run offline and reproducibly. Latency and error rate can be set per
+upstream (youtube, github, predictor, groq) on top of the defaults.
+
+    python -m benchmarks.mock_upstream --port 9100 --latency-ms 200 --upstream-latency-ms groq=800
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from urllib.parse import urlsplit
+
+WORDS = "learn build practice review project deploy test design data model api".split()
+
+
+class MockConfig:
+    def __init__(self, latency_ms=100.0, jitter_ms=0.0, error_rate=0.0, items=5,
+                 completion_lines=40, seed=None, upstream_latency_ms=None, upstream_error_rate=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.items = items
+        self.completion_lines = completion_lines
+        self.rng = random.Random(seed)
+        # upstream name -> value overriding latency_ms / error_rate
+        self.upstream_latency_ms = upstream_latency_ms or {}
+        self.upstream_error_rate = upstream_error_rate or {}
+
+
+def parse_overrides(spec):
+    """{"groq": 800.0, ...} from "groq=800,youtube=120"."""
+    overrides = {}
+    for part in (spec or "").split(","):
+        name, _, value = part.partition("=")
+        if name.strip():
+            overrides[name.strip()] = float(value)
+    return overrides
+
+
+def upstream_of(path):
+    if path.endswith("/youtube/v3/search"):
+        return "youtube"
+    if path.endswith("/search/repositories"):
+        return "github"
+    if path.endswith("/predict"):
+        return "predictor"
+    if path.endswith("/chat/completions"):
+        return "groq"
+    return None
+
+
+def _youtube(config):
+    return {
+        "items": [
+            {"id": {"videoId": f"vid{i}"}, "snippet": {"title": f"Mock video {i}"}}
+            for i in range(config.items)
+        ]
+    }
+
+
+def _github(config):
+    return {
+        "items": [
+            {"full_name": f"mock/repo-{i}", "html_url": f"https://github.com/mock/repo-{i}"}
+            for i in range(config.items)
+        ]
+    }
+
+
+def _predict(config):
+    return {
+        "predicted_hours": round(config.rng.uniform(1, 5), 2),
+        "confidence_level": "80%",
+        "key_influencing_factors": ["Free time"],
+        "recommendation": "Mock recommendation",
+    }
+
+
+def _completion_text(config, request_body):
+    prompt = json.dumps(request_body.get("messages", []))
+    if "Q1:" in prompt:
+        pairs = max(1, config.completion_lines // 2)
+        return "\n".join(
+            f"Q{i}: Mock question {i}?\nA{i}: " + " ".join(config.rng.choice(WORDS) for _ in range(30))
+            for i in range(1, pairs + 1)
+        )
+    return "\n".join(
+        "- " + " ".join(config.rng.choice(WORDS) for _ in range(12))
+        for _ in range(config.completion_lines)
+    )
+
+
+def _chat_completion(config, request_body, text):
+    words = len(text.split())
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion",
+        "created": 0,
+        "model": request_body.get("model", "mock"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 200, "completion_tokens": words, "total_tokens": 200 + words},
+    }
+
+
+def _stream_chunks(request_body, text):
+    for i in range(0, len(text), 40):
+        chunk = {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": request_body.get("model", "mock"),
+            "choices": [{"index": 0, "delta": {"content": text[i:i + 40]}, "finish_reason": None}],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n".encode()
+    done = {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": request_body.get("model", "mock"),
+        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+    }
+    yield f"data: {json.dumps(done)}\n\n".encode()
+    yield b"data: [DONE]\n\n"
+
+
+class MockUpstream:
+    """Minimal asyncio HTTP/1.1 server with keep-alive."""
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or MockConfig()
+        self.host = host
+        self.port = port
+        self.server = None
+        self.requests = 0
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def env(self):
+        """Environment variables pointing the app at this mock."""
+        return {
+            "YOUTUBE_API_KEY": "mock",
+            "YOUTUBE_SEARCH_URL": f"{self.base_url}/youtube/v3/search",
+            "GITHUB_SEARCH_URL": f"{self.base_url}/search/repositories",
+            "PREDICTOR_API_URL": f"{self.base_url}/predict",
+            "GROQ_BASE_URL": self.base_url,
+            "GROQ_API_KEY": "mock",
+        }
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port, backlog=4096)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = b""
+                if "content-length" in headers:
+                    body = await reader.readexactly(int(headers["content-length"]))
+                self.requests += 1
+                await self._respond(writer, method, urlsplit(target).path, body)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, method, path, body):
+        config = self.config
+        upstream = upstream_of(path)
+        latency_ms = config.upstream_latency_ms.get(upstream, config.latency_ms)
+        delay = latency_ms + config.rng.uniform(-config.jitter_ms, config.jitter_ms)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+
+        if config.rng.random() < config.upstream_error_rate.get(upstream, config.error_rate):
+            return await self._write(writer, 503, {"error": "mock failure"})
+
+        if upstream == "youtube":
+            return await self._write(writer, 200, _youtube(config))
+        if upstream == "github":
+            return await self._write(writer, 200, _github(config))
+        if upstream == "predictor":
+            return await self._write(writer, 200, _predict(config))
+        if upstream == "groq":
+            request_body = json.loads(body or b"{}")
+            text = _completion_text(config, request_body)
+            if request_body.get("stream"):
+                return await self._write_stream(writer, _stream_chunks(request_body, text))
+            return await self._write(writer, 200, _chat_completion(config, request_body, text))
+        return await self._write(writer, 404, {"error": f"no mock for {method} {path}"})
+
+    async def _write(self, writer, status, payload):
+        body = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def _write_stream(self, writer, chunks):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\nConnection: keep-alive\r\n\r\n"
+        )
+        for chunk in chunks:
+            writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+def add_mock_arguments(parser):
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--items", type=int, default=5, help="results per search response")
+    parser.add_argument("--completion-lines", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--upstream-latency-ms", default="",
+                        help="per-upstream latency overrides, e.g. groq=800,youtube=120")
+    parser.add_argument("--upstream-error-rate", default="",
+                        help="per-upstream error rate overrides, e.g. predictor=0.1")
+
+
+def config_from_args(args):
+    return MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        items=args.items,
+        completion_lines=args.completion_lines,
+        seed=args.seed,
+        upstream_latency_ms=parse_overrides(args.upstream_latency_ms),
+        upstream_error_rate=parse_overrides(args.upstream_error_rate),
+    )
+
+
+def mock_argv(args):
+    """Command-line arguments reproducing the mock options in args (for harness.start_mock)."""
+    argv = [
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate),
+        "--items", str(args.items),
+        "--completion-lines", str(args.completion_lines),
+        "--upstream-latency-ms", args.upstream_latency_ms,
+        "--upstream-error-rate", args.upstream_error_rate,
+    ]
+    if args.seed is not None:
+        argv += ["--seed", str(args.seed)]
+    return argv
+
+
+async def _serve(args):
+    mock = await MockUpstream(config_from_args(args), port=args.port).start()
+    print(json.dumps(mock.env(), indent=2), flush=True)
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=9100)
+    add_mock_arguments(parser)
+    asyncio.run(_serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Nightly batch: build and store a day's study plan for every user with
+study items, so /api/plan serves them without computing anything.
+
+    python -m database.build_plans --date 2026-01-31 --workers 4
+
+Users are split across --workers processes by user id; each streams its
+users' items, plans them and writes the plans in chunked transactions.
+Stored plans older than --keep-days are deleted.
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from app.db import get_conn
+from app.scheduler import build_plans
+
+logger = logging.getLogger("build_plans")
+
+
+def run(day, workers):
+    """Build `day`'s plans in `workers` processes; returns the number written."""
+    if workers == 1:
+        return build_plans(day)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(build_plans, day, shard, workers) for shard in range(workers)]
+        return sum(future.result() for future in futures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today() + timedelta(days=1),
+                        help="day to plan (default tomorrow)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--keep-days", type=int, default=7, help="delete stored plans older than this")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    started = time.monotonic()
+    purged = get_conn().execute(
+        "DELETE FROM study_plans WHERE date < ?", ((args.date - timedelta(days=args.keep_days)).isoformat(),)
+    ).rowcount
+    written = run(args.date, max(1, args.workers))
+    print(json.dumps({
+        "date": args.date.isoformat(),
+        "plans": written,
+        "purged": purged,
+        "workers": args.workers,
+        "elapsed_s": round(time.monotonic() - started, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
-import sqlite3
+import os
+import sys
+
+# Run as a script from the repo root (python database/init_db.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import STUDY_PLANNER_DB, migrate
+
 
 def init_db():
-    conn = sqlite3.connect('database/study_planner.db')
-    with open('database/schema.sql') as f:
-        conn.executescript(f.read())
-    conn.commit()
-    conn.close()
+    """Create the study planner database or apply its pending migrations."""
+    return migrate()
 
 if __name__ == "__main__":
-    init_db()
-    print("Database initialized.")
-
+    applied = init_db()
+    print(f"Database initialized ({STUDY_PLANNER_DB}); applied migrations: {applied or 'none'}.")
@@ -1,3 +1,5 @@
+-- Tables from the original database/schema.sql; IF NOT EXISTS keeps
+-- databases created by the old init_db.py valid
 CREATE TABLE IF NOT EXISTS users (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     username TEXT UNIQUE,
@@ -11,4 +13,3 @@ CREATE TABLE IF NOT EXISTS study_logs (
     hours_spent REAL,
     FOREIGN KEY(user_id) REFERENCES users(id)
 );
-
@@ -0,0 +1,25 @@
+-- Precomputed roadmaps and resource bundles for catalog topics
+-- (filled by database/precompute.py, read by the API on cache misses)
+CREATE TABLE IF NOT EXISTS topic_roadmaps (
+    topic_key TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    model TEXT,
+    roadmap TEXT NOT NULL,
+    generated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS topic_resources (
+    topic_key TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    generated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS precompute_failures (
+    topic_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    last_error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (topic_key, kind)
+);
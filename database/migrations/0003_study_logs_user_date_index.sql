@@ -0,0 +1,4 @@
+-- Per-user history is always filtered by user and date range; including
+-- hours_spent makes the index covering, so history and totals never read
+-- the table rows
+CREATE INDEX IF NOT EXISTS idx_study_logs_user_date ON study_logs(user_id, date, hours_spent);
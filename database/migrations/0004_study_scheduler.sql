@@ -0,0 +1,38 @@
+-- Spaced-repetition scheduling: one item per roadmap step a user studies,
+-- the minutes they can study each weekday, and materialized daily plans
+CREATE TABLE study_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    topic_key TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    step_index INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    minutes INTEGER NOT NULL,
+    repetitions INTEGER NOT NULL DEFAULT 0,
+    interval_days REAL NOT NULL DEFAULT 0,
+    ease REAL NOT NULL DEFAULT 2.5,
+    -- NULL until the step is first studied
+    due_date TEXT,
+    last_studied TEXT,
+    UNIQUE (user_id, topic_key, step_index)
+);
+
+CREATE TABLE study_availability (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    -- 0 = Monday, as in date.weekday()
+    weekday INTEGER NOT NULL CHECK (weekday BETWEEN 0 AND 6),
+    minutes INTEGER NOT NULL,
+    PRIMARY KEY (user_id, weekday)
+) WITHOUT ROWID;
+
+CREATE TABLE study_plans (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    generated_at REAL NOT NULL,
+    PRIMARY KEY (user_id, date)
+) WITHOUT ROWID;
+
+-- A logged session may name the item it studied and how well it went (0-5)
+ALTER TABLE study_logs ADD COLUMN item_id INTEGER REFERENCES study_items(id) ON DELETE SET NULL;
+ALTER TABLE study_logs ADD COLUMN quality INTEGER;
@@ -0,0 +1,63 @@
+-- Structured roadmaps (one row per step, grouped into phases) and resource
+-- titles per topic, each with an external-content FTS5 index kept in sync
+-- by triggers, so /api/search never touches the generated text
+CREATE TABLE roadmap_steps (
+    id INTEGER PRIMARY KEY,
+    topic_key TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    phase_index INTEGER NOT NULL,
+    phase TEXT NOT NULL,
+    step_index INTEGER NOT NULL,
+    -- step, project or milestone
+    kind TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX idx_roadmap_steps_topic ON roadmap_steps(topic_key, step_index);
+
+CREATE VIRTUAL TABLE roadmap_steps_fts USING fts5(
+    text, phase, topic,
+    content='roadmap_steps', content_rowid='id', tokenize='porter unicode61', prefix='2 3 4 5 6'
+);
+
+CREATE TRIGGER roadmap_steps_ai AFTER INSERT ON roadmap_steps BEGIN
+    INSERT INTO roadmap_steps_fts (rowid, text, phase, topic) VALUES (new.id, new.text, new.phase, new.topic);
+END;
+
+CREATE TRIGGER roadmap_steps_ad AFTER DELETE ON roadmap_steps BEGIN
+    INSERT INTO roadmap_steps_fts (roadmap_steps_fts, rowid, text, phase, topic)
+    VALUES ('delete', old.id, old.text, old.phase, old.topic);
+END;
+
+CREATE TABLE resource_items (
+    id INTEGER PRIMARY KEY,
+    topic_key TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    source TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT
+);
+CREATE INDEX idx_resource_items_topic ON resource_items(topic_key);
+
+CREATE VIRTUAL TABLE resource_items_fts USING fts5(
+    title, source, topic,
+    content='resource_items', content_rowid='id', tokenize='porter unicode61', prefix='2 3 4 5 6'
+);
+
+CREATE TRIGGER resource_items_ai AFTER INSERT ON resource_items BEGIN
+    INSERT INTO resource_items_fts (rowid, title, source, topic) VALUES (new.id, new.title, new.source, new.topic);
+END;
+
+CREATE TRIGGER resource_items_ad AFTER DELETE ON resource_items BEGIN
+    INSERT INTO resource_items_fts (resource_items_fts, rowid, title, source, topic)
+    VALUES ('delete', old.id, old.title, old.source, old.topic);
+END;
+
+-- When each topic's roadmap / resources were last indexed
+CREATE TABLE indexed_topics (
+    topic_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    indexed_at REAL NOT NULL,
+    PRIMARY KEY (topic_key, kind)
+) WITHOUT ROWID;
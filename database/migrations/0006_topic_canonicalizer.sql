@@ -0,0 +1,18 @@
+-- Canonical topics and the spellings mapped to them (app/topic_canonicalizer.py).
+-- Both only grow; workers load new rows by id.
+CREATE TABLE topics (
+    id INTEGER PRIMARY KEY,
+    topic_key TEXT NOT NULL UNIQUE,
+    topic TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE topic_aliases (
+    id INTEGER PRIMARY KEY,
+    alias_key TEXT NOT NULL UNIQUE,
+    topic_id INTEGER NOT NULL REFERENCES topics(id) ON DELETE CASCADE,
+    -- seed, fuzzy or manual
+    source TEXT NOT NULL,
+    score REAL,
+    created_at REAL NOT NULL
+);
@@ -0,0 +1,10 @@
+-- Display name and key changes of learned topics (app/topic_canonicalizer.py),
+-- replayed by workers in id order like the topic and alias tables. The old
+-- key stays in topic_aliases with source 'renamed'.
+CREATE TABLE topic_renames (
+    id INTEGER PRIMARY KEY,
+    topic_id INTEGER NOT NULL REFERENCES topics(id) ON DELETE CASCADE,
+    topic_key TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
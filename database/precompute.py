@@ -0,0 +1,218 @@
+"""
+Precompute roadmaps and resource bundles for a catalog of topics and store
+them in the study planner database, so /api/roadmap and /api/resources
+serve catalog topics without calling any upstream.
+
+    python -m database.precompute topics.txt --concurrency 4
+
+The topic file has one topic per line ("-" reads stdin; blank lines and
+lines starting with "#" are skipped). Each result is committed as soon as
+it is ready, so an interrupted run picks up where it stopped: topics with
+a stored result newer than --refresh-older-than are skipped. Failed topics
+are retried on the next run, up to --max-attempts times.
+
+Calls to each upstream are spaced to stay under its per-minute limit
+(--rate groq=30,youtube=50,github=25), and an upstream that fails or rate
+limits us is paused for --backoff seconds before it is called again.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from app import catalog_store
+from app.cache import normalize_topic
+from app.resource_aggregator import SOURCES, fetch_all_resources
+from app.roadmap_generator import generate_roadmap, router
+from app.roadmap_store import is_error_roadmap
+from app.topic_canonicalizer import canonical_topic
+
+logger = logging.getLogger("precompute")
+
+DEFAULT_RATES = "groq=30,youtube=50,github=25"
+
+
+class RateLimiter:
+    """Spaces calls to one upstream at least 60 / per_minute seconds apart, across threads."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+def parse_rates(spec):
+    rates = {}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if name.strip():
+            rates[name.strip()] = float(value)
+    return rates
+
+
+def read_topics(path):
+    """
+    Catalog topics in file order as their canonical topics, which is what
+    requests for any spelling of them look up, without duplicates.
+    """
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    topics = {}
+    with stream:
+        for line in stream:
+            topic = " ".join(line.split())
+            if topic and not topic.startswith("#"):
+                topic = canonical_topic(topic)
+                topics.setdefault(normalize_topic(topic), topic)
+    return list(topics.values())
+
+
+class Precompute:
+    def __init__(self, limiters, backoff):
+        self.limiters = limiters
+        self.backoff = backoff
+        self.counts = {"roadmaps": 0, "resources": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+    def _limit(self, upstream):
+        limiter = self.limiters.get(upstream)
+        if limiter is not None:
+            limiter.acquire()
+
+    def _pause(self, upstream):
+        limiter = self.limiters.get(upstream)
+        if limiter is not None:
+            limiter.pause(self.backoff)
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def roadmaps(self, topic):
+        self._limit("groq")
+        roadmap = generate_roadmap(topic)
+        if is_error_roadmap(roadmap):
+            self._pause("groq")
+            raise RuntimeError(roadmap or "empty roadmap")
+        catalog_store.save_roadmap(topic, router.primary_model, roadmap)
+        self._count("roadmaps")
+
+    def resources(self, topic):
+        for name in SOURCES:
+            self._limit(name)
+        bundle = fetch_all_resources(topic)
+        failed = [name for name, status in bundle["status"].items() if status["state"] != "ok"]
+        if failed:
+            for name in failed:
+                self._pause(name)
+            raise RuntimeError(f"sources failed: {', '.join(failed)}")
+        catalog_store.save_resources(topic, bundle)
+        self._count("resources")
+
+    def run_task(self, kind, topic):
+        try:
+            getattr(self, kind)(topic)
+        except Exception as e:
+            logger.warning("%s for %r failed: %s", kind, topic, e)
+            catalog_store.record_failure(topic, kind, e)
+            self._count("failed")
+
+
+def plan(topics, kinds, refresh_older_than, max_attempts):
+    """(kind, topic) tasks still to do, and how many were skipped."""
+    since = time.time() - refresh_older_than
+    tasks = []
+    skipped = 0
+    for kind in kinds:
+        done = catalog_store.completed_keys(kind, since)
+        attempts = catalog_store.failure_attempts(kind)
+        for topic in topics:
+            key = normalize_topic(topic)
+            if key in done or attempts.get(key, 0) >= max_attempts:
+                skipped += 1
+            else:
+                tasks.append((kind, topic))
+    return tasks, skipped
+
+
+def run(tasks, job, concurrency):
+    """
+    Run tasks with at most `concurrency` in flight. Ctrl-C stops submitting
+    and waits for the running tasks, whose results are already committed.
+    """
+    started = time.monotonic()
+    pending = set()
+    queue = iter(tasks)
+    finished = 0
+    interrupted = False
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="precompute") as executor:
+        try:
+            for task in queue:
+                pending.add(executor.submit(job.run_task, *task))
+                if len(pending) >= concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    finished += len(done)
+                    if finished % 50 < len(done):
+                        logger.info("%d/%d tasks done, %s", finished, len(tasks), job.counts)
+        except KeyboardInterrupt:
+            interrupted = True
+            logger.warning("Interrupted; waiting for %d running tasks", len(pending))
+        wait(pending)
+    return {
+        **job.counts,
+        "tasks": len(tasks),
+        "interrupted": interrupted,
+        "elapsed_s": round(time.monotonic() - started, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("topics", help="file with one topic per line, or - for stdin")
+    parser.add_argument("--only", choices=("roadmaps", "resources"), help="precompute just one kind")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", default=DEFAULT_RATES,
+                        help="per-minute call limits per upstream, e.g. groq=30,github=25 (0 = unlimited)")
+    parser.add_argument("--backoff", type=float, default=30.0,
+                        help="seconds to pause an upstream after it fails")
+    parser.add_argument("--refresh-older-than", type=float, default=7 * 86400,
+                        help="regenerate stored results older than this many seconds")
+    parser.add_argument("--max-attempts", type=int, default=3,
+                        help="skip topics that already failed this many runs")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    topics = read_topics(args.topics)
+    kinds = [args.only] if args.only else [catalog_store.ROADMAPS, catalog_store.RESOURCES]
+    tasks, skipped = plan(topics, kinds, args.refresh_older_than, args.max_attempts)
+    logger.info("%d topics: %d tasks to run, %d already done or given up", len(topics), len(tasks), skipped)
+
+    limiters = {name: RateLimiter(per_minute) for name, per_minute in parse_rates(args.rate).items()}
+    summary = run(tasks, Precompute(limiters, args.backoff), max(1, args.concurrency))
+    print(json.dumps({"topics": len(topics), "skipped": skipped, **summary}, indent=2))
+    sys.exit(130 if summary["interrupted"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Rebuild the structured roadmap and resource search index from the
+precomputed catalog, e.g. after upgrading a database whose catalog was
+filled before the index existed.
+
+    python -m database.reindex_search
+
+Roadmaps and resources generated on request are indexed as they are
+stored; this only covers the catalog tables.
+"""
+
+import argparse
+import json
+
+from app.db import get_conn
+from app.roadmap_index import index_resources, index_roadmap
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__.split("\n\n")[0]).parse_args()
+    conn = get_conn()
+    roadmaps = resources = 0
+    for topic, roadmap in conn.execute("SELECT topic, roadmap FROM topic_roadmaps").fetchall():
+        index_roadmap(topic, roadmap)
+        roadmaps += 1
+    for topic, payload in conn.execute("SELECT topic, payload FROM topic_resources").fetchall():
+        index_resources(topic, json.loads(payload))
+        resources += 1
+    print(json.dumps({"roadmaps": roadmaps, "resources": resources}, indent=2))
+
+
+if __name__ == "__main__":
+    main()